@@ -0,0 +1,54 @@
+import argparse
+import asyncio
+import time
+
+from common import seed_database, use_sqlite
+
+use_sqlite()
+
+from base import get_async_engine, get_engine  # noqa: E402
+from model.async_db_requests import AsyncDBRequests  # noqa: E402
+from model.db_requests import DBRequests  # noqa: E402
+
+TERMS = ["Иван", "Петр", "Серг", "Алекс", "Дмитр", "Андр", "Никол", "Михаил"]
+
+
+def run_sync(searches):
+    start = time.perf_counter()
+    for i in range(searches):
+        DBRequests.search_students_by_name(TERMS[i % len(TERMS)])
+    return time.perf_counter() - start
+
+
+async def run_async(searches, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def search(term):
+        async with semaphore:
+            return await AsyncDBRequests.search_students_by_name(term)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(search(TERMS[i % len(TERMS)]) for i in range(searches)))
+    elapsed = time.perf_counter() - start
+    await get_async_engine().dispose()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пропускная способность синхронного и асинхронного поиска")
+    parser.add_argument("--count", type=int, default=20000, help="студентов в базе")
+    parser.add_argument("--searches", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    seed_database(get_engine(), args.count)
+
+    elapsed = run_sync(args.searches)
+    print(f"sync: {args.searches / elapsed:.1f} поисков/с")
+    for concurrency in args.concurrency:
+        elapsed = asyncio.run(run_async(args.searches, concurrency))
+        print(f"async, {concurrency} одновременно: {args.searches / elapsed:.1f} поисков/с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# приложение импортирует модули как из корня, так и из model/, views/, controllers/;
+# корень первым, иначе пакет controllers перекрывается модулем controllers/controllers.py
+for path in (os.path.join(ROOT, "controllers"), os.path.join(ROOT, "views"), os.path.join(ROOT, "model"), ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+LAST_NAMES = ["Иванов", "Петров", "Сидоров", "Смирнов", "Кузнецов", "Попов", "Васильев", "Соколов",
+              "Михайлов", "Новиков", "Фёдоров", "Морозов", "Волков", "Алексеев", "Лебедев", "Семёнов"]
+FIRST_NAMES = ["Иван", "Пётр", "Сергей", "Алексей", "Дмитрий", "Андрей", "Николай", "Михаил"]
+MIDDLE_NAMES = ["Иванович", "Петрович", "Сергеевич", "Алексеевич", "Дмитриевич", "Андреевич"]
+
+
+def use_sqlite(path=None):
+    # DATABASE_URL должен быть задан до импорта model.base
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="students_bench_"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    return path
+
+
+def seed_database(engine, count, seed=42):
+    from model.models import Base, Parent, Student, parent_key
+
+    rnd = random.Random(seed)
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        parents = {}
+        students = []
+
+        def parent_id(row):
+            # ключ родителя уникален: повторно сгенерированный родитель берется уже добавленный
+            key = parent_key(row["first_name"], row["middle_name"], row["last_name"], row["income"], row["gender"])
+            if key not in parents:
+                parents[key] = dict(row, id=len(parents) + 1, parent_key=key)
+            return parents[key]["id"]
+
+        for i in range(count):
+            last_name = rnd.choice(LAST_NAMES)
+            father_id = parent_id({"first_name": rnd.choice(FIRST_NAMES),
+                                   "middle_name": rnd.choice(MIDDLE_NAMES), "last_name": last_name,
+                                   "income": round(rnd.uniform(10000, 200000), 2), "gender": "male"})
+            mother_id = parent_id({"first_name": rnd.choice(FIRST_NAMES) + "а",
+                                   "middle_name": rnd.choice(MIDDLE_NAMES)[:-2] + "на", "last_name": last_name + "а",
+                                   "income": round(rnd.uniform(10000, 200000), 2), "gender": "female"})
+            students.append({"id": i + 1, "first_name": rnd.choice(FIRST_NAMES),
+                             "middle_name": rnd.choice(MIDDLE_NAMES), "last_name": last_name,
+                             "father_id": father_id, "mother_id": mother_id,
+                             "brothers_count": rnd.randint(0, 5), "sisters_count": rnd.randint(0, 5)})
+        connection.execute(Parent.__table__.insert(), list(parents.values()))
+        connection.execute(Student.__table__.insert(), students)
+
+
+def iter_students(count, seed=42):
+    from xml_models import XMLStudent
+
+    rnd = random.Random(seed)
+    for _ in range(count):
+        yield XMLStudent(
+            fio=f"{rnd.choice(LAST_NAMES)} {rnd.choice(FIRST_NAMES)} {rnd.choice(MIDDLE_NAMES)}",
+            father_fio=f"{rnd.choice(LAST_NAMES)} {rnd.choice(FIRST_NAMES)} {rnd.choice(MIDDLE_NAMES)}",
+            mother_fio=f"{rnd.choice(LAST_NAMES)}а {rnd.choice(FIRST_NAMES)}а {rnd.choice(MIDDLE_NAMES)}",
+            father_income=round(rnd.uniform(10000, 200000), 2),
+            mother_income=round(rnd.uniform(10000, 200000), 2),
+            brother_count=rnd.randint(0, 5),
+            sister_count=rnd.randint(0, 5)
+        )
+
+
+def timeit(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
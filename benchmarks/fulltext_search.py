@@ -0,0 +1,43 @@
+import argparse
+
+from common import timeit, use_sqlite
+
+use_sqlite()
+
+from base import get_engine  # noqa: E402
+from model import queries  # noqa: E402
+from model.db_requests import DBRequests  # noqa: E402
+from model.models_factory import FamilyGenerator, seed_database  # noqa: E402
+
+# частая фамилия, начало имени, имя в нижнем регистре, фамилия с "ё" и ФИО из двух слов
+TERMS = ["Смирнов", "Алекс", "иван", "Семёнов", "Кузнецов Иван"]
+
+SEARCHES = {
+    "студенты": DBRequests.search_student_rows_by_name,
+    "родители": DBRequests.search_parent_rows_by_name,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Поиск по ФИО: ilike против полнотекстового индекса")
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+
+    seed_database(FamilyGenerator(), args.count)
+    print(f"{args.count} студентов, {get_engine().dialect.name}")
+
+    for name, search in SEARCHES.items():
+        for term in TERMS:
+            timings = {}
+            for backend in ("like", "fts"):
+                queries.SEARCH_BACKEND = backend
+                found = len(search(term))
+                timings[backend] = (timeit(lambda: search(term), repeat=3), found)
+            (like_time, like_found), (fts_time, fts_found) = timings["like"], timings["fts"]
+            # ilike ищет подстроку с учетом регистра кириллицы в SQLite, fts - слова по началу без учета регистра
+            print(f"{name}, '{term}': like {like_time * 1000:.1f} ms ({like_found}), "
+                  f"fts {fts_time * 1000:.1f} ms ({fts_found}), x{like_time / fts_time:.1f}")
+
+
+if __name__ == "__main__":
+    main()
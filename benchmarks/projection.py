@@ -0,0 +1,60 @@
+import argparse
+
+from common import seed_database, timeit, use_sqlite
+
+use_sqlite()
+
+from base import get_engine  # noqa: E402
+from db_conn import get_session  # noqa: E402
+from model import queries  # noqa: E402
+from model.db_requests import DBRequests  # noqa: E402
+
+
+def orm_students():
+    # прежний путь: ORM-объекты с joinedload и форматирование в Python
+    with get_session() as session:
+        students = session.execute(queries.students_with_parents()).unique().scalars().all()
+        return [(
+            student.full_name,
+            student.father.full_name if student.father else "Нет данных",
+            f"{student.father.income:.2f}" if student.father else "0.00",
+            student.mother.full_name if student.mother else "Нет данных",
+            f"{student.mother.income:.2f}" if student.mother else "0.00",
+            student.brothers_count,
+            student.sisters_count
+        ) for student in students]
+
+
+def orm_search(search_term):
+    return [(
+        f"{student.last_name} {student.first_name} {student.middle_name}",
+        f"{student.father.last_name} {student.father.first_name} {student.father.middle_name}",
+        student.father.income,
+        f"{student.mother.last_name} {student.mother.first_name} {student.mother.middle_name}",
+        student.mother.income,
+        student.brothers_count,
+        student.sisters_count
+    ) for student in DBRequests.search_students_by_name(search_term)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ORM-объекты против проекции колонок")
+    parser.add_argument("--count", type=int, default=50000)
+    args = parser.parse_args()
+
+    seed_database(get_engine(), args.count)
+
+    cases = {
+        "все студенты": (orm_students, DBRequests.get_query_of_students),
+        "поиск по имени": (lambda: orm_search("Иван"), lambda: DBRequests.search_student_rows_by_name("Иван")),
+    }
+    for name, (orm, projection) in cases.items():
+        assert orm() == projection()
+        orm_time = timeit(orm, repeat=3)
+        projection_time = timeit(projection, repeat=3)
+        print(f"{name}: ORM {orm_time * 1000:.0f} ms, проекция {projection_time * 1000:.0f} ms "
+              f"(x{orm_time / projection_time:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import argparse
+
+from common import seed_database, timeit, use_sqlite
+
+use_sqlite()
+
+from sqlalchemy import text  # noqa: E402
+
+from base import get_engine  # noqa: E402
+from db_conn import get_session  # noqa: E402
+from model.models import Base, Parent, Student  # noqa: E402
+
+engine = get_engine()
+
+
+def queries(session):
+    term = "%ван%"
+    return {
+        "search_students_by_name": session.query(Student).filter(
+            Student.first_name.ilike(term) | Student.middle_name.ilike(term) | Student.last_name.ilike(term)),
+        "search_students_by_last_name_prefix": session.query(Student).filter(
+            Student.last_name.ilike("Иван%")),
+        "search_by_count_of_brothers_or_sisters": session.query(Student).filter(
+            (Student.brothers_count == 3) | (Student.sisters_count == 3)),
+        "search_by_income_of_parents": session.query(Parent).filter(
+            Parent.income >= 50000, Parent.income <= 51000),
+        "children_of_parent": session.query(Student).filter(
+            (Student.father_id == 10) | (Student.mother_id == 10)),
+    }
+
+
+def explain(session, query):
+    sql = str(query.statement.compile(engine, compile_kwargs={"literal_binds": True}))
+    if engine.dialect.name == "sqlite":
+        rows = session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+        return [row[-1] for row in rows]
+    return [row[0] for row in session.execute(text(f"EXPLAIN {sql}")).all()]
+
+
+def report(title):
+    print(f"== {title}")
+    with get_session() as session:
+        for name, query in queries(session).items():
+            elapsed = timeit(lambda: query.all(), repeat=3)
+            print(f"{name}: {elapsed * 1000:.1f} ms")
+            for line in explain(session, query):
+                print(f"    {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Планы запросов до и после создания индексов")
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+
+    seed_database(engine, args.count)
+    indexes = [index for table in Base.metadata.sorted_tables for index in table.indexes]
+
+    for index in indexes:
+        index.drop(engine)
+    report(f"без индексов, {args.count} студентов")
+
+    for index in indexes:
+        index.create(engine)
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE"))
+    report(f"с индексами, {args.count} студентов")
+
+
+if __name__ == "__main__":
+    main()
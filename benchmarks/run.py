@@ -0,0 +1,243 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from common import ROOT, use_sqlite
+
+DIRECTORY = tempfile.mkdtemp(prefix="students_suite_")
+DB_PATH = use_sqlite(os.path.join(DIRECTORY, "bench.db"))
+
+import sqlalchemy  # noqa: E402
+
+from base import get_engine  # noqa: E402
+from controllers.controllers import Controller  # noqa: E402
+from model.db_requests import DBRequests  # noqa: E402
+from model.models_factory import FamilyGenerator, seed_database, seed_xml  # noqa: E402
+from pagination import Pagination  # noqa: E402
+from xml_manager import StudentsModel, XMLManager  # noqa: E402
+
+# самая частая фамилия генератора (распределение Ципфа) и распространенное имя
+NAME = "Смирнов"
+FIRST_NAME = "Иван"
+SIBLINGS = 1
+INCOME_RANGE = (50000, 60000)
+PAGE_SIZE = 50
+
+
+def measure(func, setup=None, repeat=3):
+    # лучшее время из repeat запусков и пиковая память отдельного запуска под tracemalloc
+    best = None
+    result = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    rows = len(result) if hasattr(result, "__len__") else result if isinstance(result, int) else None
+    return {"seconds": best, "peak_bytes": peak, "rows": rows}
+
+
+def restore_database(seed_path):
+    # удаления портят данные, поэтому перед каждым запуском база восстанавливается из копии
+    def setup():
+        get_engine().dispose()
+        shutil.copyfile(seed_path, DB_PATH)
+        DBRequests._students_count = None
+    return setup
+
+
+def walk_pages(pagination, data):
+    pagination.first_page()
+    pages = [pagination.get_current_page_data(data)]
+    while pagination.current_page < pagination.total_pages:
+        pagination.next_page()
+        pages.append(pagination.get_current_page_data(data))
+    return pages
+
+
+def fetch_pages(controller, pages):
+    # первые страницы по ключу, как при перелистывании в главном окне
+    pagination = Pagination(controller.count_students(refresh=True), PAGE_SIZE)
+    rows = []
+    for _ in range(pages):
+        rows.extend(pagination.fetch_current_page(controller.get_students_page))
+        pagination.next_page()
+    return rows
+
+
+def db_cases(seed_path):
+    restore = restore_database(seed_path)
+    low, high = INCOME_RANGE
+    controller = Controller("db")
+    uncached = controller.cache.clear
+    return {
+        "db.get_query_of_students": (DBRequests.get_query_of_students, None),
+        "db.count_students": (lambda: DBRequests.count_students(refresh=True), None),
+        "db.search_student_rows_by_name": (lambda: DBRequests.search_student_rows_by_name(FIRST_NAME), None),
+        "db.search_student_rows_by_siblings": (lambda: DBRequests.search_student_rows_by_siblings(SIBLINGS), None),
+        "db.search_parent_rows_by_name": (lambda: DBRequests.search_parent_rows_by_name(NAME), None),
+        "db.search_parent_rows_by_income": (lambda: DBRequests.search_parent_rows_by_income(low, high), None),
+        "db.search_students_by_name": (lambda: DBRequests.search_students_by_name(FIRST_NAME), None),
+        "db.search_parents_by_name": (lambda: DBRequests.search_parents_by_name(NAME), None),
+        "db.search_by_count_of_brothers_or_sisters": (
+            lambda: DBRequests.search_by_count_of_brothers_or_sisters(SIBLINGS), None),
+        "db.search_by_income_of_parents": (lambda: DBRequests.search_by_income_of_parents(low, high), None),
+        "controller.db.search_students_by_name": (lambda: controller.search_students_by_name(FIRST_NAME), uncached),
+        "controller.db.search_parents_by_name": (lambda: controller.search_parents_by_name(NAME), uncached),
+        "pagination.fetch_current_page": (lambda: fetch_pages(controller, 20), None),
+        # удаления последними: после замера база остается измененной
+        "db.delete_student_by_name": (lambda: DBRequests.delete_student_by_name(FIRST_NAME), restore),
+        "db.delete_parent_by_name": (lambda: DBRequests.delete_parent_by_name(NAME), restore),
+        "db.delete_by_count_of_brothers_or_sisters": (
+            lambda: DBRequests.delete_by_count_of_brothers_or_sisters(SIBLINGS), restore),
+        "db.delete_by_income_of_parents": (lambda: DBRequests.delete_by_income_of_parents(low, high), restore),
+    }
+
+
+def xml_cases(xml_path):
+    model = StudentsModel(XMLManager(), write_delay=0)
+    model.load_students(xml_path)
+    save_path = os.path.join(DIRECTORY, "saved.xml")
+    saver = StudentsModel(XMLManager(save_path), write_delay=0)
+    saver.students = model.students
+
+    controller = Controller("xml")
+    controller.get_students(xml_path)
+    uncached = controller.cache.clear
+    low, high = INCOME_RANGE
+    students = controller.get_students()
+    pagination = Pagination(len(students), PAGE_SIZE)
+    return {
+        "xml.load_students": (lambda: StudentsModel(XMLManager(), write_delay=0).load_students(xml_path), None),
+        "xml.save_students": (lambda: saver.save_students() or len(saver.students), None),
+        "controller.xml.search_students_by_name": (
+            lambda: controller.search_students_by_name(FIRST_NAME), uncached),
+        "controller.xml.search_parents_by_name": (lambda: controller.search_parents_by_name(NAME), uncached),
+        "controller.xml.search_by_count_of_brothers_or_sisters": (
+            lambda: controller.search_by_count_of_brothers_or_sisters(SIBLINGS), uncached),
+        "controller.xml.search_by_income_of_parents": (
+            lambda: controller.search_by_income_of_parents(low, high), uncached),
+        "pagination.get_current_page_data": (lambda: walk_pages(pagination, students), None),
+    }
+
+
+def prepare(size, seed):
+    # одни и те же сгенерированные данные в базе и в XML файле
+    get_engine().dispose()
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+    seed_database(FamilyGenerator(seed), size)
+    get_engine().dispose()
+    seed_path = os.path.join(DIRECTORY, f"seed_{size}.db")
+    shutil.copyfile(DB_PATH, seed_path)
+    DBRequests._students_count = None
+
+    xml_path = os.path.join(DIRECTORY, f"students_{size}.xml")
+    seed_xml(xml_path, FamilyGenerator(seed), size)
+    return seed_path, xml_path
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, repeat, seed, only):
+    results = {}
+    for size in sizes:
+        seed_path, xml_path = prepare(size, seed)
+        cases = {**db_cases(seed_path), **xml_cases(xml_path)}
+        for name, (func, setup) in cases.items():
+            if only and not any(part in name for part in only):
+                continue
+            result = measure(func, setup, repeat)
+            results.setdefault(name, {})[str(size)] = result
+            print(f"{size:>9} {name:<55} {result['seconds'] * 1000:>10.1f} ms "
+                  f"{result['peak_bytes'] / 2 ** 20:>8.1f} MiB  {result['rows']}", flush=True)
+    return results
+
+
+def compare(old_path, new_path, threshold):
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+
+    print(f"{old['meta']['revision']} -> {new['meta']['revision']}")
+    regressions = 0
+    for name in sorted(set(old["results"]) & set(new["results"])):
+        for size in sorted(set(old["results"][name]) & set(new["results"][name]), key=int):
+            before = old["results"][name][size]
+            after = new["results"][name][size]
+            change = after["seconds"] / before["seconds"] - 1 if before["seconds"] else 0
+            memory = after["peak_bytes"] / before["peak_bytes"] - 1 if before["peak_bytes"] else 0
+            mark = ""
+            if change > threshold:
+                mark = "  медленнее"
+                regressions += 1
+            elif change < -threshold:
+                mark = "  быстрее"
+            print(f"{size:>9} {name:<55} {before['seconds'] * 1000:>10.1f} -> {after['seconds'] * 1000:>10.1f} ms "
+                  f"({change:+.0%}, память {memory:+.0%}){mark}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Набор замеров производительности на SQLite и XML файлах")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3, help="количество запусков, берется лучшее время")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", nargs="+", help="только замеры, в имени которых есть эти подстроки")
+    parser.add_argument("--output", help="JSON файл с результатами, по умолчанию benchmark_<коммит>.json")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="сравнить два файла с результатами")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="относительное замедление, которое считается регрессией")
+    args = parser.parse_args()
+
+    if args.compare:
+        regressions = compare(*args.compare, args.threshold)
+        sys.exit(1 if regressions else 0)
+
+    meta = {
+        "revision": git_revision(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "sizes": args.sizes,
+        "repeat": args.repeat,
+        "seed": args.seed,
+    }
+    output = args.output or f"benchmark_{meta['revision'] or 'local'}.json"
+    results = run(args.sizes, args.repeat, args.seed, args.only)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": results}, f, ensure_ascii=False, indent=2, sort_keys=True)
+    print(f"Результаты записаны в {output}")
+
+
+if __name__ == "__main__":
+    main()
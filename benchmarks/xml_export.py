@@ -0,0 +1,47 @@
+import argparse
+import os
+import tempfile
+import time
+
+from common import peak_memory, seed_database, use_sqlite
+
+use_sqlite()
+
+from base import Base, get_engine  # noqa: E402
+from model.db_requests import DBRequests  # noqa: E402
+from model.xml_exporter import export_xml  # noqa: E402
+from xml_manager import XMLManager  # noqa: E402
+from xml_models import XMLStudent  # noqa: E402
+
+
+def export_in_memory(file_path):
+    # без потоковой выгрузки: все строки загружаются в список, затем записываются
+    students = [XMLStudent(
+        fio=row[0], father_fio=row[1], father_income=float(row[2]),
+        mother_fio=row[3], mother_income=float(row[4]), brother_count=row[5], sister_count=row[6]
+    ) for row in DBRequests.iter_students_for_export()]
+    XMLManager(file_path).save_students(students)
+    return len(students)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Выгрузка базы данных в XML")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="students_export_")
+    for size in args.sizes:
+        Base.metadata.drop_all(get_engine())
+        seed_database(get_engine(), size)
+        file_path = os.path.join(directory, f"students_{size}.xml")
+        print(f"== {size} студентов")
+        for name, export in (("в памяти", export_in_memory), ("export_xml", export_xml)):
+            start = time.perf_counter()
+            assert export(file_path) == size
+            elapsed = time.perf_counter() - start
+            peak = peak_memory(lambda: export(file_path))
+            print(f"{name}: {elapsed:.2f} s ({size / elapsed:,.0f} студентов/с), peak {peak / 2 ** 20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
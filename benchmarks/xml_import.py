@@ -0,0 +1,67 @@
+import argparse
+import os
+import tempfile
+import time
+
+from common import iter_students, use_sqlite
+
+use_sqlite()
+
+from base import Base, get_engine  # noqa: E402
+from model.db_requests import DBRequests  # noqa: E402
+from model.models import Parent, Student  # noqa: E402
+from model.xml_importer import import_xml, split_fio  # noqa: E402
+from xml_manager import XMLManager, load_with_sax  # noqa: E402
+
+
+def reset_database():
+    Base.metadata.drop_all(get_engine())
+    Base.metadata.create_all(get_engine())
+
+
+def import_one_by_one(file_path):
+    # прежний путь: add_student на каждого студента, два flush и commit
+    for student in load_with_sax(file_path):
+        DBRequests.add_student(
+            father=Parent(**split_fio(student.father_fio), income=student.father_income, gender="male"),
+            mother=Parent(**split_fio(student.mother_fio), income=student.mother_income, gender="female"),
+            brothers_count=student.brother_count,
+            sisters_count=student.sister_count,
+            **split_fio(student.fio)
+        )
+
+
+def measure(name, size, func):
+    reset_database()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    assert DBRequests.count_students(refresh=True) == size
+    print(f"{name}: {elapsed:.2f} s ({size / elapsed:,.0f} студентов/с)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пропускная способность импорта XML в базу данных")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[500, 5000])
+    parser.add_argument("--legacy-limit", type=int, default=10000,
+                        help="максимальный размер файла для построчного добавления")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="students_import_")
+    for size in args.sizes:
+        file_path = os.path.join(directory, f"students_{size}.xml")
+        XMLManager(file_path).save_students(iter_students(size))
+        print(f"== {size} студентов")
+        if size <= args.legacy_limit:
+            measure("add_student", size, lambda: import_one_by_one(file_path))
+        for chunk_size in args.chunk_sizes:
+            measure(f"import_xml, пачка {chunk_size}", size, lambda: import_xml(file_path, chunk_size))
+
+    with get_engine().connect() as connection:
+        student = connection.execute(Student.__table__.select().limit(1)).first()
+        print("Пример строки:", student)
+
+
+if __name__ == "__main__":
+    main()
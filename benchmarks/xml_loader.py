@@ -0,0 +1,81 @@
+import argparse
+import os
+import tempfile
+import time
+import xml.sax
+
+from common import iter_students, peak_memory
+
+from xml_manager import LOADERS, XMLManager  # noqa: E402
+from xml_models import XMLStudent  # noqa: E402
+
+
+class LegacySAXHandler(xml.sax.ContentHandler):
+    # прежний обработчик: конкатенация строк и цепочка if/elif
+    def __init__(self):
+        self.students = []
+        self.current_student = None
+        self.content = ""
+
+    def startElement(self, tag, _):
+        if tag == "student":
+            self.current_student = XMLStudent(fio="", father_fio="", mother_fio="", father_income=0,
+                                              mother_income=0, brother_count=0, sister_count=0)
+
+    def endElement(self, tag):
+        if self.current_student is None:
+            return
+        if tag == "fio":
+            self.current_student.fio = self.content
+        elif tag == "father_fio":
+            self.current_student.father_fio = self.content
+        elif tag == "mother_fio":
+            self.current_student.mother_fio = self.content
+        elif tag == "father_income":
+            self.current_student.father_income = float(self.content)
+        elif tag == "mother_income":
+            self.current_student.mother_income = float(self.content)
+        elif tag == "brother_count":
+            self.current_student.brother_count = int(self.content)
+        elif tag == "sister_count":
+            self.current_student.sister_count = int(self.content)
+        elif tag == "student":
+            self.students.append(self.current_student)
+        self.content = ""
+
+    def characters(self, content):
+        self.content += content.strip()
+
+
+def load_legacy(file_path):
+    handler = LegacySAXHandler()
+    parser = xml.sax.make_parser()
+    parser.setContentHandler(handler)
+    parser.parse(file_path)
+    return handler.students
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение загрузчиков XML")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+
+    loaders = {"legacy-sax": load_legacy, **LOADERS}
+    directory = tempfile.mkdtemp(prefix="students_xml_")
+    for size in args.sizes:
+        file_path = os.path.join(directory, f"students_{size}.xml")
+        XMLManager(file_path).save_students(iter_students(size))
+        print(f"== {size} студентов, {os.path.getsize(file_path) / 2 ** 20:.1f} MiB")
+        for name, loader in loaders.items():
+            start = time.perf_counter()
+            students = loader(file_path)
+            elapsed = time.perf_counter() - start
+            assert len(students) == size
+            del students
+            peak = peak_memory(lambda: loader(file_path)) if size <= 100000 else None
+            memory = f", peak {peak / 2 ** 20:.1f} MiB" if peak is not None else ""
+            print(f"{name}: {elapsed:.2f} s ({size / elapsed:,.0f} студентов/с){memory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import tracemalloc
+
+from common import iter_students
+
+from xml_models import StudentColumns, XMLStudent  # noqa: E402
+
+
+class DictStudent:
+    # прежнее представление XMLStudent с __dict__ у каждого экземпляра
+    def __init__(self, student):
+        self.fio = student.fio
+        self.father_fio = student.father_fio
+        self.mother_fio = student.mother_fio
+        self.father_income = student.father_income
+        self.mother_income = student.mother_income
+        self.brother_count = student.brother_count
+        self.sister_count = student.sister_count
+
+
+def fresh_strings(student):
+    # у каждой записи из файла свои строки, как после разбора XML
+    return XMLStudent("".join(student.fio), "".join(student.father_fio), "".join(student.mother_fio),
+                      student.father_income, student.mother_income,
+                      student.brother_count, student.sister_count)
+
+
+LAYOUTS = {
+    "dict": lambda students: [DictStudent(s) for s in students],
+    "slots": lambda students: list(students),
+    "columnar": StudentColumns,
+}
+
+
+def measure(layout, count):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    storage = LAYOUTS[layout](fresh_strings(s) for s in iter_students(count))
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    assert len(storage) == count
+    return used
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Память на одного студента для разных представлений")
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+
+    for layout in LAYOUTS:
+        used = measure(layout, args.count)
+        print(f"{layout}: {used / 2 ** 20:.1f} MiB, {used / args.count:.0f} байт на студента")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import argparse
+import filecmp
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.dom.minidom
+
+from common import iter_students
+
+from xml_manager import XMLManager  # noqa: E402
+
+
+def save_students_minidom(students, file_path):
+    # прежняя реализация XMLManager.save_students
+    doc = xml.dom.minidom.Document()
+    root = doc.createElement("students")
+    doc.appendChild(root)
+
+    for student in students:
+        student_elem = doc.createElement("student")
+        for tag in ("fio", "father_fio", "mother_fio", "father_income", "mother_income",
+                    "brother_count", "sister_count"):
+            elem = doc.createElement(tag)
+            elem.appendChild(doc.createTextNode(str(getattr(student, tag))))
+            student_elem.appendChild(elem)
+        root.appendChild(student_elem)
+
+    with open(file_path, 'w', encoding='utf-8') as f:
+        doc.writexml(f, indent="", addindent="  ", newl="\n", encoding="utf-8")
+
+
+def run_writer(writer, count, file_path):
+    students = list(iter_students(count))
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    start = time.perf_counter()
+    if writer == "minidom":
+        save_students_minidom(students, file_path)
+    else:
+        XMLManager(file_path).save_students(students)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{writer}: {elapsed:.2f} s, tracemalloc peak {peak / 2 ** 20:.1f} MiB, "
+          f"peak RSS growth {(rss_after - rss_before) / 1024:.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="minidom против потоковой записи XML")
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--writer", choices=("minidom", "stream"))
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    if args.writer:
+        run_writer(args.writer, args.count, args.output)
+        return
+
+    # каждый вариант в отдельном процессе, чтобы пиковый RSS не смешивался
+    directory = tempfile.mkdtemp(prefix="students_xml_")
+    outputs = {}
+    for writer in ("minidom", "stream"):
+        outputs[writer] = os.path.join(directory, f"{writer}.xml")
+        subprocess.run([sys.executable, __file__, "--count", str(args.count), "--writer", writer,
+                        "--output", outputs[writer]], check=True)
+    same = filecmp.cmp(outputs["minidom"], outputs["stream"], shallow=False)
+    print(f"файлы {'идентичны' if same else 'РАЗЛИЧАЮТСЯ'}")
+
+
+if __name__ == "__main__":
+    main()
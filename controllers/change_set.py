@@ -0,0 +1,10 @@
+class ChangeSet:
+    # изменения данных после операций контроллера; окно применяет их без полной перезагрузки
+    def __init__(self):
+        self.inserted = 0
+        self.deleted = 0
+        # точное количество затронутых студентов неизвестно, нужен пересчет
+        self.reload = False
+
+    def __bool__(self):
+        return self.reload or bool(self.inserted or self.deleted)
@@ -1,8 +1,15 @@
+from controllers.change_set import ChangeSet
+from controllers.result_cache import ResultCache
+from metrics import metrics
 from model.db_requests import DBRequests
+from model.xml_exporter import export_xml
+from model.xml_importer import import_xml
 from xml_manager import StudentsModel as xmlStudents
 from xml_manager import XMLManager
 
 
+# счетчики читаются окном статистики раз в пару секунд и в замерах не нужны
+@metrics.instrument("controller", exclude=("get_counts", "get_cache_stats", "pop_changes", "pop_flush_error"))
 class Controller:
     def __init__(self, mode):
         self.db = DBRequests()
@@ -12,6 +19,9 @@ class Controller:
         self.mode = mode
         self.handler = self._get_handler()
         self.xml_model = xmlStudents(self.xml_manager)
+        self.cache = ResultCache()
+        self.changes = ChangeSet()
+        self.metrics = metrics
 
     def _get_handler(self):
         if self.mode == "db":
@@ -23,14 +33,55 @@ class Controller:
         else:
             raise ValueError("Неподдерживаемый режим работы")
 
+    @staticmethod
+    def _normalize(value):
+        return value.strip() if isinstance(value, str) else value
+
+    def _search(self, operation, search, *args):
+        # результаты неизменяемы (tuple), т.к. один и тот же объект отдается из кэша повторно
+        args = tuple(self._normalize(arg) for arg in args)
+        results = self.cache.get((self.mode, operation) + args, lambda: tuple(search(*args)))
+        self.found_count += len(results)
+        return results
+
     def get_students(self, file_path=None):
         if self.mode == "xml":
+            if file_path is None:
+                # уже загруженные студенты, файл повторно не разбирается
+                return self.xml_model.students
+            self.cache.clear()
             students = self.xml_model.load_students(file_path)  # Загрузка данных
             return students
         return self.db.get_query_of_students()
 
+    def count_students(self, refresh=False):
+        if refresh:
+            # данные могли измениться вне приложения
+            self.cache.clear()
+        return self.db.count_students(refresh)
+
+    def pop_changes(self):
+        changes, self.changes = self.changes, ChangeSet()
+        return changes
+
+    def get_students_page(self, after_id=None, offset=0, limit=10):
+        return self.db.get_page_of_students(after_id=after_id, offset=offset, limit=limit)
+
+    def import_from_xml(self, file_path, progress=None):
+        if self.mode != "db":
+            raise ValueError("Импорт из XML доступен только в режиме базы данных")
+        self.cache.clear()
+        self.changes.reload = True
+        return import_xml(file_path, progress=progress)
+
+    def export_to_xml(self, file_path, progress=None):
+        if self.mode != "db":
+            raise ValueError("Выгрузка в XML доступна только в режиме базы данных")
+        return export_xml(file_path, progress=progress)
+
     def add_student(self, first_name, middle_name, last_name, father, mother,brothers_count, sisters_count,
                     father_income=None, mother_income=None):
+        self.cache.clear()
         if self.mode == "xml":
             student_data = {
                 "fio": f"{last_name} {first_name} {middle_name}",
@@ -42,6 +93,7 @@ class Controller:
                 "sister_count": sisters_count
             }
             self.xml_model.add_student(student_data)
+            self.changes.inserted += 1
         elif self.mode == "db":
             self.db.add_student(
                 first_name=first_name,
@@ -52,42 +104,73 @@ class Controller:
                 brothers_count=brothers_count,
                 sisters_count=sisters_count
             )
+            self.changes.inserted += 1
+
+    def add_students(self, students):
+        # students - словари с полями AddStudentDialog (father_last, father_income, ...);
+        # в БД вся пачка добавляется одной транзакцией, XML-файл записывается один раз
+        self.cache.clear()
+        if self.mode == "xml":
+            self.xml_model.add_students([{
+                "fio": f"{s['last_name']} {s['first_name']} {s['middle_name']}",
+                "father_fio": f"{s['father_last']} {s['father_first']} {s['father_middle']}",
+                "mother_fio": f"{s['mother_last']} {s['mother_first']} {s['mother_middle']}",
+                "father_income": s['father_income'],
+                "mother_income": s['mother_income'],
+                "brother_count": s['brothers_count'],
+                "sister_count": s['sisters_count']
+            } for s in students])
+            count = len(students)
+        elif self.mode == "db":
+            count = self.db.add_students_bulk([{
+                "first_name": s['first_name'],
+                "middle_name": s['middle_name'],
+                "last_name": s['last_name'],
+                "father": {"first_name": s['father_first'], "middle_name": s['father_middle'],
+                           "last_name": s['father_last'], "income": s['father_income']},
+                "mother": {"first_name": s['mother_first'], "middle_name": s['mother_middle'],
+                           "last_name": s['mother_last'], "income": s['mother_income']},
+                "brothers_count": s['brothers_count'],
+                "sisters_count": s['sisters_count']
+            } for s in students])
+        else:
+            raise ValueError("Неподдерживаемый режим работы")
+        self.changes.inserted += count
+        return count
 
     def delete_by_income_of_parents(self, min_income=None, max_income=None):
+        self.cache.clear()
         if self.mode == "db":
             count = self.db.delete_by_income_of_parents(min_income, max_income)
             self.deleted_count += count
+            # удаляются родители, количество удаленных студентов неизвестно
+            self.changes.reload = True
             return f"Удалено {count} записей"
         else:
             count = self.xml_model.delete_by_income_parents(min_income, max_income)
             self.deleted_count += count
+            self.changes.deleted += count
             return f"Удалено {count} записей"
 
     def search_by_income_of_parents(self, min_income, max_income):
+        return self._search("parents_by_income", self._search_by_income_of_parents, min_income, max_income)
+
+    def search_by_count_of_brothers_or_sisters(self, count):
+        return self._search("students_by_siblings", self._search_by_count_of_brothers_or_sisters, count)
+
+    def search_students_by_name(self, search_term):
+        return self._search("students_by_name", self._search_students_by_name, search_term)
+
+    def search_parents_by_name(self, search_item):
+        return self._search("parents_by_name", self._search_parents_by_name, search_item)
+
+    def _search_by_income_of_parents(self, min_income, max_income):
         if self.mode == "db":
-            results = self.db.search_by_income_of_parents(min_income, max_income)
-            formatted = []
-            for parent in results:
-                if parent.gender == "male":
-                    formatted.append((
-                        "-",
-                        f"{parent.last_name} {parent.first_name} {parent.middle_name}",
-                        parent.income,
-                        "-", "-", "-", "-"
-                    ))
-                else:
-                    formatted.append((
-                        "-",
-                        "-", "-",
-                        f"{parent.last_name} {parent.first_name} {parent.middle_name}",
-                        parent.income,
-                        "-", "-"
-                    ))
-            self.found_count += len(results)
-            return formatted
+            results = self.db.search_parent_rows_by_income(min_income, max_income)
+            return results
         else:
             results = []
-            for student in self.xml_model.students:
+            for student in self.xml_model.search_by_income_range(min_income, max_income):
                 if min_income <= student.father_income <= max_income:
                     results.append((
                         "-",
@@ -103,26 +186,12 @@ class Controller:
                         student.mother_income,
                         "-", "-"
                     ))
-            self.found_count += len(results)
             return results
 
-    def search_by_count_of_brothers_or_sisters(self, count):
+    def _search_by_count_of_brothers_or_sisters(self, count):
         if self.mode == "db":
-            results = self.db.search_by_count_of_brothers_or_sisters(count)
-            formatted_result = []
-            for student in results:
-                formatted = (
-                    f"{student.last_name} {student.first_name} {student.middle_name}",
-                    f"{student.father.last_name} {student.father.first_name} {student.father.middle_name}",
-                    student.father.income,
-                    f"{student.mother.last_name} {student.mother.first_name} {student.mother.middle_name}",
-                    student.mother.income,
-                    student.brothers_count,
-                    student.sisters_count
-                )
-                formatted_result.append(formatted)
-            self.found_count += len(results)
-            return formatted_result
+            results = self.db.search_student_rows_by_siblings(count)
+            return results
         else:
             results = self.xml_model.search_by_count_of_brothers_or_sisters(count)
             formatted_result = []
@@ -137,26 +206,12 @@ class Controller:
                     student.sister_count
                 )
                 formatted_result.append(formatted)
-            self.found_count += len(results)
             return formatted_result
 
-    def search_students_by_name(self, search_term):
+    def _search_students_by_name(self, search_term):
         if self.mode == "db":
-            results = self.db.search_students_by_name(search_term)
-            formatted = []
-            for student in results:
-                formatted_results = (
-                    f"{student.last_name} {student.first_name} {student.middle_name}",
-                    f"{student.father.last_name} {student.father.first_name} {student.father.middle_name}",
-                    student.father.income,
-                    f"{student.mother.last_name} {student.mother.first_name} {student.mother.middle_name}",
-                    student.mother.income,
-                    student.brothers_count,
-                    student.sisters_count
-                )
-                formatted.append(formatted_results)
-            self.found_count += len(results)
-            return formatted
+            results = self.db.search_student_rows_by_name(search_term)
+            return results
         else:
             results = self.xml_model.search_by_fio(search_term)
             formatted = []
@@ -171,33 +226,12 @@ class Controller:
                     student.sister_count
                 )
                 formatted.append(formatted_results)
-            self.found_count += len(results)
             return formatted
 
-    def search_parents_by_name(self, search_item):
+    def _search_parents_by_name(self, search_item):
         if self.mode == "db":
-            results = self.db.search_parents_by_name(search_item)
-            formatted_result = []
-            for parent in results:
-                if parent.gender == "male":
-                    formatted = (
-                        "-",
-                        f"{parent.last_name} {parent.first_name} {parent.middle_name}",
-                        parent.income,
-                        "-", "-", "-", "-"
-                    )
-                    formatted_result.append(formatted)
-                else:
-                    formatted = (
-                        "-",
-                        "-", "-",
-                        f"{parent.last_name} {parent.first_name} {parent.middle_name}",
-                        parent.income,
-                        "-", "-"
-                    )
-                    formatted_result.append(formatted)
-            self.found_count += len(results)
-            return formatted_result
+            results = self.db.search_parent_rows_by_name(search_item)
+            return results
         else:
             results = self.xml_model.search_by_parent_name(search_item)
             formatted_result = []
@@ -219,61 +253,57 @@ class Controller:
                 )
                 formatted_result.append(formatted_mother)
 
-            self.found_count += len(results) * 2
             return formatted_result
 
     def delete_by_count_of_brothers_or_sisters(self, count: int):
         count = int(count)
+        self.cache.clear()
         if self.mode == "db":
             count = self.db.delete_by_count_of_brothers_or_sisters(count)
             self.deleted_count += count
+            self.changes.deleted += count
             return f"Удалено {count} записей"
         else:
-            before = len(self.xml_model.students)
-            self.xml_model.students = [
-                s for s in self.xml_model.students
-                if s.brother_count != count and s.sister_count != count
-            ]
-            deleted_count = before - len(self.xml_model.students)
-            if deleted_count > 0:
-                self.xml_model.save_students()
+            deleted_count = self.xml_model.delete_by_count_of_brothers_or_sisters(count)
             self.deleted_count += deleted_count
+            self.changes.deleted += deleted_count
             return f"Удалено {deleted_count} записей"
 
     def delete_parent_by_name(self, search_term: str):
+        self.cache.clear()
         if self.mode == "db":
-            self.db.delete_parent_by_name(search_term)
+            parent = self.db.delete_parent_by_name(search_term)
             self.deleted_count += 1
+            # дети удаляются каскадом вместе с родителем
+            self.changes.deleted += len(parent.children_as_father) + len(parent.children_as_mother)
             return f"Удалена 1 запись {search_term}"
         else:
-            before = len(self.xml_model.students)
-            self.xml_model.students = [
-                s for s in self.xml_model.students
-                if search_term.lower() not in s.father_fio.lower() and
-                   search_term.lower() not in s.mother_fio.lower()
-            ]
-            deleted_count = before - len(self.xml_model.students)
-            if deleted_count > 0:
-                self.xml_model.save_students()
+            deleted_count = self.xml_model.delete_by_parent_fio_part(search_term)
             self.deleted_count += deleted_count
+            self.changes.deleted += deleted_count
             return f"Удалено {deleted_count} записей"
 
     def delete_student_by_name(self, search_term: str):
+        self.cache.clear()
         if self.mode == "db":
             self.db.delete_student_by_name(search_term)
             self.deleted_count += 1
+            self.changes.deleted += 1
             return f"Удалена 1 запись {search_term}"
         else:
-            before = len(self.xml_model.students)
-            self.xml_model.students = [
-                s for s in self.xml_model.students
-                if search_term.lower() not in s.fio.lower()
-            ]
-            deleted_count = before - len(self.xml_model.students)
-            if deleted_count > 0:
-                self.xml_model.save_students()
+            deleted_count = self.xml_model.delete_by_fio_part(search_term)
             self.deleted_count += deleted_count
+            self.changes.deleted += deleted_count
             return f"Удалено {deleted_count} записей"
 
     def get_counts(self):
         return self.deleted_count, self.found_count
+
+    def get_cache_stats(self):
+        return self.cache.get_stats()
+
+    def pop_flush_error(self):
+        return self.xml_model.pop_flush_error()
+
+    def close(self):
+        self.xml_model.flush()
@@ -0,0 +1,141 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# задача, выполняемая текущим рабочим потоком
+_current = threading.local()
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+def raise_if_cancelled(*args):
+    # вызывается длинными операциями между шагами (например, как progress импорта и выгрузки):
+    # отмененная задача прерывается, а не дорабатывает до конца, занимая рабочий поток
+    task = getattr(_current, "task", None)
+    if task is not None and task.cancelled:
+        raise TaskCancelled()
+
+
+class Task:
+    def __init__(self, on_success=None, on_error=None, cancellable=True):
+        self.future = None
+        self.on_success = on_success
+        self.on_error = on_error
+        # изменения данных, подтвержденные пользователем, не отменяются
+        self.cancellable = cancellable
+        self.cancelled = False
+
+    def cancel(self):
+        # задача из очереди не запускается; уже запущенная прерывается только в точках
+        # raise_if_cancelled (запрос к базе или поиск в памяти дорабатывают), ее результат отбрасывается
+        self.cancelled = True
+        self.future.cancel()
+
+
+class BackgroundExecutor:
+    # операции выполняются в пуле потоков, результаты передаются в поток Tk через after();
+    # root - любой объект с методом after(ms, callback)
+    def __init__(self, root, max_workers=1, poll_interval=50):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="students-worker")
+        self.tasks = []
+        self.on_busy_changed = None
+        self.on_error = None
+        self.on_shutdown = None
+        self.polling = False
+        self.closed = False
+
+    @property
+    def busy(self):
+        return bool(self.tasks)
+
+    def submit(self, func, *args, on_success=None, on_error=None, cancellable=True, **kwargs):
+        if self.closed:
+            # окно закрывается, новые операции не запускаются
+            return None
+        task = Task(on_success, on_error, cancellable)
+        task.future = self.pool.submit(self._run, task, func, args, kwargs)
+        self.tasks.append(task)
+        if len(self.tasks) == 1:
+            self._notify_busy()
+        self._schedule_poll()
+        return task
+
+    @staticmethod
+    def _run(task, func, args, kwargs):
+        _current.task = task
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current.task = None
+
+    def cancel_all(self):
+        # отменяются чтение и поиск; записи из очереди выполняются
+        for task in self.tasks:
+            if task.cancellable:
+                task.cancel()
+
+    def shutdown(self, on_done=None):
+        # поток Tk не ждет рабочий поток: чтение и поиск из очереди отменяются, а on_done вызывается
+        # через after(), когда выполнятся оставшиеся задачи (в том числе записи из очереди)
+        self.closed = True
+        self.cancel_all()
+        self.pool.shutdown(wait=False)
+        self.on_shutdown = on_done
+        if self.tasks:
+            self._schedule_poll()
+        else:
+            self._notify_shutdown()
+
+    def _schedule_poll(self):
+        if not self.polling:
+            self.polling = True
+            self.root.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        self.polling = False
+        # результаты отдаются в порядке отправки задач
+        finished = []
+        while self.tasks and self.tasks[0].future.done():
+            finished.append(self.tasks.pop(0))
+        if self.tasks:
+            self._schedule_poll()
+        elif finished:
+            self._notify_busy()
+
+        # исключение в обработчике одной задачи не отменяет обработчики остальных
+        errors = []
+        for task in finished:
+            try:
+                self._finish(task)
+            except Exception as e:
+                errors.append(e)
+        if not self.tasks:
+            self._notify_shutdown()
+        if errors:
+            raise errors[0]
+
+    def _finish(self, task):
+        if task.cancelled:
+            return
+        try:
+            result = task.future.result()
+        except Exception as e:
+            on_error = task.on_error or self.on_error
+            if on_error is None:
+                raise
+            on_error(e)
+            return
+        if task.on_success is not None:
+            task.on_success(result)
+
+    def _notify_busy(self):
+        if self.on_busy_changed is not None:
+            self.on_busy_changed(self.busy)
+
+    def _notify_shutdown(self):
+        if self.on_shutdown is not None:
+            on_done, self.on_shutdown = self.on_shutdown, None
+            on_done()
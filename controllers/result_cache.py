@@ -0,0 +1,33 @@
+from collections import OrderedDict
+
+from settings.config import SEARCH_CACHE_SIZE
+
+
+class ResultCache:
+    # результаты поиска по ключу (режим, операция, аргументы);
+    # при переполнении вытесняется запись, к которой дольше всего не обращались
+    def __init__(self, max_size=SEARCH_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, compute):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+        self.misses += 1
+        value = compute()
+        if self.max_size > 0:
+            self.entries[key] = value
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        self.entries.clear()
+
+    def get_stats(self):
+        return self.hits, self.misses
@@ -0,0 +1,80 @@
+"""Search indexes
+
+Revision ID: a3f1c9e2b7d4
+Revises: 6bbce23c5ecd
+Create Date: 2026-10-18 10:15:42.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f1c9e2b7d4'
+down_revision: Union[str, None] = '6bbce23c5ecd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NAME_COLUMNS = ('first_name', 'middle_name', 'last_name')
+
+
+def _existing_indexes(table):
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        # индексы по выражению (lower(last_name)) инспектор SQLite не возвращает
+        rows = bind.execute(sa.text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"),
+                            {'table': table})
+        return {row.name for row in rows}
+    return {index['name'] for index in sa.inspect(bind).get_indexes(table)}
+
+
+def upgrade() -> None:
+    # база могла быть создана через Base.metadata.create_all() уже с индексами
+    existing = _existing_indexes('students') | _existing_indexes('parents')
+
+    def create_index(name, table, columns, **kw):
+        if name not in existing:
+            op.create_index(name, table, columns, **kw)
+
+    for column in NAME_COLUMNS:
+        create_index(f'ix_students_{column}', 'students', [column])
+        create_index(f'ix_parents_{column}', 'parents', [column])
+    create_index('ix_students_brothers_count', 'students', ['brothers_count'])
+    create_index('ix_students_sisters_count', 'students', ['sisters_count'])
+    create_index('ix_students_father_id', 'students', ['father_id'])
+    create_index('ix_students_mother_id', 'students', ['mother_id'])
+    create_index('ix_parents_income', 'parents', ['income'])
+
+    create_index('ix_students_last_name_lower', 'students', [sa.text('lower(last_name)')])
+    create_index('ix_parents_last_name_lower', 'parents', [sa.text('lower(last_name)')])
+
+    # ilike '%...%' может использовать только триграммный индекс (PostgreSQL)
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for table in ('students', 'parents'):
+            for column in NAME_COLUMNS:
+                create_index(
+                    f'ix_{table}_{column}_trgm', table, [column],
+                    postgresql_using='gin',
+                    postgresql_ops={column: 'gin_trgm_ops'}
+                )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        for table in ('students', 'parents'):
+            for column in NAME_COLUMNS:
+                op.drop_index(f'ix_{table}_{column}_trgm', table_name=table)
+
+    op.drop_index('ix_parents_last_name_lower', table_name='parents')
+    op.drop_index('ix_students_last_name_lower', table_name='students')
+    op.drop_index('ix_parents_income', table_name='parents')
+    op.drop_index('ix_students_mother_id', table_name='students')
+    op.drop_index('ix_students_father_id', table_name='students')
+    op.drop_index('ix_students_sisters_count', table_name='students')
+    op.drop_index('ix_students_brothers_count', table_name='students')
+    for column in NAME_COLUMNS:
+        op.drop_index(f'ix_parents_{column}', table_name='parents')
+        op.drop_index(f'ix_students_{column}', table_name='students')
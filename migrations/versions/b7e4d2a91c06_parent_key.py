@@ -0,0 +1,104 @@
+"""Parent key and merge of duplicate parents
+
+Revision ID: b7e4d2a91c06
+Revises: a3f1c9e2b7d4
+Create Date: 2026-10-18 16:05:27.402913
+
+"""
+from decimal import Decimal
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e4d2a91c06'
+down_revision: Union[str, None] = 'a3f1c9e2b7d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+parents = sa.table(
+    'parents',
+    sa.column('id', sa.Integer),
+    sa.column('first_name', sa.String),
+    sa.column('middle_name', sa.String),
+    sa.column('last_name', sa.String),
+    sa.column('income', sa.Numeric(12, 2)),
+    sa.column('gender', sa.String),
+    sa.column('parent_key', sa.String),
+)
+
+students = sa.table(
+    'students',
+    sa.column('father_id', sa.Integer),
+    sa.column('mother_id', sa.Integer),
+)
+
+
+def _parent_key(row):
+    # копия model.models.parent_key на момент миграции
+    name = " ".join(f"{row.last_name} {row.first_name} {row.middle_name}".lower().replace("ё", "е").split())
+    return f"{name}|{Decimal(str(row.income)).quantize(Decimal('0.01'))}|{row.gender}"
+
+
+def _batches(rows):
+    for i in range(0, len(rows), BATCH_SIZE):
+        yield rows[i:i + BATCH_SIZE]
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+    # база могла быть создана через Base.metadata.create_all() уже с колонкой и индексом
+    if 'parent_key' not in {column['name'] for column in inspector.get_columns('parents')}:
+        op.add_column('parents', sa.Column('parent_key', sa.String(), nullable=True))
+
+    # ключ вычисляется в Python: lower() в SQLite не работает с кириллицей
+    rows = connection.execute(
+        sa.select(parents.c.id, parents.c.first_name, parents.c.middle_name,
+                  parents.c.last_name, parents.c.income, parents.c.gender).order_by(parents.c.id)
+    ).all()
+    update_key = parents.update().where(parents.c.id == sa.bindparam('parent_id')).values(
+        parent_key=sa.bindparam('key'))
+    for batch in _batches(rows):
+        connection.execute(update_key, [
+            {'parent_id': row.id, 'key': _parent_key(row)} for row in batch
+        ])
+
+    # дубликаты (одинаковые ФИО, доход и пол) сливаются в запись с наименьшим id
+    keepers = {}
+    duplicates = []
+    for row in rows:
+        key = _parent_key(row)
+        if key in keepers:
+            duplicates.append({'duplicate_id': row.id, 'keeper_id': keepers[key]})
+        else:
+            keepers[key] = row.id
+
+    for batch in _batches(duplicates):
+        for column in ('father_id', 'mother_id'):
+            connection.execute(
+                students.update().where(students.c[column] == sa.bindparam('duplicate_id')).values(
+                    {column: sa.bindparam('keeper_id')}),
+                batch
+            )
+        connection.execute(parents.delete().where(parents.c.id == sa.bindparam('duplicate_id')), batch)
+
+    indexes = {index['name']: index for index in inspector.get_indexes('parents')}
+    if 'ix_parents_parent_key' in indexes and not indexes['ix_parents_parent_key']['unique']:
+        op.drop_index('ix_parents_parent_key', table_name='parents')
+        del indexes['ix_parents_parent_key']
+    if 'ix_parents_parent_key' not in indexes:
+        op.create_index('ix_parents_parent_key', 'parents', ['parent_key'], unique=True)
+
+
+def downgrade() -> None:
+    # объединенные записи родителей обратно не разделяются
+    op.drop_index('ix_parents_parent_key', table_name='parents')
+    with op.batch_alter_table('parents') as batch_op:
+        batch_op.drop_column('parent_key')
+    # при пересоздании таблицы в SQLite индекс по выражению не переносится
+    op.create_index('ix_parents_last_name_lower', 'parents', [sa.text('lower(last_name)')], if_not_exists=True)
@@ -0,0 +1,80 @@
+"""Full-text search over student and parent names
+
+Revision ID: c5d81f3a9e27
+Revises: b7e4d2a91c06
+Create Date: 2026-10-18 16:40:12.530871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d81f3a9e27'
+down_revision: Union[str, None] = 'b7e4d2a91c06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('students', 'parents')
+
+# копия DDL из model/fulltext.py на момент миграции
+VALUES = ", ".join(f"replace(replace({{row}}.{name}, 'ё', 'е'), 'Ё', 'Е')"
+                   for name in ('first_name', 'middle_name', 'last_name'))
+
+SQLITE_CREATE = """CREATE VIRTUAL TABLE {table}_fts USING fts5(
+    first_name, middle_name, last_name,
+    content='', tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+)"""
+SQLITE_TRIGGERS = (
+    """CREATE TRIGGER IF NOT EXISTS {table}_fts_insert AFTER INSERT ON {table} BEGIN
+    INSERT INTO {table}_fts(rowid, first_name, middle_name, last_name)
+    VALUES (new.id, """ + VALUES.format(row="new") + """);
+END""",
+    """CREATE TRIGGER IF NOT EXISTS {table}_fts_delete AFTER DELETE ON {table} BEGIN
+    INSERT INTO {table}_fts({table}_fts, rowid, first_name, middle_name, last_name)
+    VALUES ('delete', old.id, """ + VALUES.format(row="old") + """);
+END""",
+    """CREATE TRIGGER IF NOT EXISTS {table}_fts_update AFTER UPDATE OF first_name, middle_name, last_name
+ON {table} BEGIN
+    INSERT INTO {table}_fts({table}_fts, rowid, first_name, middle_name, last_name)
+    VALUES ('delete', old.id, """ + VALUES.format(row="old") + """);
+    INSERT INTO {table}_fts(rowid, first_name, middle_name, last_name)
+    VALUES (new.id, """ + VALUES.format(row="new") + """);
+END""",
+)
+SQLITE_FILL = ("INSERT INTO {table}_fts(rowid, first_name, middle_name, last_name) "
+               "SELECT id, " + VALUES.format(row="{table}") + " FROM {table}")
+
+POSTGRESQL_INDEX = ("CREATE INDEX IF NOT EXISTS ix_{table}_fts ON {table} USING gin ("
+                    "to_tsvector('simple'::regconfig, translate(first_name || ' ' || middle_name || ' ' "
+                    "|| last_name, 'ёЁ', 'еЕ')))")
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        # база могла быть создана через Base.metadata.create_all() уже с индексом и триггерами
+        existing = set(sa.inspect(op.get_bind()).get_table_names())
+        for table in TABLES:
+            if f'{table}_fts' not in existing:
+                op.execute(SQLITE_CREATE.format(table=table))
+                op.execute(SQLITE_FILL.format(table=table))
+            for trigger in SQLITE_TRIGGERS:
+                op.execute(trigger.format(table=table))
+    elif dialect == 'postgresql':
+        for table in TABLES:
+            op.execute(POSTGRESQL_INDEX.format(table=table))
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for table in TABLES:
+            for suffix in ('insert', 'delete', 'update'):
+                op.execute(f'DROP TRIGGER IF EXISTS {table}_fts_{suffix}')
+            op.execute(f'DROP TABLE IF EXISTS {table}_fts')
+    elif dialect == 'postgresql':
+        for table in TABLES:
+            op.execute(f'DROP INDEX IF EXISTS ix_{table}_fts')
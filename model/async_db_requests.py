@@ -0,0 +1,240 @@
+from sqlalchemy.exc import SQLAlchemyError
+
+from db_conn import get_async_session
+from . import queries
+from .db_requests import DBRequests
+from .models import Student, Parent
+
+
+class AsyncDBRequests:
+    # асинхронный аналог DBRequests с теми же методами и теми же запросами из queries
+
+    @staticmethod
+    async def add_student(first_name, middle_name, last_name, father: Parent, mother: Parent,
+                          brothers_count: int = 0, sisters_count: int = 0):
+        async with get_async_session() as session:
+            try:
+                father_id, mother_id = await session.run_sync(DBRequests._resolve_parents, [
+                    DBRequests._parent_fields(father),
+                    DBRequests._parent_fields(mother)
+                ])
+
+                student = Student(
+                    first_name=first_name,
+                    middle_name=middle_name,
+                    last_name=last_name,
+                    father_id=father_id,
+                    mother_id=mother_id,
+                    brothers_count=brothers_count,
+                    sisters_count=sisters_count
+                )
+
+                session.add(student)
+                await session.commit()
+                DBRequests._students_count = None
+                return student
+
+            except Exception as e:
+                await session.rollback()
+                raise ValueError(f"Ошибка при добавлении: {str(e)}")
+
+    @staticmethod
+    async def add_students_bulk(students):
+        if not students:
+            return 0
+        try:
+            async with get_async_session() as session:
+                return await session.run_sync(DBRequests._add_students_bulk, students)
+        except SQLAlchemyError as e:
+            raise ValueError(f"Ошибка при массовом добавлении: {e}")
+
+    @staticmethod
+    async def get_query_of_students():
+        try:
+            async with get_async_session() as session:
+                result = await session.execute(queries.student_rows())
+                return [DBRequests._format_student_row(row) for row in result]
+        except SQLAlchemyError as e:
+            raise ValueError(f"Ошибка при получении списка студентов: {e}")
+
+    @staticmethod
+    async def iter_students_for_export(batch_size=1000):
+        # асинхронный генератор: строки приходят пачками через потоковый результат
+        try:
+            async with get_async_session() as session:
+                result = await session.stream(
+                    queries.student_rows_for_export().execution_options(yield_per=batch_size)
+                )
+                async for row in result:
+                    yield tuple(row[:-1])
+        except SQLAlchemyError as e:
+            raise ValueError(f"Ошибка при выгрузке студентов: {e}")
+
+    @staticmethod
+    async def count_students(refresh=False):
+        if DBRequests._students_count is not None and not refresh:
+            return DBRequests._students_count
+        try:
+            async with get_async_session() as session:
+                DBRequests._students_count = (await session.execute(queries.count_students())).scalar()
+                return DBRequests._students_count
+        except SQLAlchemyError as e:
+            raise ValueError(f"Ошибка при подсчете студентов: {e}")
+
+    @staticmethod
+    async def get_page_of_students(after_id=None, offset=0, limit=10):
+        try:
+            async with get_async_session() as session:
+                rows = (await session.execute(queries.student_rows_page(after_id, offset, limit))).all()
+                last_id = rows[-1][-1] if rows else after_id
+                return [DBRequests._format_student_row(row) for row in rows], last_id
+        except SQLAlchemyError as e:
+            raise ValueError(f"Ошибка при получении страницы студентов: {e}")
+
+    @staticmethod
+    async def search_student_rows_by_name(search_term):
+        queries.check_search_term(search_term)
+        try:
+            async with get_async_session() as session:
+                result = await session.execute(queries.student_rows_by_name(search_term))
+                return [tuple(row[:-1]) for row in result]
+        except SQLAlchemyError as e:
+            raise ValueError(f"Ошибка при поиске студентов: {e}")
+
+    @staticmethod
+    async def search_student_rows_by_siblings(count):
+        queries.check_count(count)
+        try:
+            async with get_async_session() as session:
+                result = await session.execute(queries.student_rows_by_siblings(count))
+                return [tuple(row[:-1]) for row in result]
+        except SQLAlchemyError as e:
+            raise ValueError(f"Ошибка при поиске студентов по количеству братьев или сестер: {e}")
+
+    @staticmethod
+    async def search_parent_rows_by_name(search_term):
+        queries.check_search_term(search_term)
+        try:
+            async with get_async_session() as session:
+                result = await session.execute(queries.parent_rows_by_name(search_term))
+                return [DBRequests._format_parent_row(row) for row in result]
+        except SQLAlchemyError as e:
+            raise ValueError(f"Ошибка при поиске родителей: {e}")
+
+    @staticmethod
+    async def search_parent_rows_by_income(minimum_income, maximum_income):
+        queries.check_income_range(minimum_income, maximum_income)
+        try:
+            async with get_async_session() as session:
+                result = await session.execute(queries.parent_rows_by_income(minimum_income, maximum_income))
+                return [DBRequests._format_parent_row(row) for row in result]
+        except SQLAlchemyError as e:
+            raise ValueError(f"Ошибка при поиске родителей по доходу: {e}")
+
+    @staticmethod
+    async def search_students_by_name(search_term):
+        queries.check_search_term(search_term)
+        try:
+            async with get_async_session() as session:
+                result = await session.execute(queries.students_by_name(search_term))
+                return result.unique().scalars().all()
+        except SQLAlchemyError as e:
+            raise ValueError(f"Ошибка при поиске студентов: {e}")
+
+    @staticmethod
+    async def delete_student_by_name(search_term):
+        queries.check_search_term(search_term)
+        try:
+            async with get_async_session() as session:
+                result = await session.execute(queries.students_by_name(search_term).limit(1))
+                student = result.unique().scalars().first()
+
+                if not student:
+                    raise ValueError("Студент не найден.")
+
+                await session.delete(student)
+                await session.commit()
+                DBRequests._students_count = None
+        except SQLAlchemyError as e:
+            raise ValueError(f"Ошибка при удалении студента: {e}")
+
+    @staticmethod
+    async def delete_parent_by_name(search_term):
+        queries.check_search_term(search_term)
+        try:
+            async with get_async_session() as session:
+                result = await session.execute(queries.parent_to_delete_by_name(search_term))
+                parent_to_delete = result.scalars().first()
+
+                if not parent_to_delete:
+                    raise ValueError("Родитель не найден.")
+
+                await session.delete(parent_to_delete)
+                await session.commit()
+                DBRequests._students_count = None
+                return parent_to_delete
+        except SQLAlchemyError as e:
+            raise ValueError(f"Ошибка при удалении родителя: {e}")
+
+    @staticmethod
+    async def search_parents_by_name(search_term):
+        queries.check_search_term(search_term)
+        try:
+            async with get_async_session() as session:
+                result = await session.execute(queries.parents_by_name(search_term))
+                return result.scalars().all()
+        except SQLAlchemyError as e:
+            raise ValueError(f"Ошибка при поиске родителей: {e}")
+
+    @staticmethod
+    async def search_by_count_of_brothers_or_sisters(count):
+        queries.check_count(count)
+        try:
+            async with get_async_session() as session:
+                result = await session.execute(queries.students_by_siblings(count))
+                return result.unique().scalars().all()
+        except SQLAlchemyError as e:
+            raise ValueError(f"Ошибка при поиске студентов по количеству братьев или сестер: {e}")
+
+    @staticmethod
+    async def delete_by_count_of_brothers_or_sisters(count):
+        queries.check_count(count)
+        try:
+            async with get_async_session() as session:
+                deleted = (await session.execute(queries.delete_students_by_siblings(count))).rowcount
+
+                if not deleted:
+                    raise ValueError("Нет студентов для удаления.")
+
+                await session.commit()
+                DBRequests._students_count = None
+                return deleted
+        except SQLAlchemyError as e:
+            raise ValueError(f"Ошибка при удалении студентов по количеству братьев или сестер: {e}")
+
+    @staticmethod
+    async def search_by_income_of_parents(minimum_income, maximum_income):
+        queries.check_income_range(minimum_income, maximum_income)
+        try:
+            async with get_async_session() as session:
+                result = await session.execute(queries.parents_by_income(minimum_income, maximum_income))
+                return result.scalars().all()
+        except SQLAlchemyError as e:
+            raise ValueError(f"Ошибка при поиске родителей по доходу: {e}")
+
+    @staticmethod
+    async def delete_by_income_of_parents(minimum_income=None, maximum_income=None):
+        queries.check_income_range(minimum_income, maximum_income)
+        try:
+            async with get_async_session() as session:
+                await session.execute(queries.delete_children_by_parents_income(minimum_income, maximum_income))
+                result = await session.execute(queries.delete_parents_by_income(minimum_income, maximum_income))
+
+                if not result.rowcount:
+                    raise ValueError("Нет записей для удаления.")
+
+                await session.commit()
+                DBRequests._students_count = None
+                return result.rowcount
+        except SQLAlchemyError as e:
+            raise ValueError(f"Ошибка при удалении по доходу: {e}")
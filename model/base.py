@@ -1,8 +1,88 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 
-from settings.config import DATABASE_URL
-
-engine = create_engine(DATABASE_URL, echo=True)
+import slow_query
+from metrics import metrics
+from settings import config
 
 Base = declarative_base()
+
+_engine = None
+_async_engine = None
+
+# асинхронные драйверы для URL без явно указанного async-драйвера
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+    "mysql": "aiomysql",
+}
+
+
+def get_engine_options(database_url):
+    url = make_url(database_url)
+    options = {
+        "echo": config.DB_ECHO,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+        "insertmanyvalues_page_size": config.DB_EXECUTEMANY_PAGE_SIZE,
+    }
+    connect_args = {}
+
+    # у SQLite свой пул соединений, параметры QueuePool к нему не применяются
+    if url.get_backend_name() != "sqlite":
+        options.update(
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+            pool_recycle=config.DB_POOL_RECYCLE,
+        )
+
+    if url.get_backend_name() == "postgresql":
+        if url.get_driver_name() == "psycopg2":
+            options["executemany_mode"] = "values_plus_batch"
+        if config.DB_STATEMENT_TIMEOUT_MS and url.get_driver_name() == "asyncpg":
+            connect_args["server_settings"] = {"statement_timeout": str(config.DB_STATEMENT_TIMEOUT_MS)}
+        elif config.DB_STATEMENT_TIMEOUT_MS:
+            connect_args["options"] = f"-c statement_timeout={config.DB_STATEMENT_TIMEOUT_MS}"
+    elif url.get_backend_name() == "mysql" and config.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["init_command"] = f"SET SESSION max_execution_time={config.DB_STATEMENT_TIMEOUT_MS}"
+
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        if not config.DATABASE_URL:
+            raise ValueError("Не задана переменная окружения DATABASE_URL")
+        _engine = create_engine(config.DATABASE_URL, **get_engine_options(config.DATABASE_URL))
+        metrics.instrument_engine(_engine)
+        slow_query.instrument_engine(_engine)
+    return _engine
+
+
+def get_async_database_url():
+    if config.ASYNC_DATABASE_URL:
+        return config.ASYNC_DATABASE_URL
+    if not config.DATABASE_URL:
+        raise ValueError("Не задана переменная окружения DATABASE_URL")
+    url = make_url(config.DATABASE_URL)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"Нет асинхронного драйвера для {url.get_backend_name()}")
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        # asyncio-расширение требует greenlet, поэтому импортируется только при использовании
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        database_url = get_async_database_url()
+        _async_engine = create_async_engine(database_url, **get_engine_options(database_url))
+        metrics.instrument_engine(_async_engine.sync_engine)
+        slow_query.instrument_engine(_async_engine.sync_engine)
+    return _async_engine
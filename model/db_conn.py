@@ -1,15 +1,15 @@
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 
 from sqlalchemy.orm import sessionmaker
 
-from base import engine
+from base import get_async_engine, get_engine
 
-Session = sessionmaker(bind=engine, expire_on_commit=False)
+Session = sessionmaker(expire_on_commit=False)
 
 
 @contextmanager
 def get_session():
-    session = Session()
+    session = Session(bind=get_engine())
     try:
         yield session
         session.commit()
@@ -18,3 +18,18 @@ def get_session():
         raise
     finally:
         session.close()
+
+
+@asynccontextmanager
+async def get_async_session():
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    session = AsyncSession(bind=get_async_engine(), expire_on_commit=False)
+    try:
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
@@ -1,223 +1,343 @@
+from sqlalchemy import insert
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import joinedload
 
 from db_conn import get_session
-from .models import Student, Parent
+from . import queries
+from .models import Student, Parent, parent_key
+
+KEYS_PER_QUERY = 500
 
 
 class DBRequests:
+    _students_count = None
 
     @staticmethod
     def add_student(first_name, middle_name, last_name, father: Parent, mother: Parent,
                     brothers_count: int = 0, sisters_count: int = 0):
         with get_session() as session:
             try:
-                session.add(father)
-                session.add(mother)
-                session.flush()  # id родителя
+                # уже существующие родители (например, у братьев и сестер) не дублируются
+                father_id, mother_id = DBRequests._resolve_parents(session, [
+                    DBRequests._parent_fields(father),
+                    DBRequests._parent_fields(mother)
+                ])
 
                 student = Student(
                     first_name=first_name,
                     middle_name=middle_name,
                     last_name=last_name,
-                    father_id=father.id,
-                    mother_id=mother.id,
+                    father_id=father_id,
+                    mother_id=mother_id,
                     brothers_count=brothers_count,
                     sisters_count=sisters_count
                 )
 
                 session.add(student)
                 session.commit()
+                DBRequests._students_count = None
                 return student
 
             except Exception as e:
                 session.rollback()
                 raise ValueError(f"Ошибка при добавлении: {str(e)}")
 
+    @staticmethod
+    def _parent_fields(parent: Parent):
+        return {"first_name": parent.first_name, "middle_name": parent.middle_name,
+                "last_name": parent.last_name, "income": parent.income, "gender": parent.gender}
+
+    @staticmethod
+    def _parent_key(parent):
+        return parent_key(parent["first_name"], parent["middle_name"], parent["last_name"],
+                          parent["income"], parent["gender"])
+
+    @staticmethod
+    def _key_batches(keys):
+        keys = sorted(set(keys))
+        for i in range(0, len(keys), KEYS_PER_QUERY):
+            yield keys[i:i + KEYS_PER_QUERY]
+
+    @staticmethod
+    def _missing_parents(keys, parents, ids):
+        # родители, которых нет ни в базе, ни раньше в этой же пачке
+        missing = {}
+        for key, parent in zip(keys, parents):
+            if key not in ids and key not in missing:
+                missing[key] = {**parent, "parent_key": key}
+        return missing
+
+    @staticmethod
+    def _insert_parents(session, missing):
+        dialect = session.get_bind().dialect
+        if dialect.insert_executemany_returning:
+            rows = session.execute(queries.insert_parents(dialect.name), list(missing.values()))
+            return {row.parent_key: row.id for row in rows}
+        # без RETURNING для executemany (MySQL) id получаются построчно
+        return {key: session.execute(insert(Parent), parent).inserted_primary_key[0]
+                for key, parent in missing.items()}
+
+    @staticmethod
+    def _select_parents(session, keys, ids):
+        for batch in DBRequests._key_batches(keys):
+            for row in session.execute(queries.parents_by_keys(batch)):
+                ids.setdefault(row.parent_key, row.id)
+
+    @staticmethod
+    def _resolve_parents(session, parents):
+        # id родителей в порядке parents; родитель с тем же ключом (ФИО, доход, пол)
+        # берется из базы по индексу parent_key, остальные добавляются одним запросом;
+        # AsyncDBRequests вызывает этот же код через AsyncSession.run_sync
+        keys = [DBRequests._parent_key(parent) for parent in parents]
+        ids = {}
+        DBRequests._select_parents(session, keys, ids)
+
+        missing = DBRequests._missing_parents(keys, parents, ids)
+        if missing:
+            ids.update(DBRequests._insert_parents(session, missing))
+            # пропущенные при вставке (их добавил параллельный импорт) читаются повторно
+            DBRequests._select_parents(session, [key for key in missing if key not in ids], ids)
+        return [ids[key] for key in keys]
+
+    @staticmethod
+    def add_students_bulk(students):
+        # students - словари с полями студента и словарями father/mother (None - родитель не указан);
+        # вся пачка добавляется в одной транзакции: сначала недостающие родители, затем студенты
+        if not students:
+            return 0
+        try:
+            with get_session() as session:
+                return DBRequests._add_students_bulk(session, students)
+        except SQLAlchemyError as e:
+            raise ValueError(f"Ошибка при массовом добавлении: {e}")
+
+    @staticmethod
+    def _add_students_bulk(session, students):
+        # общая часть DBRequests и AsyncDBRequests (через AsyncSession.run_sync)
+        parents = [
+            {**student[key], "gender": gender}
+            for student in students
+            for key, gender in (("father", "male"), ("mother", "female"))
+            if student.get(key) is not None
+        ]
+        parent_ids = iter(DBRequests._resolve_parents(session, parents) if parents else ())
+
+        rows = [{
+            "first_name": student["first_name"],
+            "middle_name": student["middle_name"],
+            "last_name": student["last_name"],
+            "father_id": next(parent_ids) if student.get("father") is not None else None,
+            "mother_id": next(parent_ids) if student.get("mother") is not None else None,
+            "brothers_count": student.get("brothers_count", 0),
+            "sisters_count": student.get("sisters_count", 0)
+        } for student in students]
+        session.execute(queries.insert_students(), rows)
+        DBRequests._students_count = None
+        return len(rows)
+
+    @staticmethod
+    def _format_student_row(row):
+        # строка проекции: 7 отображаемых колонок и id студента
+        return row[0], row[1], f"{row[2]:.2f}", row[3], f"{row[4]:.2f}", row[5], row[6]
+
+    @staticmethod
+    def _format_parent_row(row):
+        gender, full_name, income = row
+        if gender == "male":
+            return "-", full_name, income, "-", "-", "-", "-"
+        return "-", "-", "-", full_name, income, "-", "-"
+
     @staticmethod
     def get_query_of_students():
         try:
             with get_session() as session:
-                students = (
-                    session.query(Student)
-                    .options(joinedload(Student.father), joinedload(Student.mother))
-                    .all()
+                rows = session.execute(queries.student_rows()).all()
+                return [DBRequests._format_student_row(row) for row in rows]
+        except SQLAlchemyError as e:
+            raise ValueError(f"Ошибка при получении списка студентов: {e}")
+
+    @staticmethod
+    def iter_students_for_export(batch_size=1000):
+        # строки читаются пачками (курсор на стороне сервера, где он поддерживается),
+        # поэтому память не зависит от количества студентов
+        try:
+            with get_session() as session:
+                result = session.execute(
+                    queries.student_rows_for_export().execution_options(yield_per=batch_size)
                 )
+                for row in result:
+                    yield tuple(row[:-1])
+        except SQLAlchemyError as e:
+            raise ValueError(f"Ошибка при выгрузке студентов: {e}")
+
+    @staticmethod
+    def count_students(refresh=False):
+        if DBRequests._students_count is not None and not refresh:
+            return DBRequests._students_count
+        try:
+            with get_session() as session:
+                DBRequests._students_count = session.execute(queries.count_students()).scalar()
+                return DBRequests._students_count
+        except SQLAlchemyError as e:
+            raise ValueError(f"Ошибка при подсчете студентов: {e}")
 
-                data = []
-                for student in students:
-                    data.append((
-                        student.full_name,
-                        student.father.full_name if student.father else "Нет данных",
-                        f"{student.father.income:.2f}" if student.father else "0.00",
-                        student.mother.full_name if student.mother else "Нет данных",
-                        f"{student.mother.income:.2f}" if student.mother else "0.00",
-                        student.brothers_count,
-                        student.sisters_count
-                    ))
-                return data
+    @staticmethod
+    def get_page_of_students(after_id=None, offset=0, limit=10):
+        try:
+            with get_session() as session:
+                rows = session.execute(queries.student_rows_page(after_id, offset, limit)).all()
+                last_id = rows[-1][-1] if rows else after_id
+                return [DBRequests._format_student_row(row) for row in rows], last_id
         except SQLAlchemyError as e:
-            raise ValueError(f"Ошибка при получении списка студентов: {e}")
+            raise ValueError(f"Ошибка при получении страницы студентов: {e}")
+
+    @staticmethod
+    def search_student_rows_by_name(search_term):
+        queries.check_search_term(search_term)
+        try:
+            with get_session() as session:
+                rows = session.execute(queries.student_rows_by_name(search_term)).all()
+                return [tuple(row[:-1]) for row in rows]
+        except SQLAlchemyError as e:
+            raise ValueError(f"Ошибка при поиске студентов: {e}")
+
+    @staticmethod
+    def search_student_rows_by_siblings(count):
+        queries.check_count(count)
+        try:
+            with get_session() as session:
+                rows = session.execute(queries.student_rows_by_siblings(count)).all()
+                return [tuple(row[:-1]) for row in rows]
+        except SQLAlchemyError as e:
+            raise ValueError(f"Ошибка при поиске студентов по количеству братьев или сестер: {e}")
+
+    @staticmethod
+    def search_parent_rows_by_name(search_term):
+        queries.check_search_term(search_term)
+        try:
+            with get_session() as session:
+                rows = session.execute(queries.parent_rows_by_name(search_term)).all()
+                return [DBRequests._format_parent_row(row) for row in rows]
+        except SQLAlchemyError as e:
+            raise ValueError(f"Ошибка при поиске родителей: {e}")
+
+    @staticmethod
+    def search_parent_rows_by_income(minimum_income, maximum_income):
+        queries.check_income_range(minimum_income, maximum_income)
+        try:
+            with get_session() as session:
+                rows = session.execute(queries.parent_rows_by_income(minimum_income, maximum_income)).all()
+                return [DBRequests._format_parent_row(row) for row in rows]
+        except SQLAlchemyError as e:
+            raise ValueError(f"Ошибка при поиске родителей по доходу: {e}")
 
     @staticmethod
     def search_students_by_name(search_term):
-        if not search_term:
-            raise ValueError("Поисковой запрос не может быть пустым.")
-        try:
-            with get_session() as session:
-                students = session.query(Student).options(
-                    joinedload(Student.father),
-                    joinedload(Student.mother)
-                ).filter(
-                    (Student.first_name.ilike(f'%{search_term}%')) |
-                    (Student.middle_name.ilike(f'%{search_term}%')) |
-                    (Student.last_name.ilike(f'%{search_term}%'))
-                ).all()
+        queries.check_search_term(search_term)
+        try:
+            with get_session() as session:
+                students = session.execute(queries.students_by_name(search_term)).unique().scalars().all()
             return students
         except SQLAlchemyError as e:
             raise ValueError(f"Ошибка при поиске студентов: {e}")
 
     @staticmethod
     def delete_student_by_name(search_term):
-        if not search_term:
-            raise ValueError("Поисковой запрос не может быть пустым.")
+        queries.check_search_term(search_term)
         try:
             with get_session() as session:
-                student = session.query(Student).options(
-                    joinedload(Student.father),
-                    joinedload(Student.mother)
-                ).filter(
-                    (Student.first_name.ilike(f'%{search_term}%')) |
-                    (Student.middle_name.ilike(f'%{search_term}%')) |
-                    (Student.last_name.ilike(f'%{search_term}%'))
-                ).first()
+                student = session.execute(
+                    queries.students_by_name(search_term).limit(1)
+                ).unique().scalars().first()
 
                 if not student:
                     raise ValueError("Студент не найден.")
 
                 session.delete(student)
                 session.commit()
+                DBRequests._students_count = None
         except SQLAlchemyError as e:
             raise ValueError(f"Ошибка при удалении студента: {e}")
 
     @staticmethod
     def delete_parent_by_name(search_term):
-        if not search_term:
-            raise ValueError("Поисковой запрос не может быть пустым.")
+        queries.check_search_term(search_term)
         try:
             with get_session() as session:
-                parent_to_delete = session.query(Parent).filter(
-                    (Parent.first_name.ilike(f'%{search_term}%')) |
-                    (Parent.middle_name.ilike(f'%{search_term}%')) |
-                    (Parent.last_name.ilike(f'%{search_term}%'))
-                ).first()
+                parent_to_delete = session.execute(
+                    queries.parent_to_delete_by_name(search_term)
+                ).scalars().first()
 
                 if not parent_to_delete:
                     raise ValueError("Родитель не найден.")
 
                 session.delete(parent_to_delete)
                 session.commit()
+                DBRequests._students_count = None
                 return parent_to_delete
         except SQLAlchemyError as e:
             raise ValueError(f"Ошибка при удалении родителя: {e}")
 
     @staticmethod
     def search_parents_by_name(search_term):
-        if not search_term:
-            raise ValueError("Поисковой запрос не может быть пустым.")
+        queries.check_search_term(search_term)
         try:
             with get_session() as session:
-                parents = session.query(Parent).filter(
-                    (Parent.first_name.ilike(f'%{search_term}%')) |
-                    (Parent.middle_name.ilike(f'%{search_term}%')) |
-                    (Parent.last_name.ilike(f'%{search_term}%'))
-                ).all()
+                parents = session.execute(queries.parents_by_name(search_term)).scalars().all()
             return parents
         except SQLAlchemyError as e:
             raise ValueError(f"Ошибка при поиске родителей: {e}")
 
     @staticmethod
     def search_by_count_of_brothers_or_sisters(count):
-        if count is None:
-            raise ValueError("Количество не может быть None.")
+        queries.check_count(count)
         try:
             with get_session() as session:
-                students = session.query(Student).options(
-                    joinedload(Student.father),
-                    joinedload(Student.mother)
-                ).filter(
-                    (Student.brothers_count == count) |
-                    (Student.sisters_count == count)
-                ).all()
+                students = session.execute(queries.students_by_siblings(count)).unique().scalars().all()
             return students
         except SQLAlchemyError as e:
             raise ValueError(f"Ошибка при поиске студентов по количеству братьев или сестер: {e}")
 
     @staticmethod
     def delete_by_count_of_brothers_or_sisters(count):
-        if count is None:
-            raise ValueError("Количество не может быть None.")
+        queries.check_count(count)
         try:
             with get_session() as session:
-                students = session.query(Student).options(
-                    joinedload(Student.father),
-                    joinedload(Student.mother)
-                ).filter(
-                    (Student.brothers_count == count) |
-                    (Student.sisters_count == count)
-                ).all()
+                deleted = session.execute(queries.delete_students_by_siblings(count)).rowcount
 
-                if not students:
+                if not deleted:
                     raise ValueError("Нет студентов для удаления.")
 
-                for student in students:
-                    session.delete(student)
-
                 session.commit()
-                return len(students)
+                DBRequests._students_count = None
+                return deleted
         except SQLAlchemyError as e:
             raise ValueError(f"Ошибка при удалении студентов по количеству братьев или сестер: {e}")
 
     @staticmethod
     def search_by_income_of_parents(minimum_income, maximum_income):
-        if minimum_income is not None and maximum_income is not None and minimum_income > maximum_income:
-            raise ValueError("Минимальный доход не может быть больше максимального.")
+        queries.check_income_range(minimum_income, maximum_income)
         try:
             with get_session() as session:
-                query = session.query(Parent)
-
-                if minimum_income is not None:
-                    query = query.filter(Parent.income >= minimum_income)
-                if maximum_income is not None:
-                    query = query.filter(Parent.income <= maximum_income)
-
-                parents = query.all()
+                parents = session.execute(
+                    queries.parents_by_income(minimum_income, maximum_income)
+                ).scalars().all()
                 return parents
         except SQLAlchemyError as e:
             raise ValueError(f"Ошибка при поиске родителей по доходу: {e}")
 
     @staticmethod
     def delete_by_income_of_parents(minimum_income=None, maximum_income=None):
-        if minimum_income is not None and maximum_income is not None and minimum_income > maximum_income:
-            raise ValueError("Минимальный доход не может быть больше максимального.")
+        queries.check_income_range(minimum_income, maximum_income)
         try:
             with get_session() as session:
-                query = session.query(Parent)
-
-                if minimum_income is not None:
-                    query = query.filter(Parent.income >= minimum_income)
-                if maximum_income is not None:
-                    query = query.filter(Parent.income <= maximum_income)
+                session.execute(queries.delete_children_by_parents_income(minimum_income, maximum_income))
+                deleted = session.execute(queries.delete_parents_by_income(minimum_income, maximum_income)).rowcount
 
-                parents_to_delete = query.all()
-
-                if not parents_to_delete:
+                if not deleted:
                     raise ValueError("Нет записей для удаления.")
 
-                for parent in parents_to_delete:
-                    session.delete(parent)
-
                 session.commit()
-                return len(parents_to_delete)
+                DBRequests._students_count = None
+                return deleted
         except SQLAlchemyError as e:
             raise ValueError(f"Ошибка при удалении по доходу: {e}")
@@ -0,0 +1,145 @@
+import re
+from contextlib import contextmanager
+
+from sqlalchemy import DDL, Boolean, column, event, false, literal, literal_column, select, table
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement
+from sqlalchemy.sql.visitors import InternalTraversal
+
+NAME_COLUMNS = ("first_name", "middle_name", "last_name")
+
+# SQLite: FTS5 без собственной копии данных (content=''), индекс поддерживается триггерами.
+# unicode61 приводит кириллицу к нижнему регистру, но "ё" не заменяет - это делают триггеры
+# и построение запроса; prefix='2 3' ускоряет поиск по началу слова
+SQLITE_CREATE = """CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5(
+    first_name, middle_name, last_name,
+    content='', tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+)"""
+SQLITE_VALUES = ", ".join(f"replace(replace({{row}}.{name}, 'ё', 'е'), 'Ё', 'Е')" for name in NAME_COLUMNS)
+SQLITE_TRIGGERS = (
+    """CREATE TRIGGER IF NOT EXISTS {table}_fts_insert AFTER INSERT ON {table} BEGIN
+    INSERT INTO {table}_fts(rowid, first_name, middle_name, last_name)
+    VALUES (new.id, """ + SQLITE_VALUES.format(row="new") + """);
+END""",
+    # из contentless-таблицы строка удаляется командой 'delete' с теми же значениями, что были вставлены
+    """CREATE TRIGGER IF NOT EXISTS {table}_fts_delete AFTER DELETE ON {table} BEGIN
+    INSERT INTO {table}_fts({table}_fts, rowid, first_name, middle_name, last_name)
+    VALUES ('delete', old.id, """ + SQLITE_VALUES.format(row="old") + """);
+END""",
+    """CREATE TRIGGER IF NOT EXISTS {table}_fts_update AFTER UPDATE OF first_name, middle_name, last_name
+ON {table} BEGIN
+    INSERT INTO {table}_fts({table}_fts, rowid, first_name, middle_name, last_name)
+    VALUES ('delete', old.id, """ + SQLITE_VALUES.format(row="old") + """);
+    INSERT INTO {table}_fts(rowid, first_name, middle_name, last_name)
+    VALUES (new.id, """ + SQLITE_VALUES.format(row="new") + """);
+END""",
+)
+SQLITE_FILL = ("INSERT INTO {table}_fts(rowid, first_name, middle_name, last_name) "
+               "SELECT id, " + SQLITE_VALUES.format(row="{table}") + " FROM {table}")
+SQLITE_DROP = "DROP TABLE IF EXISTS {table}_fts"
+
+# PostgreSQL: GIN-индекс по выражению, обновляется вместе с таблицей без триггеров;
+# запрос должен содержать то же выражение, что и индекс
+POSTGRESQL_DOCUMENT = ("to_tsvector('simple'::regconfig, translate({first_name} || ' ' || {middle_name} || ' ' "
+                       "|| {last_name}, 'ёЁ', 'еЕ'))")
+POSTGRESQL_CREATE = "CREATE INDEX IF NOT EXISTS ix_{table}_fts ON {table} USING gin (" + POSTGRESQL_DOCUMENT.format(
+    first_name="first_name", middle_name="middle_name", last_name="last_name") + ")"
+
+
+def sqlite_statements(table_name):
+    return [SQLITE_CREATE.format(table=table_name)] + [
+        trigger.format(table=table_name) for trigger in SQLITE_TRIGGERS
+    ]
+
+
+def register(table_object):
+    # create_all/drop_all создают и удаляют полнотекстовый индекс вместе с таблицей
+    for statement in sqlite_statements(table_object.name):
+        event.listen(table_object, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    event.listen(table_object, "after_create",
+                 DDL(POSTGRESQL_CREATE.format(table=table_object.name)).execute_if(dialect="postgresql"))
+    # без этого после drop_all/create_all в индексе остались бы строки удаленной таблицы
+    event.listen(table_object, "before_drop",
+                 DDL(SQLITE_DROP.format(table=table_object.name)).execute_if(dialect="sqlite"))
+
+
+@contextmanager
+def bulk_load(connection, table_names):
+    # массовая вставка в пустые таблицы: индекс заполняется одним INSERT ... SELECT в конце,
+    # а не триггером на каждую строку; при ошибке DDL откатывается вместе с транзакцией.
+    # Удаляются все триггеры: 'delete' строки, которой еще нет в contentless-индексе, портит его
+    if connection.dialect.name != "sqlite":
+        yield
+        return
+    for table_name in table_names:
+        for suffix in ("insert", "delete", "update"):
+            connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {table_name}_fts_{suffix}")
+    yield
+    for table_name in table_names:
+        connection.exec_driver_sql(SQLITE_FILL.format(table=table_name))
+        for trigger in SQLITE_TRIGGERS:
+            connection.exec_driver_sql(trigger.format(table=table_name))
+
+
+def search_words(search_term):
+    return re.findall(r"\w+", search_term.lower().replace("ё", "е"))
+
+
+def like_matches(model, search_term):
+    return (
+        (model.first_name.ilike(f'%{search_term}%')) |
+        (model.middle_name.ilike(f'%{search_term}%')) |
+        (model.last_name.ilike(f'%{search_term}%'))
+    )
+
+
+class FullTextMatch(ColumnElement):
+    # ФИО содержит слова, начинающиеся со всех слов запроса, в любых колонках и в любом порядке;
+    # SQL зависит от диалекта, для остальных СУБД - прежний ilike
+    type = Boolean()
+    # условие, а не колонка: без этого SQLite получает "... = 1"
+    _is_implicitly_boolean = True
+    # строка поиска передается только параметрами, созданными здесь, а не при компиляции:
+    # в ключ кэша входят таблица и наличие слов, и скомпилированный запрос подходит для любой строки
+    inherit_cache = True
+    _traverse_internals = [
+        ("table", InternalTraversal.dp_clauseelement),
+        ("has_words", InternalTraversal.dp_boolean),
+        ("like", InternalTraversal.dp_clauseelement),
+        ("sqlite_query", InternalTraversal.dp_clauseelement),
+        ("postgresql_query", InternalTraversal.dp_clauseelement),
+    ]
+
+    def __init__(self, model, search_term):
+        words = search_words(search_term)
+        self.table = model.__table__
+        self.has_words = bool(words)
+        self.like = like_matches(model, search_term)
+        self.sqlite_query = literal(" AND ".join(f'"{word}"*' for word in words))
+        self.postgresql_query = literal(" & ".join(f"{word}:*" for word in words))
+
+
+@compiles(FullTextMatch)
+def _compile_like(element, compiler, **kw):
+    return compiler.process(element.like, **kw)
+
+
+@compiles(FullTextMatch, "sqlite")
+def _compile_sqlite(element, compiler, **kw):
+    if not element.has_words:
+        return compiler.process(false(), **kw)
+    fts_name = f"{element.table.name}_fts"
+    fts = table(fts_name, column("rowid"))
+    match = select(fts.c.rowid).where(literal_column(fts_name).op("MATCH")(element.sqlite_query))
+    return compiler.process(element.table.c.id.in_(match), **kw)
+
+
+@compiles(FullTextMatch, "postgresql")
+def _compile_postgresql(element, compiler, **kw):
+    if not element.has_words:
+        return compiler.process(false(), **kw)
+    document = POSTGRESQL_DOCUMENT.format(**{
+        name: compiler.process(element.table.c[name], **kw) for name in NAME_COLUMNS
+    })
+    query = compiler.process(element.postgresql_query, **kw)
+    return f"{document} @@ to_tsquery('simple'::regconfig, {query})"
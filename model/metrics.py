@@ -0,0 +1,159 @@
+import functools
+import json
+import re
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event
+
+from settings.config import METRICS_ENABLED, METRICS_SAMPLES
+
+# имя таблицы после FROM/INTO/UPDATE - операция SQL-запроса вида "sql.SELECT students"
+SQL_TABLE = re.compile(r'\b(?:FROM|INTO|UPDATE)\s+["`]?(\w+)', re.IGNORECASE)
+
+
+class Histogram:
+    def __init__(self, samples=METRICS_SAMPLES):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        # None - количество строк неизвестно (например, rowcount для SELECT)
+        self.rows = None
+        # перцентили считаются по последним замерам, память не растет со временем работы
+        self.samples = deque(maxlen=samples)
+
+    def add(self, seconds, rows=None, error=False):
+        self.count += 1
+        self.errors += error
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if rows is not None:
+            self.rows = (self.rows or 0) + rows
+        self.samples.append(seconds)
+
+    @staticmethod
+    def _percentile(ordered, percent):
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": self.total * 1000,
+            "p50_ms": self._percentile(ordered, 50) * 1000,
+            "p95_ms": self._percentile(ordered, 95) * 1000,
+            "p99_ms": self._percentile(ordered, 99) * 1000,
+            "max_ms": self.max * 1000,
+            "rows": self.rows,
+        }
+
+
+def _rows(result):
+    # количество строк результата: длина списка или число удаленных записей
+    if isinstance(result, (bool, str)):
+        return None
+    if isinstance(result, int):
+        return result
+    if hasattr(result, "__len__"):
+        return len(result)
+    return None
+
+
+class MetricsRegistry:
+    def __init__(self, enabled=METRICS_ENABLED, samples=METRICS_SAMPLES):
+        self.enabled = enabled
+        self.samples = samples
+        self._histograms = {}
+        # операции контроллера выполняются в фоновом потоке, окно читает из главного
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, rows=None, error=False):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(self.samples)
+            histogram.add(seconds, rows, error)
+
+    def timed(self, name):
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                # выключенный сбор - одна проверка флага на вызов
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    result = func(*args, **kwargs)
+                except Exception:
+                    self.record(name, time.perf_counter() - start, error=True)
+                    raise
+                self.record(name, time.perf_counter() - start, _rows(result))
+                return result
+            return wrapper
+        return decorator
+
+    def instrument(self, prefix, exclude=()):
+        # декоратор класса: замер всех публичных методов под именами "<prefix>.<метод>"
+        def decorator(cls):
+            for attribute, value in list(vars(cls).items()):
+                if attribute.startswith("_") or attribute in exclude:
+                    continue
+                if isinstance(value, staticmethod):
+                    setattr(cls, attribute, staticmethod(self.timed(f"{prefix}.{attribute}")(value.__func__)))
+                elif callable(value):
+                    setattr(cls, attribute, self.timed(f"{prefix}.{attribute}")(value))
+            return cls
+        return decorator
+
+    def instrument_engine(self, engine):
+        # время каждого SQL-запроса; для DML rowcount - количество затронутых строк
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if self.enabled:
+                conn.info.setdefault("metrics_start", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            starts = conn.info.get("metrics_start")
+            if not starts:
+                return
+            elapsed = time.perf_counter() - starts.pop()
+            rows = cursor.rowcount if cursor.rowcount >= 0 else None
+            self.record(self.sql_operation(statement), elapsed, rows)
+
+        @event.listens_for(engine, "handle_error")
+        def handle_error(context):
+            starts = context.connection.info.get("metrics_start") if context.connection is not None else None
+            if starts and context.statement:
+                self.record(self.sql_operation(context.statement), time.perf_counter() - starts.pop(), error=True)
+
+    @staticmethod
+    def sql_operation(statement):
+        verb = statement.split(None, 1)[0].upper() if statement.strip() else "SQL"
+        table = SQL_TABLE.search(statement)
+        return f"sql.{verb} {table.group(1)}" if table else f"sql.{verb}"
+
+    def snapshot(self):
+        with self._lock:
+            return {name: histogram.summary() for name, histogram in sorted(self._histograms.items())}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def export(self, file_path):
+        data = {
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "enabled": self.enabled,
+            "operations": self.snapshot(),
+        }
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+metrics = MetricsRegistry()
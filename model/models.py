@@ -1,20 +1,42 @@
-from sqlalchemy import Column, Integer, String, Numeric, ForeignKey
+from decimal import Decimal
+
+from sqlalchemy import Column, Integer, String, Numeric, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 
-from base import Base, engine
+from base import Base, get_engine
+from fulltext import register as register_fulltext
+
+
+def parent_key(first_name, middle_name, last_name, income, gender):
+    # нормализованные ФИО, доход до копеек и пол - по ключу находится уже существующий родитель;
+    # lower() в Python, т.к. lower() в SQLite не переводит кириллицу в нижний регистр
+    name = " ".join(f"{last_name} {first_name} {middle_name}".lower().replace("ё", "е").split())
+    return f"{name}|{Decimal(str(income)).quantize(Decimal('0.01'))}|{gender}"
+
+
+def _parent_key_default(context):
+    params = context.get_current_parameters()
+    return parent_key(params["first_name"], params["middle_name"], params["last_name"],
+                      params["income"], params["gender"])
 
 
 class Parent(Base):
     __tablename__ = 'parents'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    first_name = Column(String, nullable=False)
-    middle_name = Column(String, nullable=False)
-    last_name = Column(String, nullable=False)
-    income = Column(Numeric(12, 2), nullable=False)
+    first_name = Column(String, nullable=False, index=True)
+    middle_name = Column(String, nullable=False, index=True)
+    last_name = Column(String, nullable=False, index=True)
+    income = Column(Numeric(12, 2), nullable=False, index=True)
     gender = Column(String, nullable=False)
+    # уникальность не дает параллельным импортам добавить одного и того же родителя дважды
+    parent_key = Column(String, nullable=True, unique=True, index=True, default=_parent_key_default)
     extend_existing = True
 
+    __table_args__ = (
+        Index('ix_parents_last_name_lower', func.lower(last_name)),
+    )
+
     children_as_father = relationship(
         'Student',
         back_populates='father',
@@ -43,26 +65,28 @@ class Student(Base):
     __tablename__ = 'students'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    first_name = Column(String, nullable=False)
-    middle_name = Column(String, nullable=False)
-    last_name = Column(String, nullable=False)
-    father_id = Column(Integer, ForeignKey('parents.id'), nullable=True)
-    mother_id = Column(Integer, ForeignKey('parents.id'), nullable=True)
-    brothers_count = Column(Integer, default=0)
-    sisters_count = Column(Integer, default=0)
+    first_name = Column(String, nullable=False, index=True)
+    middle_name = Column(String, nullable=False, index=True)
+    last_name = Column(String, nullable=False, index=True)
+    father_id = Column(Integer, ForeignKey('parents.id'), nullable=True, index=True)
+    mother_id = Column(Integer, ForeignKey('parents.id'), nullable=True, index=True)
+    brothers_count = Column(Integer, default=0, index=True)
+    sisters_count = Column(Integer, default=0, index=True)
+
+    __table_args__ = (
+        Index('ix_students_last_name_lower', func.lower(last_name)),
+    )
 
     father = relationship(
         'Parent',
         foreign_keys=[father_id],
-        back_populates='children_as_father',
-        single_parent=True
+        back_populates='children_as_father'
     )
 
     mother = relationship(
         'Parent',
         foreign_keys=[mother_id],
-        back_populates='children_as_mother',
-        single_parent=True
+        back_populates='children_as_mother'
     )
 
     @property
@@ -103,5 +127,9 @@ class Student(Base):
         )
 
 
+register_fulltext(Parent.__table__)
+register_fulltext(Student.__table__)
+
+
 if __name__ == '__main__':
-    Base.metadata.create_all(engine)
+    Base.metadata.create_all(get_engine())
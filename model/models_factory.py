@@ -1,8 +1,21 @@
+import argparse
+import bisect
+import itertools
+import math
+import random
+import time
+
 import factory
 from factory.alchemy import SQLAlchemyModelFactory
+from faker.providers.person.ru_RU import Provider as RussianNames
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
 
-from db_conn import get_session
-from models import Parent, Student
+from base import Base, get_engine
+from fulltext import bulk_load
+from model.models import Parent, Student, parent_key
+from xml_manager import XMLManager
+from xml_models import XMLStudent
 
 
 class ParentFactory(SQLAlchemyModelFactory):
@@ -33,10 +46,229 @@ class StudentFactory(SQLAlchemyModelFactory):
     sisters_count = factory.Faker('random_int', min=0, max=5)
 
 
+# фамилии в мужской и женской форме (списки Faker выровнены по индексу)
+SURNAMES = list(zip(RussianNames.last_names_male, RussianNames.last_names_female))
+
+# имя отца и отчества его детей
+FATHER_NAMES = [
+    ("Александр", "Александрович", "Александровна"), ("Алексей", "Алексеевич", "Алексеевна"),
+    ("Андрей", "Андреевич", "Андреевна"), ("Антон", "Антонович", "Антоновна"),
+    ("Борис", "Борисович", "Борисовна"), ("Валерий", "Валерьевич", "Валерьевна"),
+    ("Василий", "Васильевич", "Васильевна"), ("Виктор", "Викторович", "Викторовна"),
+    ("Владимир", "Владимирович", "Владимировна"), ("Георгий", "Георгиевич", "Георгиевна"),
+    ("Григорий", "Григорьевич", "Григорьевна"), ("Денис", "Денисович", "Денисовна"),
+    ("Дмитрий", "Дмитриевич", "Дмитриевна"), ("Евгений", "Евгеньевич", "Евгеньевна"),
+    ("Иван", "Иванович", "Ивановна"), ("Игорь", "Игоревич", "Игоревна"),
+    ("Илья", "Ильич", "Ильинична"), ("Константин", "Константинович", "Константиновна"),
+    ("Максим", "Максимович", "Максимовна"), ("Михаил", "Михайлович", "Михайловна"),
+    ("Николай", "Николаевич", "Николаевна"), ("Олег", "Олегович", "Олеговна"),
+    ("Павел", "Павлович", "Павловна"), ("Петр", "Петрович", "Петровна"),
+    ("Роман", "Романович", "Романовна"), ("Сергей", "Сергеевич", "Сергеевна"),
+    ("Степан", "Степанович", "Степановна"), ("Федор", "Федорович", "Федоровна"),
+    ("Юрий", "Юрьевич", "Юрьевна"), ("Ярослав", "Ярославович", "Ярославовна"),
+]
+
+SEED_CHUNK_SIZE = 10000
+# дубликатов родителей в одном UPDATE ... CASE (по три параметра на каждого)
+MERGE_BATCH_SIZE = 500
+MAX_CHILDREN = 10
+
+
+class FamilyGenerator:
+    # детерминированный по seed поток семей: отец, мать и их дети-студенты;
+    # у детей общие фамилия и отчество, братья и сестры считаются по составу семьи
+    def __init__(self, seed=42, surnames=len(SURNAMES), surname_skew=1.0,
+                 income_median=60000, income_sigma=0.6, children_mean=0.5):
+        if not 1 <= surnames <= len(SURNAMES):
+            raise ValueError(f"Количество фамилий должно быть от 1 до {len(SURNAMES)}")
+        self.random = random.Random(seed)
+        self.surnames = SURNAMES[:surnames]
+        # распределение Ципфа: несколько частых фамилий и длинный хвост редких
+        self.surname_weights = list(itertools.accumulate(1 / rank ** surname_skew
+                                                         for rank in range(1, surnames + 1)))
+        self.income_mu = math.log(income_median)
+        self.income_sigma = income_sigma
+        # количество детей в семье: 1 + распределение Пуассона со средним children_mean
+        pmf = [math.exp(-children_mean) * children_mean ** k / math.factorial(k) for k in range(MAX_CHILDREN)]
+        self.children_weights = list(itertools.accumulate(pmf))
+
+    def _pick(self, items):
+        return items[int(self.random.random() * len(items))]
+
+    def _weighted(self, cum_weights):
+        return bisect.bisect(cum_weights, self.random.random() * cum_weights[-1])
+
+    def _income(self):
+        return round(self.random.lognormvariate(self.income_mu, self.income_sigma), 2)
+
+    def families(self, count):
+        # выдает (отец, мать, дети) до тех пор, пока не наберется count студентов;
+        # родитель - (фамилия, имя, отчество, доход), ребенок - (фамилия, имя, отчество, братья, сестры)
+        while count > 0:
+            male_surname, female_surname = self.surnames[self._weighted(self.surname_weights)]
+            father_name, son_middle_name, daughter_middle_name = self._pick(FATHER_NAMES)
+            father = (male_surname, father_name, self._pick(RussianNames.middle_names_male), self._income())
+            mother = (female_surname, self._pick(RussianNames.first_names_female),
+                      self._pick(RussianNames.middle_names_female), self._income())
+
+            sons = [self.random.random() < 0.5 for _ in range(1 + self._weighted(self.children_weights))]
+            # последняя семья обрезается до count детей, братья и сестры считаются по выданным
+            sons = sons[:count]
+            brothers = sum(sons)
+            sisters = len(sons) - brothers
+            children = [
+                (male_surname, self._pick(RussianNames.first_names_male), son_middle_name, brothers - 1, sisters)
+                if son else
+                (female_surname, self._pick(RussianNames.first_names_female), daughter_middle_name,
+                 brothers, sisters - 1)
+                for son in sons
+            ]
+            count -= len(children)
+            yield father, mother, children
+
+
+def _fio(person):
+    # ФИО в порядке data_xml: "Фамилия Имя Отчество"
+    return f"{person[0]} {person[1]} {person[2]}"
+
+
+def iter_xml_students(generator, count):
+    for father, mother, children in generator.families(count):
+        for child in children:
+            yield XMLStudent(
+                fio=_fio(child),
+                father_fio=_fio(father),
+                mother_fio=_fio(mother),
+                father_income=father[3],
+                mother_income=mother[3],
+                brother_count=child[3],
+                sister_count=child[4]
+            )
+
+
+def seed_xml(file_path, generator, count):
+    XMLManager(file_path).save_students(iter_xml_students(generator, count))
+    return count
+
+
+def _parent_row(parent_id, parent, gender):
+    last_name, first_name, middle_name, income = parent
+    return {"id": parent_id, "first_name": first_name, "middle_name": middle_name, "last_name": last_name,
+            "income": income, "gender": gender,
+            "parent_key": parent_key(first_name, middle_name, last_name, income, gender)}
+
+
+def _merge_duplicate_parents(connection):
+    # у сгенерированных родителей изредка совпадают ФИО, доход и пол, а parent_key уникален:
+    # повтор заменяется записью с наименьшим id, как в миграции b7e4d2a91c06
+    keepers = select(Parent.parent_key, func.min(Parent.id).label("keeper_id")).group_by(
+        Parent.parent_key).having(func.count() > 1).subquery()
+    duplicates = dict(connection.execute(
+        select(Parent.id, keepers.c.keeper_id).join(keepers, Parent.parent_key == keepers.c.parent_key)
+        .where(Parent.id != keepers.c.keeper_id)
+    ).all())
+    duplicate_ids = sorted(duplicates)
+    for i in range(0, len(duplicate_ids), MERGE_BATCH_SIZE):
+        batch = {duplicate_id: duplicates[duplicate_id] for duplicate_id in duplicate_ids[i:i + MERGE_BATCH_SIZE]}
+        for column in (Student.father_id, Student.mother_id):
+            connection.execute(update(Student).where(column.in_(batch)).values({column: case(batch, value=column)}))
+        connection.execute(delete(Parent).where(Parent.id.in_(batch)))
+    return len(duplicates)
+
+
+def seed_database(generator, count, chunk_size=SEED_CHUNK_SIZE, progress=None):
+    # запись без ORM: id назначаются заранее после максимальных в таблицах, строки вставляются
+    # пачками через executemany в одной транзакции
+    engine = get_engine()
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        parent_id = connection.execute(select(func.coalesce(func.max(Parent.id), 0))).scalar()
+        student_id = connection.execute(select(func.coalesce(func.max(Student.id), 0))).scalar()
+
+        # в пустые таблицы быстрее вставить без индексов и построить их в конце
+        fresh = parent_id == 0 and student_id == 0
+        if fresh:
+            indexes = [index for table in (Parent.__table__, Student.__table__) for index in table.indexes]
+        else:
+            # уникальный индекс по ключу не дал бы вставить повтор до слияния дубликатов
+            indexes = [index for index in Parent.__table__.indexes if index.unique]
+        for index in indexes:
+            index.drop(connection)
+        parents = []
+        students = []
+
+        def flush():
+            connection.execute(insert(Parent), parents)
+            connection.execute(insert(Student), students)
+            parents.clear()
+            students.clear()
+
+        with bulk_load(connection, [Parent.__tablename__, Student.__tablename__] if fresh else []):
+            for father, mother, children in generator.families(count):
+                parents.append(_parent_row(parent_id + 1, father, "male"))
+                parents.append(_parent_row(parent_id + 2, mother, "female"))
+                for last_name, first_name, middle_name, brothers, sisters in children:
+                    student_id += 1
+                    students.append({"id": student_id, "first_name": first_name, "middle_name": middle_name,
+                                     "last_name": last_name, "father_id": parent_id + 1,
+                                     "mother_id": parent_id + 2, "brothers_count": brothers,
+                                     "sisters_count": sisters})
+                parent_id += 2
+                if len(students) >= chunk_size:
+                    flush()
+                    if progress is not None:
+                        progress(student_id)
+            if students:
+                flush()
+            # до заполнения полнотекстового индекса, чтобы в нем не осталось удаленных родителей
+            _merge_duplicate_parents(connection)
+        for index in indexes:
+            index.create(connection)
+        if connection.dialect.name == "postgresql":
+            # id назначены явно, поэтому последовательности не сдвинулись, и следующий INSERT
+            # из приложения получил бы уже занятый id
+            for model in (Parent, Student):
+                connection.execute(select(func.setval(
+                    func.pg_get_serial_sequence(model.__tablename__, "id"), func.max(model.id))))
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Генерация тестовых студентов в базу данных или XML файл")
+    parser.add_argument("count", type=int, help="количество студентов")
+    parser.add_argument("--xml", metavar="FILE", help="записать в XML файл вместо базы данных")
+    parser.add_argument("--seed", type=int, default=42, help="одинаковый seed дает одинаковые данные")
+    parser.add_argument("--surnames", type=int, default=len(SURNAMES),
+                        help=f"количество разных фамилий (до {len(SURNAMES)})")
+    parser.add_argument("--surname-skew", type=float, default=1.0,
+                        help="показатель распределения Ципфа для фамилий, 0 - равномерно")
+    parser.add_argument("--income-median", type=float, default=60000, help="медиана дохода родителей")
+    parser.add_argument("--income-sigma", type=float, default=0.6,
+                        help="разброс логнормального распределения доходов")
+    parser.add_argument("--children-mean", type=float, default=0.5,
+                        help="среднее количество братьев и сестер в семье")
+    parser.add_argument("--chunk-size", type=int, default=SEED_CHUNK_SIZE,
+                        help="количество студентов в одном запросе к базе")
+    parser.add_argument("--quiet", action="store_true", help="не выводить прогресс")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+
+    def report(generated):
+        elapsed = time.perf_counter() - start
+        print(f"Записано {generated} студентов ({generated / elapsed:,.0f} студентов/с)", flush=True)
+
+    try:
+        generator = FamilyGenerator(args.seed, args.surnames, args.surname_skew,
+                                    args.income_median, args.income_sigma, args.children_mean)
+        if args.xml:
+            seed_xml(args.xml, generator, args.count)
+        else:
+            seed_database(generator, args.count, args.chunk_size, None if args.quiet else report)
+    except (ValueError, OSError, SQLAlchemyError) as e:
+        parser.exit(1, f"Ошибка генерации: {e}\n")
+    print(f"Готово: {args.count} студентов за {time.perf_counter() - start:.1f} с")
+
+
 if __name__ == "__main__":
-    with get_session() as session:
-        ParentFactory._meta.sqlalchemy_session = session
-        StudentFactory._meta.sqlalchemy_session = session
-        fathers = [ParentFactory() for _ in range(20)]
-        mothers = [ParentFactory() for _ in range(20)]
-        students = [StudentFactory(father=fathers[i], mother=mothers[i]) for i in range(20)]
+    main()
@@ -0,0 +1,193 @@
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import aliased, joinedload, selectinload
+
+from fulltext import FullTextMatch, like_matches
+from settings.config import SEARCH_BACKEND
+from .models import Student, Parent
+
+# построение запросов, общее для DBRequests и AsyncDBRequests
+
+
+def check_search_term(search_term):
+    if not search_term:
+        raise ValueError("Поисковой запрос не может быть пустым.")
+
+
+def check_count(count):
+    if count is None:
+        raise ValueError("Количество не может быть None.")
+
+
+def check_income_range(minimum_income, maximum_income):
+    if minimum_income is not None and maximum_income is not None and minimum_income > maximum_income:
+        raise ValueError("Минимальный доход не может быть больше максимального.")
+
+
+def _name_matches(model, search_term):
+    # "fts" - поиск слов по началу через полнотекстовый индекс, "like" - подстрока в любой из колонок
+    if SEARCH_BACKEND == "fts":
+        return FullTextMatch(model, search_term)
+    return like_matches(model, search_term)
+
+
+def _siblings_match(count):
+    return (Student.brothers_count == count) | (Student.sisters_count == count)
+
+
+def _income_conditions(minimum_income, maximum_income):
+    conditions = []
+    if minimum_income is not None:
+        conditions.append(Parent.income >= minimum_income)
+    if maximum_income is not None:
+        conditions.append(Parent.income <= maximum_income)
+    return conditions
+
+
+def students_with_parents():
+    return select(Student).options(joinedload(Student.father), joinedload(Student.mother))
+
+
+def count_students():
+    return select(func.count(Student.id))
+
+
+def students_page(after_id=None, offset=0, limit=10):
+    # after_id - ключ последней строки предыдущей страницы (keyset),
+    # offset используется только при переходе на страницу с неизвестным ключом
+    query = students_with_parents().order_by(Student.id)
+    if after_id is not None:
+        query = query.where(Student.id > after_id)
+    elif offset:
+        query = query.offset(offset)
+    return query.limit(limit)
+
+
+def students_by_name(search_term):
+    return students_with_parents().where(_name_matches(Student, search_term))
+
+
+def parents_by_name(search_term):
+    return select(Parent).where(_name_matches(Parent, search_term))
+
+
+def parent_to_delete_by_name(search_term):
+    # дети загружаются сразу: каскадное удаление не должно делать ленивых запросов
+    return parents_by_name(search_term).options(
+        selectinload(Parent.children_as_father),
+        selectinload(Parent.children_as_mother)
+    ).limit(1)
+
+
+def students_by_siblings(count):
+    return students_with_parents().where(_siblings_match(count))
+
+
+def delete_students_by_siblings(count):
+    return delete(Student).where(_siblings_match(count)).execution_options(synchronize_session=False)
+
+
+def parents_by_income(minimum_income, maximum_income):
+    return select(Parent).where(*_income_conditions(minimum_income, maximum_income))
+
+
+def delete_children_by_parents_income(minimum_income, maximum_income):
+    # каскад children_as_father/children_as_mother выполняется одним DELETE
+    parent_ids = select(Parent.id).where(*_income_conditions(minimum_income, maximum_income))
+    return delete(Student).where(
+        Student.father_id.in_(parent_ids) |
+        Student.mother_id.in_(parent_ids)
+    ).execution_options(synchronize_session=False)
+
+
+def delete_parents_by_income(minimum_income, maximum_income):
+    return delete(Parent).where(
+        *_income_conditions(minimum_income, maximum_income)
+    ).execution_options(synchronize_session=False)
+
+
+def parents_by_keys(keys):
+    return select(Parent.id, Parent.parent_key).where(Parent.parent_key.in_(keys))
+
+
+def insert_parents(dialect_name):
+    # строки сопоставляются по ключу родителя, поэтому порядок RETURNING не важен
+    # и вставка идет пачками даже в SQLite (insertmanyvalues без sort_by_parameter_order);
+    # родитель, которого успел добавить параллельный импорт, пропускается и не возвращается
+    dialect_insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(dialect_name)
+    if dialect_insert is None:
+        return insert(Parent).returning(Parent.id, Parent.parent_key)
+    return dialect_insert(Parent).on_conflict_do_nothing(
+        index_elements=[Parent.parent_key]
+    ).returning(Parent.id, Parent.parent_key)
+
+
+def insert_students():
+    return insert(Student)
+
+
+# проекции: только отображаемые колонки, ФИО склеиваются в SQL
+
+Father = aliased(Parent)
+Mother = aliased(Parent)
+
+
+def _full_name(model, last_name_first=False):
+    if last_name_first:
+        return model.last_name + " " + model.first_name + " " + model.middle_name
+    return model.first_name + " " + model.middle_name + " " + model.last_name
+
+
+def _student_columns(last_name_first, missing_parent="Нет данных"):
+    return select(
+        _full_name(Student, last_name_first),
+        func.coalesce(_full_name(Father, last_name_first), missing_parent),
+        func.coalesce(Father.income, 0),
+        func.coalesce(_full_name(Mother, last_name_first), missing_parent),
+        func.coalesce(Mother.income, 0),
+        Student.brothers_count,
+        Student.sisters_count,
+        Student.id
+    ).select_from(Student).outerjoin(
+        Father, Student.father_id == Father.id
+    ).outerjoin(
+        Mother, Student.mother_id == Mother.id
+    )
+
+
+def student_rows():
+    return _student_columns(last_name_first=False)
+
+
+def student_rows_page(after_id=None, offset=0, limit=10):
+    query = student_rows().order_by(Student.id)
+    if after_id is not None:
+        query = query.where(Student.id > after_id)
+    elif offset:
+        query = query.offset(offset)
+    return query.limit(limit)
+
+
+def student_rows_by_name(search_term):
+    return _student_columns(last_name_first=True).where(_name_matches(Student, search_term))
+
+
+def student_rows_by_siblings(count):
+    return _student_columns(last_name_first=True).where(_siblings_match(count))
+
+
+def student_rows_for_export():
+    # формат data_xml: "Фамилия Имя Отчество", отсутствующий родитель - пустая строка
+    return _student_columns(last_name_first=True, missing_parent="").order_by(Student.id)
+
+
+def _parent_columns():
+    return select(Parent.gender, _full_name(Parent, last_name_first=True), Parent.income)
+
+
+def parent_rows_by_name(search_term):
+    return _parent_columns().where(_name_matches(Parent, search_term))
+
+
+def parent_rows_by_income(minimum_income, maximum_income):
+    return _parent_columns().where(*_income_conditions(minimum_income, maximum_income))
@@ -0,0 +1,106 @@
+import logging
+import time
+from logging.handlers import RotatingFileHandler
+
+from sqlalchemy import event
+
+from settings.config import SLOW_QUERY_EXPLAIN, SLOW_QUERY_LOG, SLOW_QUERY_MS
+
+MAX_BYTES = 5 * 2 ** 20
+BACKUP_COUNT = 3
+# параметры executemany и длинные списки IN обрезаются
+MAX_PARAMS_LENGTH = 2000
+
+EXPLAIN_PREFIXES = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "postgresql": "EXPLAIN ",
+    "mysql": "EXPLAIN ",
+}
+# EXPLAIN без ANALYZE запрос не выполняет, но INSERT/DDL объяснять незачем
+EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE")
+EXPLAIN_SAVEPOINT = "slow_query_explain"
+
+logger = logging.getLogger("slow_query")
+
+
+def _get_logger(log_path):
+    if not logger.handlers:
+        handler = RotatingFileHandler(log_path, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        # в консоль (и в echo движка) медленные запросы не дублируются
+        logger.propagate = False
+    return logger
+
+
+def _format_params(parameters, executemany):
+    if executemany:
+        text = f"{len(parameters)} наборов, первый: {parameters[0]!r}" if parameters else "[]"
+    else:
+        text = repr(parameters)
+    return text if len(text) <= MAX_PARAMS_LENGTH else text[:MAX_PARAMS_LENGTH] + "..."
+
+
+def _explain(conn, prefix, statement, parameters):
+    # отдельный курсор DBAPI-соединения (для async-драйверов - адаптированный): события движка
+    # для EXPLAIN не вызываются, поэтому он сам не попадает в журнал и не замеряется;
+    # внутри транзакции EXPLAIN выполняется в точке сохранения: в PostgreSQL ошибка EXPLAIN
+    # иначе прерывает транзакцию приложения, и его следующий запрос тоже завершается ошибкой
+    explain_cursor = None
+    try:
+        explain_cursor = conn.connection.cursor()
+        savepoint = conn.in_transaction()
+        if savepoint:
+            explain_cursor.execute(f"SAVEPOINT {EXPLAIN_SAVEPOINT}")
+        try:
+            explain_cursor.execute(prefix + statement, parameters)
+            plan = explain_cursor.fetchall()
+        except Exception:
+            if savepoint:
+                explain_cursor.execute(f"ROLLBACK TO SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            raise
+        finally:
+            if savepoint:
+                explain_cursor.execute(f"RELEASE SAVEPOINT {EXPLAIN_SAVEPOINT}")
+        return "\n".join("  " + " | ".join(str(value) for value in row) for row in plan)
+    except Exception as e:
+        return f"  EXPLAIN не выполнен: {e}"
+    finally:
+        if explain_cursor is not None:
+            explain_cursor.close()
+
+
+def instrument_engine(engine, threshold_ms=SLOW_QUERY_MS, log_path=SLOW_QUERY_LOG, explain=SLOW_QUERY_EXPLAIN):
+    # запросы дольше threshold_ms пишутся в журнал с параметрами, временем и количеством строк
+    if threshold_ms is None:
+        return
+    log = _get_logger(log_path)
+    explain_prefix = EXPLAIN_PREFIXES.get(engine.dialect.name) if explain else None
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("slow_query_start")
+        if not starts:
+            return
+        elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+        if elapsed_ms < threshold_ms:
+            return
+
+        # для SELECT драйверы SQLite/MySQL не знают количество строк до их чтения - тогда оно не пишется
+        rows = f", строк: {cursor.rowcount}" if cursor.rowcount >= 0 else ""
+        message = (f"{elapsed_ms:.1f} ms{rows}\n{statement}\n"
+                   f"параметры: {_format_params(parameters, executemany)}")
+        if explain_prefix and not executemany and statement.lstrip().upper().startswith(EXPLAINABLE):
+            message += f"\nплан:\n{_explain(conn, explain_prefix, statement, parameters)}"
+        log.info(message)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        starts = context.connection.info.get("slow_query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
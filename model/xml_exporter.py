@@ -0,0 +1,62 @@
+import argparse
+import time
+
+from model.db_requests import DBRequests
+from settings.config import EXPORT_CHUNK_SIZE
+from xml_manager import XMLManager
+from xml_models import XMLStudent
+
+
+def iter_xml_students(chunk_size=EXPORT_CHUNK_SIZE):
+    for fio, father_fio, father_income, mother_fio, mother_income, brothers, sisters in \
+            DBRequests.iter_students_for_export(chunk_size):
+        yield XMLStudent(
+            fio=fio,
+            father_fio=father_fio,
+            mother_fio=mother_fio,
+            father_income=float(father_income),
+            mother_income=float(mother_income),
+            brother_count=brothers,
+            sister_count=sisters
+        )
+
+
+def export_xml(file_path, chunk_size=EXPORT_CHUNK_SIZE, progress=None):
+    # студенты пишутся в файл по мере чтения из базы, целиком в памяти не держатся
+    exported = 0
+
+    def students():
+        nonlocal exported
+        for student in iter_xml_students(chunk_size):
+            yield student
+            exported += 1
+            if progress is not None and exported % chunk_size == 0:
+                progress(exported)
+
+    XMLManager(file_path).save_students(students())
+    return exported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Выгрузка студентов из базы данных в XML файл")
+    parser.add_argument("file", help="XML файл в формате data_xml")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE,
+                        help="количество строк, читаемых из базы за раз")
+    parser.add_argument("--quiet", action="store_true", help="не выводить прогресс")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+
+    def report(exported):
+        elapsed = time.perf_counter() - start
+        print(f"Выгружено {exported} студентов ({exported / elapsed:,.0f} студентов/с)", flush=True)
+
+    try:
+        exported = export_xml(args.file, args.chunk_size, None if args.quiet else report)
+    except (ValueError, OSError) as e:
+        parser.exit(1, f"Ошибка выгрузки: {e}\n")
+    print(f"Готово: {exported} студентов за {time.perf_counter() - start:.1f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import argparse
+import time
+import xml.sax
+
+from model.db_requests import DBRequests
+from settings.config import IMPORT_CHUNK_SIZE
+from xml_manager import StudentsSAXHandler
+
+
+def split_fio(fio):
+    # в XML ФИО хранится как "Фамилия Имя Отчество"
+    parts = fio.split(maxsplit=2)
+    parts += [""] * (3 - len(parts))
+    last_name, first_name, middle_name = parts
+    return {"first_name": first_name, "middle_name": middle_name, "last_name": last_name}
+
+
+def _parent(fio, income):
+    if not fio.strip():
+        return None
+    return {**split_fio(fio), "income": income}
+
+
+def student_record(student):
+    return {
+        **split_fio(student.fio),
+        "father": _parent(student.father_fio, student.father_income),
+        "mother": _parent(student.mother_fio, student.mother_income),
+        "brothers_count": student.brother_count,
+        "sisters_count": student.sister_count
+    }
+
+
+class ChunkWriter:
+    # принимает студентов от StudentsSAXHandler вместо списка
+    # и записывает их в базу пачками, каждая пачка - отдельная транзакция
+    def __init__(self, chunk_size=IMPORT_CHUNK_SIZE, progress=None):
+        if chunk_size <= 0:
+            raise ValueError("Размер пачки должен быть положительным.")
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.chunk = []
+        self.imported = 0
+
+    def append(self, student):
+        self.chunk.append(student_record(student))
+        if len(self.chunk) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self.chunk:
+            return
+        self.imported += DBRequests.add_students_bulk(self.chunk)
+        self.chunk = []
+        if self.progress is not None:
+            self.progress(self.imported)
+
+
+def import_xml(file_path, chunk_size=IMPORT_CHUNK_SIZE, progress=None):
+    writer = ChunkWriter(chunk_size, progress)
+    parser = xml.sax.make_parser()
+    parser.setFeature(xml.sax.handler.feature_namespaces, 0)
+    parser.setContentHandler(StudentsSAXHandler(writer))
+    try:
+        with open(file_path, "rb") as f:
+            parser.parse(f)
+        writer.flush()
+    except (ValueError, OSError, xml.sax.SAXException) as e:
+        # уже записанные пачки остаются в базе
+        raise ValueError(f"Импорт прерван после {writer.imported} студентов: {e}")
+    return writer.imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Импорт студентов из XML файла в базу данных")
+    parser.add_argument("file", help="XML файл в формате data_xml")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE,
+                        help="количество студентов в одной транзакции")
+    parser.add_argument("--quiet", action="store_true", help="не выводить прогресс")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+
+    def report(imported):
+        elapsed = time.perf_counter() - start
+        print(f"Импортировано {imported} студентов ({imported / elapsed:,.0f} студентов/с)", flush=True)
+
+    try:
+        imported = import_xml(args.file, args.chunk_size, None if args.quiet else report)
+    except ValueError as e:
+        parser.exit(1, f"{e}\n")
+    print(f"Готово: {imported} студентов за {time.perf_counter() - start:.1f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+
+NGRAM_SIZE = 3
+# при удалении большего числа id массив пересобирается одним проходом вместо del по одному
+DISCARD_BY_SEARCH = 32
+
+
+def _ngrams(*texts):
+    return {text[i:i + NGRAM_SIZE] for text in texts for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+def _ids():
+    return array("I")
+
+
+def _contains(ids, row_id):
+    i = bisect_left(ids, row_id)
+    return i < len(ids) and ids[i] == row_id
+
+
+def _discard(ids, removed):
+    # ids - упорядоченный массив id, removed - множество; возвращает массив без removed
+    if len(removed) * DISCARD_BY_SEARCH < len(ids):
+        for row_id in removed:
+            i = bisect_left(ids, row_id)
+            if i < len(ids) and ids[i] == row_id:
+                del ids[i]
+        return ids
+    return array(ids.typecode, (row_id for row_id in ids if row_id not in removed))
+
+
+class NgramIndex:
+    # триграммы строк в нижнем регистре -> упорядоченный массив id строк (4 байта на вхождение)
+    def __init__(self):
+        self.postings = defaultdict(_ids)
+
+    def add(self, row_id, *texts):
+        # id выдаются по возрастанию, поэтому append сохраняет массивы упорядоченными
+        for gram in _ngrams(*(text.lower() for text in texts)):
+            self.postings[gram].append(row_id)
+
+    def remove(self, rows):
+        # rows - {id: строки, которые были добавлены с этим id}
+        removed = defaultdict(set)
+        for row_id, texts in rows.items():
+            for gram in _ngrams(*(text.lower() for text in texts)):
+                removed[gram].add(row_id)
+        for gram, row_ids in removed.items():
+            ids = _discard(self.postings[gram], row_ids)
+            if ids:
+                self.postings[gram] = ids
+            else:
+                del self.postings[gram]
+
+    def candidates(self, term):
+        # None - подстрока слишком короткая для индекса, нужен полный просмотр
+        grams = _ngrams(term.lower())
+        if not grams:
+            return None
+        postings = sorted((self.postings.get(gram, ()) for gram in grams), key=len)
+        result = postings[0]
+        for ids in postings[1:]:
+            if not result:
+                break
+            result = [row_id for row_id in result if _contains(ids, row_id)]
+        return list(result)
+
+
+class StudentsIndex:
+    # позиции студентов сдвигаются при удалении, поэтому индексы хранят постоянные id строк;
+    # live_ids - id студентов по порядку хранения, позиция студента - номер его id в live_ids
+    def __init__(self, students=()):
+        self.live_ids = _ids()
+        self.next_id = 0
+        self.by_siblings = defaultdict(_ids)
+        self.fio = NgramIndex()
+        self.parent_fio = NgramIndex()
+
+        incomes = []
+        for student in students:
+            row_id = self._add_fields(student)
+            incomes.append((student.father_income, row_id))
+            incomes.append((student.mother_income, row_id))
+        incomes.sort()
+        self.income_keys = array("d", (income for income, _ in incomes))
+        self.income_ids = array("I", (row_id for _, row_id in incomes))
+
+    def _add_fields(self, student):
+        row_id = self.next_id
+        self.next_id += 1
+        self.live_ids.append(row_id)
+        self.by_siblings[student.brother_count].append(row_id)
+        if student.sister_count != student.brother_count:
+            self.by_siblings[student.sister_count].append(row_id)
+        self.fio.add(row_id, student.fio)
+        self.parent_fio.add(row_id, student.father_fio, student.mother_fio)
+        return row_id
+
+    def add(self, student):
+        # студенты добавляются только в конец хранилища
+        row_id = self._add_fields(student)
+        for income in (student.father_income, student.mother_income):
+            i = bisect_right(self.income_keys, income)
+            self.income_keys.insert(i, income)
+            self.income_ids.insert(i, row_id)
+
+    def remove(self, positions, students):
+        # вызывается до удаления студентов из хранилища students
+        rows = {self.live_ids[position]: students[position] for position in set(positions)}
+        if not rows:
+            return
+        removed = set(rows)
+        self.fio.remove({row_id: (student.fio,) for row_id, student in rows.items()})
+        self.parent_fio.remove({row_id: (student.father_fio, student.mother_fio)
+                                for row_id, student in rows.items()})
+
+        counts = {count for student in rows.values() for count in (student.brother_count, student.sister_count)}
+        for count in counts:
+            ids = _discard(self.by_siblings[count], removed)
+            if ids:
+                self.by_siblings[count] = ids
+            else:
+                del self.by_siblings[count]
+
+        if len(removed) * DISCARD_BY_SEARCH < len(self.income_ids):
+            for row_id, student in rows.items():
+                for income in (student.father_income, student.mother_income):
+                    i = bisect_left(self.income_keys, income)
+                    while self.income_ids[i] != row_id:
+                        i += 1
+                    del self.income_keys[i]
+                    del self.income_ids[i]
+        else:
+            kept = [i for i, row_id in enumerate(self.income_ids) if row_id not in removed]
+            self.income_keys = array("d", (self.income_keys[i] for i in kept))
+            self.income_ids = array("I", (self.income_ids[i] for i in kept))
+
+        self.live_ids = _discard(self.live_ids, removed)
+
+    def _positions(self, ids):
+        # ids по возрастанию -> позиции по возрастанию
+        return [bisect_left(self.live_ids, row_id) for row_id in ids]
+
+    def by_fio(self, term):
+        ids = self.fio.candidates(term)
+        return None if ids is None else self._positions(ids)
+
+    def by_parent_fio(self, term):
+        ids = self.parent_fio.candidates(term)
+        return None if ids is None else self._positions(ids)
+
+    def by_count_of_siblings(self, count):
+        return self._positions(self.by_siblings.get(count, ()))
+
+    def by_income_range(self, min_income, max_income):
+        start = bisect_left(self.income_keys, min_income)
+        end = bisect_right(self.income_keys, max_income)
+        return self._positions(sorted(set(self.income_ids[start:end])))
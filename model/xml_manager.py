@@ -1,8 +1,32 @@
 import os
-import xml.dom.minidom
+import stat
+import tempfile
+import threading
 import xml.sax
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
 
-from xml_models import XMLStudent
+from metrics import metrics
+from settings.config import XML_PARSER, XML_STORAGE, XML_WRITE_DELAY
+from xml_index import StudentsIndex
+from xml_models import StudentColumns, XMLStudent, sibling_count
+
+STUDENT_TEMPLATE = (
+    "  <student>\n"
+    "    <fio>{fio}</fio>\n"
+    "    <father_fio>{father_fio}</father_fio>\n"
+    "    <mother_fio>{mother_fio}</mother_fio>\n"
+    "    <father_income>{father_income}</father_income>\n"
+    "    <mother_income>{mother_income}</mother_income>\n"
+    "    <brother_count>{brother_count}</brother_count>\n"
+    "    <sister_count>{sister_count}</sister_count>\n"
+    "  </student>\n"
+)
+
+
+def _escape(value):
+    # minidom дополнительно экранирует кавычки в тексте
+    return escape(str(value), {'"': "&quot;"})
 
 
 class XMLManager:
@@ -19,151 +43,320 @@ class XMLManager:
             if not os.path.exists(self.students_file):
                 self.save_students([])
 
+    @metrics.timed("xml.save")
     def save_students(self, students):
-        doc = xml.dom.minidom.Document()
-        root = doc.createElement("students")
-        doc.appendChild(root)
+        # запись во временный файл рядом с целевым и атомарная подмена через os.replace,
+        # чтобы при сбое на диске не оставался обрезанный файл
+        directory = os.path.dirname(os.path.abspath(self.students_file))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".students_", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                written = self._write_students(f, students)
+                f.flush()
+                os.fsync(f.fileno())
+            if os.path.exists(self.students_file):
+                os.chmod(tmp_path, stat.S_IMODE(os.stat(self.students_file).st_mode))
+            else:
+                os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.students_file)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return written
 
+    @staticmethod
+    def _write_students(f, students):
+        # запись по одному студенту, без построения DOM-дерева в памяти;
+        # разметка совпадает с Document.writexml(indent="", addindent="  ", newl="\n")
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n')
+        written = 0
         for student in students:
-            student_elem = doc.createElement("student")
+            if not written:
+                f.write("<students>\n")
+            written += 1
+            f.write(STUDENT_TEMPLATE.format(
+                fio=_escape(student.fio),
+                father_fio=_escape(student.father_fio),
+                mother_fio=_escape(student.mother_fio),
+                father_income=_escape(student.father_income),
+                mother_income=_escape(student.mother_income),
+                brother_count=_escape(student.brother_count),
+                sister_count=_escape(student.sister_count)
+            ))
+        f.write("</students>\n" if written else "<students/>\n")
+        return written
 
-            def add_text_elem(parent, tag, value):
-                elem = doc.createElement(tag)
-                elem.appendChild(doc.createTextNode(str(value)))
-                parent.appendChild(elem)
 
-            add_text_elem(student_elem, "fio", student.fio)
-            add_text_elem(student_elem, "father_fio", student.father_fio)
-            add_text_elem(student_elem, "mother_fio", student.mother_fio)
-            add_text_elem(student_elem, "father_income", student.father_income)
-            add_text_elem(student_elem, "mother_income", student.mother_income)
-            add_text_elem(student_elem, "brother_count", student.brother_count)
-            add_text_elem(student_elem, "sister_count", student.sister_count)
+STUDENT_FIELDS = {
+    "fio": str,
+    "father_fio": str,
+    "mother_fio": str,
+    "father_income": float,
+    "mother_income": float,
+    # при загрузке проверяются для любого способа хранения, а не только для колонок
+    "brother_count": sibling_count,
+    "sister_count": sibling_count,
+}
 
-            root.appendChild(student_elem)
-
-        with open(self.students_file, 'w', encoding='utf-8') as f:
-            doc.writexml(f, indent="", addindent="  ", newl="\n", encoding="utf-8")
+STUDENT_DEFAULTS = {
+    "fio": "", "father_fio": "", "mother_fio": "",
+    "father_income": 0, "mother_income": 0,
+    "brother_count": 0, "sister_count": 0,
+}
 
 
 class StudentsSAXHandler(xml.sax.ContentHandler):
-    def __init__(self):
-        self.students = []
-        self.current_data = ""
-        self.current_student = None
-        self.content = ""
+    def __init__(self, students=None):
+        self.students = [] if students is None else students
+        self.fields = None
+        self.buffer = []
 
     def startElement(self, tag, _):
-        self.current_data = tag
         if tag == "student":
-            self.current_student = XMLStudent(
-                fio="", father_fio="", mother_fio="",
-                father_income=0, mother_income=0,
-                brother_count=0, sister_count=0
-            )
+            self.fields = {}
+        self.buffer.clear()
 
     def endElement(self, tag):
-        if self.current_student is None:
+        if self.fields is None:
             return
 
-        if tag == "fio":
-            self.current_student.fio = self.content
-        elif tag == "father_fio":
-            self.current_student.father_fio = self.content
-        elif tag == "mother_fio":
-            self.current_student.mother_fio = self.content
-        elif tag == "father_income":
-            self.current_student.father_income = float(self.content)
-        elif tag == "mother_income":
-            self.current_student.mother_income = float(self.content)
-        elif tag == "brother_count":
-            self.current_student.brother_count = int(self.content)
-        elif tag == "sister_count":
-            self.current_student.sister_count = int(self.content)
+        convert = STUDENT_FIELDS.get(tag)
+        if convert is not None:
+            self.fields[tag] = convert("".join(self.buffer).strip())
         elif tag == "student":
-            self.students.append(self.current_student)
+            self.students.append(XMLStudent(**{**STUDENT_DEFAULTS, **self.fields}))
+            self.fields = None
 
-        self.content = ""
+        self.buffer.clear()
 
     def characters(self, content):
-        self.content += content.strip()
+        # текст узла может приходить несколькими кусками
+        self.buffer.append(content)
+
+
+@metrics.timed("xml.parse.sax")
+def load_with_sax(file_path, students=None):
+    handler = StudentsSAXHandler(students)
+    parser = xml.sax.make_parser()
+    parser.setFeature(xml.sax.handler.feature_namespaces, 0)
+    parser.setContentHandler(handler)
+    parser.parse(file_path)
+    return handler.students
+
+
+@metrics.timed("xml.parse.iterparse")
+def load_with_iterparse(file_path, students=None):
+    students = [] if students is None else students
+    context = ElementTree.iterparse(file_path, events=("start", "end"))
+    _, root = next(context)
+    for event, elem in context:
+        if event != "end" or elem.tag != "student":
+            continue
+        fields = dict(STUDENT_DEFAULTS)
+        for child in elem:
+            convert = STUDENT_FIELDS.get(child.tag)
+            if convert is not None:
+                fields[child.tag] = convert((child.text or "").strip())
+        students.append(XMLStudent(**fields))
+        # разобранные элементы больше не нужны
+        root.clear()
+    return students
+
+
+LOADERS = {
+    "sax": load_with_sax,
+    "iterparse": load_with_iterparse,
+}
 
 
 class StudentsModel:
-    def __init__(self, xml_manager):
+    def __init__(self, xml_manager, write_delay=XML_WRITE_DELAY, parser=XML_PARSER, storage=XML_STORAGE):
+        if storage not in ("objects", "columnar"):
+            raise ValueError(f"Неизвестный способ хранения: {storage}")
+        self.storage = storage
         self.students = []
         self.xml_manager = xml_manager
+        self.parser = parser
+        self.write_delay = write_delay
+        self._dirty = False
+        self._flush_timer = None
+        self._flush_error = None
+        self._state_lock = threading.Lock()
+        self._write_lock = threading.Lock()
 
-    def load_students(self, file_path):
-        handler = StudentsSAXHandler()
-        parser = xml.sax.make_parser()
-        parser.setFeature(xml.sax.handler.feature_namespaces, 0)
-        parser.setContentHandler(handler)
-        parser.parse(file_path)
-        self.students = handler.students
+    def load_students(self, file_path, parser=None):
+        loader = LOADERS.get(parser or self.parser)
+        if loader is None:
+            raise ValueError(f"Неизвестный XML парсер: {parser or self.parser}")
+        self.flush()
+        # индекс строится при первом поиске
+        self.students = loader(file_path, self._new_storage())
         self.xml_manager.set_file(file_path)
         return self.students
 
+    @property
+    def students(self):
+        return self._students
+
+    @students.setter
+    def students(self, students):
+        if self.storage == "columnar" and not isinstance(students, StudentColumns):
+            students = StudentColumns(students)
+        self._students = students
+        # индекс перестраивается при следующем поиске
+        self._index = None
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = StudentsIndex(self.students)
+        return self._index
+
+    def _at(self, positions):
+        students = self.students
+        return [students[position] for position in positions]
+
+    def _delete_positions(self, positions):
+        positions = set(positions)
+        if positions:
+            index = self._index
+            if index is not None:
+                index.remove(positions, self.students)
+            self.students = [s for i, s in enumerate(self.students) if i not in positions]
+            # индекс уже обновлен, перестраивать его не нужно
+            self._index = index
+            self.mark_dirty()
+        return len(positions)
+
+    def _new_storage(self):
+        return StudentColumns() if self.storage == "columnar" else []
+
     def save_students(self):
-        self.xml_manager.save_students(self.students)
+        with self._write_lock:
+            self.xml_manager.save_students(self.students)
+
+    def mark_dirty(self):
+        # изменения копятся и записываются одним файлом в фоновом потоке
+        if self.write_delay <= 0:
+            self.save_students()
+            return
+        with self._state_lock:
+            self._dirty = True
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.write_delay, self._background_flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def flush(self):
+        with self._state_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._dirty:
+                return
+            # флаг снимается до записи: изменения, сделанные во время нее, запишутся следующим flush
+            self._dirty = False
+            students = self.students.copy()
+        try:
+            with self._write_lock:
+                self.xml_manager.save_students(students)
+        except Exception:
+            # файл не записан - изменения сохранятся при следующем flush (например, при закрытии)
+            with self._state_lock:
+                self._dirty = True
+            raise
+
+    def _background_flush(self):
+        # в потоке таймера исключение было бы потеряно, его забирает интерфейс через pop_flush_error
+        try:
+            self.flush()
+        except Exception as e:
+            with self._state_lock:
+                self._flush_error = e
+
+    def pop_flush_error(self):
+        with self._state_lock:
+            error, self._flush_error = self._flush_error, None
+        return error
 
     def add_student(self, student_data):
         student = XMLStudent(**student_data)
         self.students.append(student)
-        self.save_students()
+        if self._index is not None:
+            self._index.add(student)
+        self.mark_dirty()
+
+    def add_students(self, students_data):
+        # пачка студентов - одна отложенная запись файла
+        start = len(self.students)
+        self.students.extend(XMLStudent(**data) for data in students_data)
+        if self._index is not None:
+            for position in range(start, len(self.students)):
+                self._index.add(self.students[position])
+        if len(self.students) > start:
+            self.mark_dirty()
+
+    def _find_by_fio(self, fio_part):
+        term = fio_part.lower()
+        positions = self.index.by_fio(term)
+        if positions is None:
+            positions = range(len(self.students))
+        return [p for p in positions if term in self.students[p].fio.lower()]
+
+    def _find_by_parent_fio(self, fio_part):
+        term = fio_part.lower()
+        positions = self.index.by_parent_fio(term)
+        if positions is None:
+            positions = range(len(self.students))
+        result = []
+        for position in positions:
+            student = self.students[position]
+            if term in student.father_fio.lower() or term in student.mother_fio.lower():
+                result.append(position)
+        return result
 
     def search_by_fio(self, fio_part: str):
-        return [s for s in self.students if fio_part.lower() in s.fio.lower()]
+        return self._at(self._find_by_fio(fio_part))
 
     def search_by_parent_name(self, last_name: str):
+        last_name = last_name.lower()
+        # у студента с одним родителем ФИО второго - пустая строка
         return [
-            s for s in self.students
-            if last_name.lower() in s.father_fio.lower().split()[0] or
-               last_name.lower() in s.mother_fio.lower().split()[0]
+            s for s in self._at(self._find_by_parent_fio(last_name))
+            if last_name in (s.father_fio.lower().split() or [""])[0] or
+               last_name in (s.mother_fio.lower().split() or [""])[0]
         ]
 
     def search_by_count_of_brothers_or_sisters(self, count):
-        count = int(count)
-        return [s for s in self.students if s.brother_count == count or s.sister_count == count]
+        return self._at(self.index.by_count_of_siblings(int(count)))
 
     def search_by_income_parents(self, income_part):
         income_part = float(income_part)
-        return [
-            s for s in self.students
-            if s.father_income == income_part or s.mother_income == income_part
-        ]
+        return self._at(self.index.by_income_range(income_part, income_part))
+
+    def search_by_income_range(self, min_income, max_income):
+        return self._at(self.index.by_income_range(float(min_income), float(max_income)))
 
     def delete_by_count_of_brothers_or_sisters(self, count):
-        count = int(count)
-        before = len(self.students)
-        self.students = [
-            s for s in self.students
-            if s.brother_count != count and s.sister_count != count
-        ]
-        deleted = before - len(self.students)
-        if deleted > 0:
-            self.save_students()
-        return deleted
+        return self._delete_positions(self.index.by_count_of_siblings(int(count)))
+
+    def delete_by_fio_part(self, fio_part):
+        return self._delete_positions(self._find_by_fio(fio_part))
+
+    def delete_by_parent_fio_part(self, fio_part):
+        return self._delete_positions(self._find_by_parent_fio(fio_part))
 
     def delete_student_by_fio(self, index):
         index = int(index)
         if 0 <= index < len(self.students):
+            if self._index is not None:
+                self._index.remove([index], self.students)
             del self.students[index]
-            self.save_students()
+            self.mark_dirty()
             return f"Студент с индексом {index} удален."
         else:
             return "Ошибка: неверный индекс."
 
     def delete_by_income_parents(self, min_income: float, max_income: float):
-        min_income = float(min_income)
-        max_income = float(max_income)
-        before = len(self.students)
-        self.students = [
-            s for s in self.students
-            if not (min_income <= s.father_income <= max_income) and
-               not (min_income <= s.mother_income <= max_income)
-        ]
-        deleted = before - len(self.students)
-        if deleted > 0:
-            self.save_students()
-        return deleted
+        return self._delete_positions(self.index.by_income_range(float(min_income), float(max_income)))
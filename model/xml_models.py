@@ -1,4 +1,29 @@
+import sys
+from array import array
+from collections.abc import Sequence
+
+# количества братьев и сестер хранятся в array('H')
+MAX_SIBLINGS_COUNT = 2 ** 16 - 1
+
+
+def sibling_count(value):
+    count = int(value)
+    if not 0 <= count <= MAX_SIBLINGS_COUNT:
+        raise ValueError(f"Количество братьев или сестер должно быть от 0 до {MAX_SIBLINGS_COUNT}: {value}")
+    return count
+
+
 class XMLStudent:
+    __slots__ = (
+        "fio",
+        "father_fio",
+        "mother_fio",
+        "father_income",
+        "mother_income",
+        "brother_count",
+        "sister_count",
+    )
+
     def __init__(self,
                  fio,
                  father_fio,
@@ -15,3 +40,56 @@ class XMLStudent:
         self.mother_income = float(mother_income)
         self.brother_count = int(brother_count)
         self.sister_count = int(sister_count)
+
+
+class StudentColumns(Sequence):
+    # колонночное хранение: доходы и количества в array, ФИО - интернированные строки;
+    # при обращении возвращаются объекты XMLStudent, собранные из колонок
+    def __init__(self, students=()):
+        self.fio = []
+        self.father_fio = []
+        self.mother_fio = []
+        self.father_income = array('d')
+        self.mother_income = array('d')
+        self.brother_count = array('H')
+        self.sister_count = array('H')
+        self.extend(students)
+
+    def _columns(self):
+        return (self.fio, self.father_fio, self.mother_fio, self.father_income,
+                self.mother_income, self.brother_count, self.sister_count)
+
+    def append(self, student):
+        self.fio.append(sys.intern(student.fio))
+        self.father_fio.append(sys.intern(student.father_fio))
+        self.mother_fio.append(sys.intern(student.mother_fio))
+        self.father_income.append(student.father_income)
+        self.mother_income.append(student.mother_income)
+        self.brother_count.append(student.brother_count)
+        self.sister_count.append(student.sister_count)
+
+    def extend(self, students):
+        for student in students:
+            self.append(student)
+
+    def copy(self):
+        columns = StudentColumns()
+        for target, source in zip(columns._columns(), self._columns()):
+            target.extend(source)
+        return columns
+
+    def __len__(self):
+        return len(self.fio)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return XMLStudent(*(column[index] for column in self._columns()))
+
+    def __delitem__(self, index):
+        for column in self._columns():
+            del column[index]
+
+    def __iter__(self):
+        for values in zip(*self._columns()):
+            yield XMLStudent(*values)
@@ -3,4 +3,62 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+
+def _get_bool(name, default=False):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _get_int(name, default=None):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
 DATABASE_URL = (os.getenv('DATABASE_URL'))
+# по умолчанию выводится из DATABASE_URL заменой драйвера (sqlite+aiosqlite, postgresql+asyncpg)
+ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL')
+
+# "debug" дополнительно выводит строки результатов, любое другое истинное значение - только SQL
+DB_ECHO = "debug" if os.getenv('DB_ECHO', '').lower() == "debug" else _get_bool('DB_ECHO')
+DB_POOL_SIZE = _get_int('DB_POOL_SIZE', 5)
+DB_MAX_OVERFLOW = _get_int('DB_MAX_OVERFLOW', 10)
+DB_POOL_TIMEOUT = _get_int('DB_POOL_TIMEOUT', 30)
+DB_POOL_RECYCLE = _get_int('DB_POOL_RECYCLE', -1)
+DB_POOL_PRE_PING = _get_bool('DB_POOL_PRE_PING', True)
+DB_STATEMENT_TIMEOUT_MS = _get_int('DB_STATEMENT_TIMEOUT_MS')
+DB_EXECUTEMANY_PAGE_SIZE = _get_int('DB_EXECUTEMANY_PAGE_SIZE', 1000)
+
+# задержка отложенной записи XML-файла в секундах, 0 - запись сразу после каждого изменения
+XML_WRITE_DELAY = float(os.getenv('XML_WRITE_DELAY', '1.0'))
+
+# "sax" или "iterparse"
+XML_PARSER = os.getenv('XML_PARSER', 'iterparse')
+
+# "objects" - список XMLStudent, "columnar" - колонки array/интернированные строки
+XML_STORAGE = os.getenv('XML_STORAGE', 'objects')
+
+# количество студентов в одной транзакции при импорте XML в базу данных
+IMPORT_CHUNK_SIZE = _get_int('IMPORT_CHUNK_SIZE', 5000)
+
+# количество строк, читаемых из базы данных за раз при выгрузке в XML
+EXPORT_CHUNK_SIZE = _get_int('EXPORT_CHUNK_SIZE', 1000)
+
+# количество запоминаемых результатов поиска, 0 - без кэширования
+SEARCH_CACHE_SIZE = _get_int('SEARCH_CACHE_SIZE', 128)
+
+# сбор времени выполнения операций контроллера, SQL-запросов и разбора/записи XML
+METRICS_ENABLED = _get_bool('METRICS_ENABLED', True)
+# количество последних замеров каждой операции, по которым считаются перцентили
+METRICS_SAMPLES = _get_int('METRICS_SAMPLES', 1000)
+
+# запросы дольше SLOW_QUERY_MS миллисекунд пишутся в SLOW_QUERY_LOG (без значения - журнал выключен);
+# SLOW_QUERY_EXPLAIN добавляет к записи план запроса (EXPLAIN / EXPLAIN QUERY PLAN)
+SLOW_QUERY_MS = _get_int('SLOW_QUERY_MS')
+SLOW_QUERY_LOG = os.getenv('SLOW_QUERY_LOG', 'slow_queries.log')
+SLOW_QUERY_EXPLAIN = _get_bool('SLOW_QUERY_EXPLAIN')
+
+# поиск по ФИО в базе данных: "like" - подстрока (ilike), "fts" - полнотекстовый индекс
+# (FTS5 в SQLite, tsvector + GIN в PostgreSQL), ищет слова по началу
+SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', 'like')
@@ -0,0 +1,29 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# как в benchmarks/common.py: корень первым, затем model/, views/, controllers/;
+# pytest уже добавляет корень в sys.path, поэтому пути переставляются в начало
+for path in (os.path.join(ROOT, "controllers"), os.path.join(ROOT, "views"), os.path.join(ROOT, "model"), ROOT):
+    if path in sys.path:
+        sys.path.remove(path)
+    sys.path.insert(0, path)
+
+# DATABASE_URL должен быть задан до импорта model.base
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="students_tests_"), "test.db")
+
+
+@pytest.fixture
+def database():
+    # пустые таблицы на время теста
+    from base import Base, get_engine
+
+    engine = get_engine()
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
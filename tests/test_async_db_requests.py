@@ -0,0 +1,39 @@
+import asyncio
+
+from sqlalchemy import func, select
+
+from model.async_db_requests import AsyncDBRequests
+from model.db_requests import DBRequests
+from model.models import Parent
+
+
+def parent(last_name, first_name, middle_name, income):
+    return {"first_name": first_name, "middle_name": middle_name, "last_name": last_name, "income": income}
+
+
+def student(last_name, first_name, middle_name, father=None, mother=None):
+    return {"first_name": first_name, "middle_name": middle_name, "last_name": last_name,
+            "father": father, "mother": mother, "brothers_count": 0, "sisters_count": 0}
+
+
+async def export_rows():
+    return [row async for row in AsyncDBRequests.iter_students_for_export(batch_size=2)]
+
+
+def test_async_bulk_add_and_export_match_sync(database):
+    father = parent("Петров", "Иван", "Иванович", 50000)
+    mother = parent("Петрова", "Анна", "Сергеевна", 42000)
+    # родители, добавленные синхронным репозиторием, находятся асинхронным и не дублируются
+    DBRequests.add_students_bulk([student("Петров", "Пётр", "Иванович", father, mother)])
+    assert asyncio.run(AsyncDBRequests.add_students_bulk([
+        student("Петрова", "Ольга", "Ивановна", father, mother),
+        student("Сидоров", "Семён", "Семёнович", parent("Сидоров", "Олег", "Петрович", 1.5)),
+        student("Смирнов", "Олег", "Олегович"),
+    ])) == 3
+
+    with database.connect() as connection:
+        assert connection.execute(select(func.count()).select_from(Parent)).scalar() == 3
+    rows = asyncio.run(export_rows())
+    assert rows == list(DBRequests.iter_students_for_export())
+    assert [row[0] for row in rows] == ["Петров Пётр Иванович", "Петрова Ольга Ивановна",
+                                        "Сидоров Семён Семёнович", "Смирнов Олег Олегович"]
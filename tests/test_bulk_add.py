@@ -0,0 +1,108 @@
+import pytest
+from sqlalchemy import select
+
+from dialog_view import BulkAddStudentsDialog
+from model.db_requests import DBRequests
+from model.models import Parent, Student
+
+ROW = ["Петров", "Пётр", "Иванович", "1", "0", "Петров", "Иван", "Иванович", "50000",
+       "Петрова", "Анна", "Сергеевна", "42000.5"]
+
+
+@pytest.mark.parametrize("delimiter", [",", ";", "\t"])
+def test_parse_rows_detects_delimiter(delimiter):
+    second = ["Петрова", "Ольга", "Ивановна", "1", "0"] + ROW[5:]
+    text = f"\n{delimiter.join(ROW)}\n  \n{delimiter.join(second)}\n"
+
+    students = BulkAddStudentsDialog.parse_rows(text)
+
+    assert [s["first_name"] for s in students] == ["Пётр", "Ольга"]
+    assert students[0] == {
+        "last_name": "Петров", "first_name": "Пётр", "middle_name": "Иванович",
+        "brothers_count": 1, "sisters_count": 0,
+        "father_last": "Петров", "father_first": "Иван", "father_middle": "Иванович", "father_income": 50000.0,
+        "mother_last": "Петрова", "mother_first": "Анна", "mother_middle": "Сергеевна", "mother_income": 42000.5,
+    }
+
+
+def test_parse_rows_of_empty_text():
+    assert BulkAddStudentsDialog.parse_rows(" \n\n") == []
+
+
+@pytest.mark.parametrize("row, message", [
+    (ROW[:-1], "Строка 2: ожидается колонок 13, получено 12"),
+    (ROW[:3] + ["много"] + ROW[4:], "Строка 2: некорректное значение \"много\""),
+    (ROW[:8] + ["-5"] + ROW[9:], "Строка 2: некорректное значение \"-5\""),
+    (["Петров1"] + ROW[1:], "Строка 2: некорректное значение \"Петров1\""),
+])
+def test_parse_rows_reports_invalid_row(row, message):
+    with pytest.raises(ValueError, match=message):
+        BulkAddStudentsDialog.parse_rows(";".join(ROW) + "\n" + ";".join(row))
+
+
+def parent(last_name, first_name, middle_name, income):
+    return {"first_name": first_name, "middle_name": middle_name, "last_name": last_name, "income": income}
+
+
+def student(first_name, father=None, mother=None):
+    return {"first_name": first_name, "middle_name": "Иванович", "last_name": "Петров",
+            "father": father, "mother": mother, "brothers_count": 1, "sisters_count": 2}
+
+
+def parents_and_students(engine):
+    with engine.connect() as connection:
+        parents = connection.execute(select(Parent.id, Parent.last_name, Parent.gender).order_by(Parent.id)).all()
+        students = connection.execute(
+            select(Student.first_name, Student.father_id, Student.mother_id).order_by(Student.id)).all()
+    return parents, students
+
+
+def test_bulk_add_shares_parents_within_batch(database):
+    father = parent("Петров", "Иван", "Иванович", 50000)
+    mother = parent("Петрова", "Анна", "Сергеевна", 42000)
+    # фамилия в другом регистре и доход строкой - тот же ключ
+    same_father = parent("петров", "Иван", "Иванович", "50000.00")
+
+    assert DBRequests.add_students_bulk([
+        student("Пётр", father, mother),
+        student("Олег", same_father, mother),
+    ]) == 2
+
+    parents, students = parents_and_students(database)
+    assert [(p.last_name, p.gender) for p in parents] == [("Петров", "male"), ("Петрова", "female")]
+    father_id, mother_id = parents[0].id, parents[1].id
+    assert students == [("Пётр", father_id, mother_id), ("Олег", father_id, mother_id)]
+
+
+def test_bulk_add_reuses_existing_parents(database):
+    father = parent("Петров", "Иван", "Иванович", 50000)
+    mother = parent("Петрова", "Анна", "Сергеевна", 42000)
+    DBRequests.add_students_bulk([student("Пётр", father, mother)])
+
+    # у отца другой доход - это другой родитель
+    other_father = parent("Петров", "Иван", "Иванович", 60000)
+    DBRequests.add_students_bulk([student("Олег", father, mother), student("Семён", other_father, mother)])
+
+    parents, students = parents_and_students(database)
+    assert len(parents) == 3
+    father_id, mother_id, other_father_id = (p.id for p in parents)
+    assert students == [("Пётр", father_id, mother_id), ("Олег", father_id, mother_id),
+                        ("Семён", other_father_id, mother_id)]
+
+
+def test_bulk_add_students_without_parents(database):
+    mother = parent("Петрова", "Анна", "Сергеевна", 42000)
+    assert DBRequests.add_students_bulk([
+        student("Пётр"),
+        student("Олег", mother=mother),
+        student("Семён", father=parent("Петров", "Иван", "Иванович", 50000)),
+    ]) == 3
+
+    parents, students = parents_and_students(database)
+    mother_id, father_id = parents[0].id, parents[1].id
+    assert students == [("Пётр", None, None), ("Олег", None, mother_id), ("Семён", father_id, None)]
+
+
+def test_bulk_add_of_empty_list(database):
+    assert DBRequests.add_students_bulk([]) == 0
+    assert parents_and_students(database) == ([], [])
@@ -0,0 +1,226 @@
+import threading
+import time
+
+import pytest
+
+from controllers.executor import BackgroundExecutor, TaskCancelled, raise_if_cancelled
+
+
+class FakeRoot:
+    # вместо Tk: after() только запоминает обработчики, тест вызывает их сам
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, ms, callback):
+        self.callbacks.append(callback)
+
+    def run(self, until, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not until():
+            if time.monotonic() > deadline:
+                raise AssertionError("обработчики after() не завершились вовремя")
+            if self.callbacks:
+                self.callbacks.pop(0)()
+            else:
+                time.sleep(0.001)
+
+
+@pytest.fixture
+def root():
+    return FakeRoot()
+
+
+def make_executor(root, max_workers=1):
+    executor = BackgroundExecutor(root, max_workers=max_workers, poll_interval=0)
+    busy = []
+    executor.on_busy_changed = busy.append
+    return executor, busy
+
+
+def test_results_are_delivered_in_submission_order(root):
+    executor, _ = make_executor(root, max_workers=2)
+    release = threading.Event()
+    results = []
+    executor.submit(lambda: release.wait(5) and "медленная", on_success=results.append)
+    executor.submit(lambda: "быстрая", on_success=results.append)
+
+    # вторая задача уже готова, но ее результат ждет первую
+    for _ in range(20):
+        if root.callbacks:
+            root.callbacks.pop(0)()
+        time.sleep(0.001)
+    assert results == []
+
+    release.set()
+    root.run(lambda: len(results) == 2)
+    assert results == ["медленная", "быстрая"]
+
+
+def test_error_goes_to_task_handler_then_to_default(root):
+    executor, _ = make_executor(root)
+    task_errors = []
+    default_errors = []
+    executor.on_error = default_errors.append
+
+    def fail(message):
+        raise ValueError(message)
+
+    executor.submit(fail, "своя", on_error=task_errors.append)
+    executor.submit(fail, "общая")
+    root.run(lambda: not executor.busy and not root.callbacks)
+
+    assert [str(e) for e in task_errors] == ["своя"]
+    assert [str(e) for e in default_errors] == ["общая"]
+
+
+def test_error_without_handler_is_raised_in_poll(root):
+    executor, _ = make_executor(root)
+    executor.submit(lambda: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        root.run(lambda: False)
+
+
+def test_failing_handler_does_not_drop_other_results(root):
+    executor, _ = make_executor(root)
+    release = threading.Event()
+    results = []
+
+    def fail(result):
+        raise RuntimeError("ошибка обработчика")
+
+    # обе задачи завершаются до опроса и обрабатываются одним _poll
+    executor.submit(lambda: release.wait(5))
+    executor.submit(lambda: 1, on_success=fail)
+    executor.submit(lambda: 2, on_success=results.append)
+    executor.submit(lambda: 1 / 0, on_error=results.append)
+    release.set()
+    while not all(task.future.done() for task in executor.tasks):
+        time.sleep(0.001)
+    with pytest.raises(RuntimeError):
+        root.run(lambda: False)
+
+    assert results[0] == 2
+    assert isinstance(results[1], ZeroDivisionError)
+    assert not executor.busy
+
+
+def test_busy_is_reported_once_per_batch(root):
+    executor, busy = make_executor(root)
+    executor.submit(lambda: 1)
+    executor.submit(lambda: 2)
+    assert busy == [True]
+    root.run(lambda: not executor.busy)
+    assert busy == [True, False]
+
+
+def test_cancel_skips_queued_task_and_discards_running_result(root):
+    executor, busy = make_executor(root)
+    started = threading.Event()
+    release = threading.Event()
+    results = []
+    queued_calls = []
+
+    def running():
+        started.set()
+        release.wait(5)
+        return "отброшен"
+
+    executor.submit(running, on_success=results.append)
+    executor.submit(lambda: queued_calls.append(1), on_success=results.append)
+    assert started.wait(5)
+    executor.cancel_all()
+    release.set()
+    root.run(lambda: not executor.busy)
+
+    assert results == []
+    assert queued_calls == []
+    assert busy == [True, False]
+
+
+def test_cancelled_task_stops_at_check_point(root):
+    executor, _ = make_executor(root)
+    started = threading.Event()
+    steps = []
+    errors = []
+
+    def long_operation():
+        for step in range(1000):
+            started.set()
+            raise_if_cancelled(step)
+            steps.append(step)
+            time.sleep(0.001)
+
+    task = executor.submit(long_operation, on_error=errors.append)
+    assert started.wait(5)
+    task.cancel()
+    root.run(lambda: not executor.busy)
+
+    assert len(steps) < 1000
+    assert isinstance(task.future.exception(), TaskCancelled)
+    assert errors == []
+
+
+def test_raise_if_cancelled_outside_worker_does_nothing():
+    raise_if_cancelled(10)
+
+
+def test_shutdown_does_not_wait_for_running_task(root):
+    executor, _ = make_executor(root)
+    release = threading.Event()
+    done = []
+    executor.submit(lambda: release.wait(5))
+
+    start = time.monotonic()
+    executor.shutdown(on_done=lambda: done.append(True))
+    assert time.monotonic() - start < 1
+    assert done == []
+    assert executor.submit(lambda: 1) is None
+
+    release.set()
+    root.run(lambda: done)
+    assert done == [True]
+
+
+def test_shutdown_when_idle_calls_on_done_immediately(root):
+    executor, _ = make_executor(root)
+    done = []
+    executor.shutdown(on_done=lambda: done.append(True))
+    assert done == [True]
+
+
+def test_writes_are_not_cancelled(root):
+    executor, _ = make_executor(root)
+    started = threading.Event()
+    release = threading.Event()
+    results = []
+
+    def running():
+        started.set()
+        release.wait(5)
+        return "поиск"
+
+    executor.submit(running, on_success=results.append)
+    executor.submit(lambda: "запись", on_success=results.append, cancellable=False)
+    executor.submit(lambda: "чтение", on_success=results.append)
+    assert started.wait(5)
+    executor.cancel_all()
+    release.set()
+    root.run(lambda: not executor.busy)
+
+    assert results == ["запись"]
+
+
+def test_shutdown_finishes_queued_writes_before_on_done(root):
+    executor, _ = make_executor(root)
+    release = threading.Event()
+    events = []
+
+    executor.submit(lambda: release.wait(5))
+    executor.submit(lambda: events.append("запись выполнена"), on_success=lambda _: events.append("обработчик"),
+                    cancellable=False)
+    executor.submit(lambda: events.append("чтение выполнено"))
+    executor.shutdown(on_done=lambda: events.append("закрытие"))
+    release.set()
+    root.run(lambda: "закрытие" in events)
+
+    assert events == ["запись выполнена", "обработчик", "закрытие"]
@@ -0,0 +1,15 @@
+from model.models_factory import FamilyGenerator
+
+
+def test_sibling_counts_match_emitted_children():
+    # среднее 3 ребенка: последняя семья почти всегда обрезается до count
+    for count in range(1, 40):
+        emitted = 0
+        for father, mother, children in FamilyGenerator(seed=count, children_mean=3).families(count):
+            emitted += len(children)
+            sons = sum(1 for child in children if child[0] == father[0])
+            for child in children:
+                is_son = child[0] == father[0]
+                assert child[3] == sons - is_son
+                assert child[4] == len(children) - sons - (not is_son)
+        assert emitted == count
@@ -0,0 +1,137 @@
+from views.pagination import LOADING_ROW, Pagination, RowWindow
+
+
+def fetch_page(after_id=None, offset=0, limit=10):
+    # id студентов 1..25
+    start = after_id if after_id is not None else offset
+    rows = list(range(start + 1, min(start + limit, 25) + 1))
+    return rows, rows[-1] if rows else after_id
+
+
+def test_page_keys_are_remembered_from_request_snapshot():
+    pagination = Pagination(25, page_size=10)
+    page, keys_version, request = pagination.page_request()
+    # пока запрос выполняется, пользователь переходит на следующую страницу
+    pagination.next_page()
+    pagination.remember_page(page, keys_version, *fetch_page(**request))
+
+    assert pagination.page_keys == {1: None, 2: 10}
+    assert pagination.page_request()[2] == {"after_id": 10, "limit": 10}
+
+
+def test_keys_from_request_before_reset_are_ignored():
+    pagination = Pagination(25, page_size=10)
+    page, keys_version, request = pagination.page_request()
+    pagination.set_page_size(5)
+    pagination.remember_page(page, keys_version, *fetch_page(**request))
+
+    assert pagination.page_keys == {1: None}
+
+
+def test_unknown_page_is_requested_by_offset():
+    pagination = Pagination(25, page_size=10)
+    pagination.last_page()
+    assert pagination.fetch_current_page(fetch_page) == [21, 22, 23, 24, 25]
+
+
+class CountingSource:
+    def __init__(self, total):
+        self.total = total
+        self.calls = []
+
+    def __call__(self, offset, limit):
+        self.calls.append((offset, limit))
+        return list(range(offset, min(offset + limit, self.total)))
+
+
+def test_row_window_fetches_blocks_not_the_whole_page():
+    source = CountingSource(2_000_000)
+    window = RowWindow(source, start=10_000, end=1_010_000, block_size=200)
+
+    assert window(0, 20) == list(range(10_000, 10_020))
+    # прокрутка по строке остается внутри уже полученного блока
+    for offset in range(1, 150):
+        assert window(offset, 20) == list(range(10_000 + offset, 10_020 + offset))
+    assert source.calls == [(10_000, 200)]
+
+    # переход в конец страницы - один запрос, с запасом строк выше
+    assert window(999_980, 20) == list(range(1_009_980, 1_010_000))
+    assert source.calls[-1] == (10_000 + 999_930, 70)
+    assert window(999_970, 20) == list(range(1_009_970, 1_009_990))
+    assert len(source.calls) == 2
+
+
+def test_row_window_does_not_read_past_page_end():
+    source = CountingSource(100)
+    window = RowWindow(source, start=0, end=30, block_size=200)
+    assert window(25, 20) == [25, 26, 27, 28, 29]
+    assert source.calls == [(0, 30)]
+
+
+class FakeTask:
+    def __init__(self, func, args, on_success, on_error):
+        self.func = func
+        self.args = args
+        self.on_success = on_success
+        self.on_error = on_error
+        self.cancelled = False
+
+    def finish(self):
+        try:
+            result = self.func(*self.args)
+        except Exception as e:
+            self.on_error(e)
+            return
+        self.on_success(result)
+
+
+class FakeSubmit:
+    # вместо BackgroundExecutor.submit: задачи выполняются, когда тест вызовет finish()
+    def __init__(self):
+        self.tasks = []
+
+    def __call__(self, func, *args, on_success=None, on_error=None):
+        task = FakeTask(func, args, on_success, on_error)
+        self.tasks.append(task)
+        return task
+
+
+def test_row_window_loads_blocks_in_background():
+    source = CountingSource(10_000)
+    submit = FakeSubmit()
+    loaded = []
+    window = RowWindow(source, start=0, end=10_000, block_size=200, submit=submit,
+                       on_loaded=lambda: loaded.append(True))
+
+    # до ответа - заглушки, повторная прокрутка внутри запрошенного блока не создает запрос
+    assert window(0, 20) == [LOADING_ROW] * 20
+    assert window(5, 20) == [LOADING_ROW] * 20
+    assert len(submit.tasks) == 1 and source.calls == []
+
+    submit.tasks[0].finish()
+    assert loaded == [True]
+    assert window(5, 20) == list(range(5, 25))
+
+    # ответ на запрос, замененный более новым, отбрасывается
+    window(5_000, 20)
+    window(9_000, 20)
+    assert len(submit.tasks) == 3
+    submit.tasks[1].finish()
+    assert window(9_000, 20) == [LOADING_ROW] * 20
+    submit.tasks[2].finish()
+    assert window(9_000, 20) == list(range(9_000, 9_020))
+    assert len(loaded) == 2
+
+
+def test_row_window_reports_block_errors_once():
+    def failing(offset, limit):
+        raise ValueError("нет соединения")
+
+    submit = FakeSubmit()
+    errors = []
+    window = RowWindow(failing, start=0, end=10_000, block_size=200, submit=submit, on_error=errors.append)
+    for offset in (0, 1_000, 2_000):
+        assert window(offset, 20) == [LOADING_ROW] * 20
+        submit.tasks[-1].finish()
+    assert len(submit.tasks) == 3
+    assert [str(e) for e in errors] == ["нет соединения"]
@@ -0,0 +1,50 @@
+from model.db_requests import DBRequests
+from model.xml_exporter import export_xml
+from xml_manager import StudentsModel, XMLManager
+
+FIELDS = ("fio", "father_fio", "father_income", "mother_fio", "mother_income", "brother_count", "sister_count")
+
+
+def parent(last_name, first_name, middle_name, income):
+    return {"first_name": first_name, "middle_name": middle_name, "last_name": last_name, "income": income}
+
+
+def student(last_name, first_name, middle_name, father=None, mother=None, brothers_count=0, sisters_count=0):
+    return {"first_name": first_name, "middle_name": middle_name, "last_name": last_name,
+            "father": father, "mother": mother,
+            "brothers_count": brothers_count, "sisters_count": sisters_count}
+
+
+def test_export_round_trip(database, tmp_path):
+    father = parent("Петров", "Иван", "Иванович", "50000.50")
+    mother = parent("Петрова", "Анна", "Сергеевна", 42000)
+    DBRequests.add_students_bulk([
+        student("Петров", "Пётр", "Иванович", father, mother, sisters_count=1),
+        student("Петрова", "Ольга", "Ивановна", father, mother, brothers_count=1),
+        # символы, которые экранируются в XML
+        student("О'Нил", "Анна-Мария", "<Ли> & \"Ко\"", parent("О'Нил", "Джон", "&", 1.25)),
+        student("Сидоров", "Семён", "Семёнович"),
+    ])
+    file_path = str(tmp_path / "students.xml")
+    progress = []
+
+    assert export_xml(file_path, chunk_size=2, progress=progress.append) == 4
+    assert progress == [2, 4]
+
+    loaded = StudentsModel(XMLManager(), write_delay=0).load_students(file_path)
+    rows = [(fio, father_fio, float(father_income), mother_fio, float(mother_income), brothers, sisters)
+            for fio, father_fio, father_income, mother_fio, mother_income, brothers, sisters
+            in DBRequests.iter_students_for_export()]
+    assert [tuple(getattr(s, field) for field in FIELDS) for s in loaded] == rows
+    assert rows == [
+        ("Петров Пётр Иванович", "Петров Иван Иванович", 50000.5, "Петрова Анна Сергеевна", 42000.0, 0, 1),
+        ("Петрова Ольга Ивановна", "Петров Иван Иванович", 50000.5, "Петрова Анна Сергеевна", 42000.0, 1, 0),
+        ("О'Нил Анна-Мария <Ли> & \"Ко\"", "О'Нил Джон &", 1.25, "", 0.0, 0, 0),
+        ("Сидоров Семён Семёнович", "", 0.0, "", 0.0, 0, 0),
+    ]
+
+
+def test_export_of_empty_database(database, tmp_path):
+    file_path = str(tmp_path / "students.xml")
+    assert export_xml(file_path) == 0
+    assert len(StudentsModel(XMLManager(), write_delay=0).load_students(file_path)) == 0
@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import func, select, text
+
+from model import queries
+from model.models import Parent, Student
+from model.xml_importer import import_xml
+from xml_manager import XMLManager
+from xml_models import XMLStudent
+
+STUDENTS = [
+    XMLStudent("Петров Пётр Иванович", "Петров Иван Иванович", "Петрова Анна Сергеевна", 50000, 42000, 0, 1),
+    XMLStudent("Петрова Ольга Ивановна", "Петров Иван Иванович", "Петрова Анна Сергеевна", 50000, 42000, 1, 0),
+    XMLStudent("Сидоров Семён Семёнович", "", "Сидорова Мария Ивановна", 0, 30000, 0, 0),
+]
+
+STUDENT_XML = (
+    "<student><fio>{fio}</fio><father_fio>Смирнов Олег Олегович</father_fio><father_income>1000</father_income>"
+    "<mother_fio></mother_fio><mother_income>0</mother_income>"
+    "<brother_count>{brothers}</brother_count><sister_count>0</sister_count></student>"
+)
+
+
+def counts(engine):
+    with engine.connect() as connection:
+        return (connection.execute(select(func.count()).select_from(Student)).scalar(),
+                connection.execute(select(func.count()).select_from(Parent)).scalar())
+
+
+def test_import_twice_does_not_duplicate_parents(database, tmp_path):
+    file_path = str(tmp_path / "students.xml")
+    XMLManager(file_path).save_students(STUDENTS)
+    progress = []
+
+    assert import_xml(file_path, chunk_size=2, progress=progress.append) == 3
+    assert progress == [2, 3]
+    assert counts(database) == (3, 3)
+
+    # студенты добавляются повторно, родители находятся по ключу
+    assert import_xml(file_path, chunk_size=2) == 3
+    assert counts(database) == (6, 3)
+
+
+def test_malformed_record_does_not_commit_part_of_chunk(database, tmp_path):
+    file_path = tmp_path / "students.xml"
+    records = [STUDENT_XML.format(fio=f"Смирнов Студент {i}", brothers=0) for i in range(3)]
+    records.append(STUDENT_XML.format(fio="Смирнов Ошибка Олегович", brothers="много"))
+    file_path.write_text(f'<?xml version="1.0" encoding="utf-8"?>\n<students>{"".join(records)}</students>\n',
+                         encoding="utf-8")
+
+    with pytest.raises(ValueError, match="Импорт прерван после 2 студентов"):
+        import_xml(str(file_path), chunk_size=2)
+
+    # первая пачка записана, третий студент из незаконченной пачки - нет
+    with database.connect() as connection:
+        names = connection.execute(select(Student.middle_name).order_by(Student.id)).scalars().all()
+    assert names == ["0", "1"]
+    assert counts(database) == (2, 1)
+
+
+def test_failed_chunk_is_rolled_back(database, tmp_path, monkeypatch):
+    file_path = str(tmp_path / "students.xml")
+    XMLManager(file_path).save_students(STUDENTS)
+    import_xml(file_path, chunk_size=2)
+
+    # ошибка базы после записи родителей пачки: пачка отменяется целиком
+    monkeypatch.setattr(queries, "insert_students", lambda: text("INSERT INTO no_such_table VALUES (:first_name)"))
+    XMLManager(file_path).save_students([XMLStudent("Кузнецов Иван Петрович", "Кузнецов Пётр Олегович", "",
+                                                    70000, 0, 0, 0)])
+    with pytest.raises(ValueError, match="Импорт прерван после 0 студентов"):
+        import_xml(file_path, chunk_size=2)
+    assert counts(database) == (3, 3)
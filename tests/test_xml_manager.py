@@ -0,0 +1,40 @@
+import pytest
+
+from xml_manager import StudentsModel, XMLManager
+from xml_models import XMLStudent
+
+
+def xml_student(fio, father_fio="", mother_fio="", father_income=0, mother_income=0, brother_count=0,
+                sister_count=0):
+    return XMLStudent(fio, father_fio, mother_fio, father_income, mother_income, brother_count, sister_count)
+
+
+@pytest.fixture(params=["objects", "columnar"])
+def load(request, tmp_path):
+    def load(students):
+        file_path = str(tmp_path / "students.xml")
+        XMLManager(file_path).save_students(students)
+        return StudentsModel(XMLManager(), write_delay=0, storage=request.param), file_path
+
+    return load
+
+
+def test_search_by_parent_name_with_one_parent(load):
+    model, file_path = load([
+        xml_student("Петров Пётр Иванович", father_fio="Петров Иван Иванович", father_income=50000),
+        xml_student("Сидорова Анна Петровна", mother_fio="Сидорова Мария Ивановна", mother_income=40000),
+        xml_student("Смирнов Олег Олегович"),
+    ])
+    model.load_students(file_path)
+
+    assert [s.fio for s in model.search_by_parent_name("петров")] == ["Петров Пётр Иванович"]
+    assert [s.fio for s in model.search_by_parent_name("Сидорова")] == ["Сидорова Анна Петровна"]
+    assert model.search_by_parent_name("Смирнов") == []
+
+
+@pytest.mark.parametrize("parser", ["sax", "iterparse"])
+@pytest.mark.parametrize("count", [-1, 65536])
+def test_invalid_sibling_count_is_rejected(load, parser, count):
+    model, file_path = load([xml_student("Петров Пётр Иванович", brother_count=count)])
+    with pytest.raises(ValueError, match="братьев или сестер"):
+        model.load_students(file_path, parser=parser)
@@ -1,3 +1,4 @@
+import csv
 import tkinter as tk
 from tkinter import simpledialog, messagebox
 
@@ -8,8 +9,26 @@ from pagination import SearchResultsWindow
 class BaseDialog(simpledialog.Dialog):
     def __init__(self, parent, controller, title=None):
         self.controller = controller
+        self.executor = getattr(parent, "executor", None)
         super().__init__(parent, title=title)
 
+    def run_task(self, func, *args, on_success=None, cancellable=True):
+        # операции контроллера выполняются в фоновом потоке, если окно-владелец его предоставляет;
+        # обработчики вызываются уже после закрытия диалога; добавление и удаление - cancellable=False
+        def on_error(e):
+            messagebox.showerror("Ошибка", str(e))
+
+        if self.executor is not None:
+            self.executor.submit(func, *args, on_success=on_success, on_error=on_error, cancellable=cancellable)
+            return
+        try:
+            result = func(*args)
+        except Exception as e:
+            on_error(e)
+            return
+        if on_success is not None:
+            on_success(result)
+
     @staticmethod
     def validate_name(value):
         return all(c.isalpha() or c in (" ", "-", "'") for c in value)
@@ -142,7 +161,14 @@ class SearchBaseDialog(BaseDialog):
         return True
 
     def apply(self):
-        pass
+        search_term = self.entry.get().strip()
+        self.run_task(self.search_method, search_term, on_success=self.show_search_results)
+
+    def show_search_results(self, results):
+        if results:
+            SearchResultsWindow(self.parent, results)
+        else:
+            messagebox.showinfo("Результаты", "Записи не найдены.")
 
 
 class DeleteBaseDialog(BaseDialog):
@@ -170,16 +196,12 @@ class DeleteBaseDialog(BaseDialog):
         if not messagebox.askyesno("Подтверждение", "Вы уверены, что хотите выполнить удаление?"):
             return
 
-        try:
-            deleted_count = self.delete_method(self.entry.get().strip())
-            self.show_results(
-                deleted_count,
-                title="Результаты удаления",
-                success_message="Удалено записей: {}",
-                empty_message="Записи для удаления не найдены"
-            )
-        except Exception as e:
-            messagebox.showerror("Ошибка", str(e))
+        self.run_task(self.delete_method, self.entry.get().strip(), on_success=lambda deleted_count: self.show_results(
+            deleted_count,
+            title="Результаты удаления",
+            success_message="Удалено записей: {}",
+            empty_message="Записи для удаления не найдены"
+        ), cancellable=False)
 
 
 class RangeInputDialog(BaseDialog):
@@ -223,14 +245,6 @@ class SearchStudentByNameDialog(SearchBaseDialog):
             validation_method=BaseDialog.validate_name
         )
 
-    def apply(self):
-        search_term = self.entry.get().strip()
-        results = self.search_method(search_term)
-        if results:
-            SearchResultsWindow(self.master, results)
-        else:
-            messagebox.showinfo("Результаты", "Записи не найдены.")
-
 
 class SearchBySiblingsDialog(SearchBaseDialog):
     def __init__(self, parent, controller):
@@ -243,14 +257,6 @@ class SearchBySiblingsDialog(SearchBaseDialog):
             validation_method=BaseDialog.validate_int
         )
 
-    def apply(self):
-        search_term = self.entry.get().strip()
-        results = self.search_method(search_term)
-        if results:
-            SearchResultsWindow(self.master, results)
-        else:
-            messagebox.showinfo("Результаты", "Записи не найдены.")
-
 
 class SearchParentByNameDialog(SearchBaseDialog):
     def __init__(self, parent, controller):
@@ -263,14 +269,6 @@ class SearchParentByNameDialog(SearchBaseDialog):
             validation_method=BaseDialog.validate_name
         )
 
-    def apply(self):
-        search_term = self.entry.get().strip()
-        results = self.search_method(search_term)
-        if results:
-            SearchResultsWindow(self.master, results)
-        else:
-            messagebox.showinfo("Результаты", "Записи не найдены.")
-
 
 class IncomeSearchDialog(RangeInputDialog):
     def __init__(self, parent, controller):
@@ -286,16 +284,15 @@ class IncomeSearchDialog(RangeInputDialog):
     def apply(self):
         if not self.validate():
             return
-        try:
-            min_val = float(self.min_entry.get())
-            max_val = float(self.max_entry.get())
-            results = self.apply_method(min_val, max_val)
-            if results:
-                SearchResultsWindow(self.master, results)
-            else:
-                messagebox.showinfo("Результаты", "Записи не найдены.")
-        except Exception as e:
-            messagebox.showerror("Ошибка", str(e))
+        min_val = float(self.min_entry.get())
+        max_val = float(self.max_entry.get())
+        self.run_task(self.apply_method, min_val, max_val, on_success=self.show_search_results)
+
+    def show_search_results(self, results):
+        if results:
+            SearchResultsWindow(self.parent, results)
+        else:
+            messagebox.showinfo("Результаты", "Записи не найдены.")
 
 
 class DeleteStudentByNameDialog(DeleteBaseDialog):
@@ -337,19 +334,14 @@ class DeleteByIncomeDialog(RangeInputDialog):
         if not messagebox.askyesno("Подтверждение", "Вы уверены, что хотите выполнить удаление?"):
             return
 
-        try:
-            min_val = float(self.min_entry.get())
-            max_val = float(self.max_entry.get())
-            deleted_count = self.apply_method(min_val, max_val)
-
-            self.show_results(
-                deleted_count,
-                title="Результаты удаления",
-                success_message="Удалено записей: {}",
-                empty_message=f"Записи с доходом от {min_val} до {max_val} не найдены"
-            )
-        except Exception as e:
-            messagebox.showerror("Ошибка", str(e))
+        min_val = float(self.min_entry.get())
+        max_val = float(self.max_entry.get())
+        self.run_task(self.apply_method, min_val, max_val, on_success=lambda deleted_count: self.show_results(
+            deleted_count,
+            title="Результаты удаления",
+            success_message="Удалено записей: {}",
+            empty_message=f"Записи с доходом от {min_val} до {max_val} не найдены"
+        ), cancellable=False)
 
 
 class AddStudentDialog(AddBaseDialog):
@@ -394,7 +386,7 @@ class AddStudentDialog(AddBaseDialog):
             mother_income = float(data['mother_income'])
 
             if self.controller.mode == "xml":
-                self.controller.add_student(
+                student = dict(
                     first_name=data['first_name'],
                     middle_name=data['middle_name'],
                     last_name=data['last_name'],
@@ -420,7 +412,7 @@ class AddStudentDialog(AddBaseDialog):
                     income=mother_income,
                     gender="female"
                 )
-                self.controller.add_student(
+                student = dict(
                     first_name=data['first_name'],
                     middle_name=data['middle_name'],
                     last_name=data['last_name'],
@@ -431,7 +423,86 @@ class AddStudentDialog(AddBaseDialog):
                 )
             else:
                 raise ValueError("Неподдерживаемый режим работы")
-
-            messagebox.showinfo("Успех", "Студент успешно добавлен")
         except Exception as e:
             messagebox.showerror("Ошибка", f"Ошибка при добавлении: {str(e)}")
+            return
+
+        self.run_task(lambda: self.controller.add_student(**student),
+                      on_success=lambda _: messagebox.showinfo("Успех", "Студент успешно добавлен"),
+                      cancellable=False)
+
+
+class BulkAddStudentsDialog(BaseDialog):
+    # колонки в том же порядке, что и поля AddStudentDialog
+    COLUMNS = [
+        ("last_name", "name"), ("first_name", "name"), ("middle_name", "name"),
+        ("brothers_count", "number"), ("sisters_count", "number"),
+        ("father_last", "name"), ("father_first", "name"), ("father_middle", "name"), ("father_income", "income"),
+        ("mother_last", "name"), ("mother_first", "name"), ("mother_middle", "name"), ("mother_income", "income")
+    ]
+
+    def __init__(self, parent, controller):
+        self.students = []
+        super().__init__(parent, controller, title="Добавить список студентов")
+
+    def body(self, master):
+        tk.Label(master, justify=tk.LEFT, text=(
+            "Вставьте строки из таблицы (CSV, разделитель - запятая, точка с запятой или табуляция).\n"
+            "Колонки: фамилия, имя, отчество, братья, сестры,\n"
+            "фамилия, имя, отчество и доход отца, фамилия, имя, отчество и доход матери."
+        )).pack(anchor=tk.W, padx=5, pady=5)
+
+        frame = tk.Frame(master)
+        frame.pack(fill=tk.BOTH, expand=True, padx=5)
+        self.text = tk.Text(frame, width=100, height=15, wrap=tk.NONE)
+        scrollbar = tk.Scrollbar(frame, orient=tk.VERTICAL, command=self.text.yview)
+        self.text.config(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        return self.text
+
+    def validate(self):
+        try:
+            self.students = self.parse_rows(self.text.get("1.0", tk.END))
+        except ValueError as e:
+            messagebox.showwarning("Ошибка", str(e))
+            return False
+        if not self.students:
+            messagebox.showwarning("Ошибка", "Нет строк для добавления")
+            return False
+        return True
+
+    @classmethod
+    def parse_rows(cls, text):
+        lines = [line for line in text.splitlines() if line.strip()]
+        if not lines:
+            return []
+        try:
+            dialect = csv.Sniffer().sniff(lines[0], delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel_tab
+
+        validators = {
+            "name": lambda value: value and cls.validate_name(value),
+            "number": lambda value: value and cls.validate_number_of_siblings(value),
+            "income": lambda value: value not in ("", ".", "-") and cls.validate_income(value)
+        }
+        converters = {"name": str, "number": int, "income": float}
+
+        students = []
+        for number, row in enumerate(csv.reader(lines, dialect), start=1):
+            row = [value.strip() for value in row]
+            if len(row) != len(cls.COLUMNS):
+                raise ValueError(f"Строка {number}: ожидается колонок {len(cls.COLUMNS)}, получено {len(row)}")
+            student = {}
+            for (key, kind), value in zip(cls.COLUMNS, row):
+                if not validators[kind](value):
+                    raise ValueError(f"Строка {number}: некорректное значение \"{value}\"")
+                student[key] = converters[kind](value)
+            students.append(student)
+        return students
+
+    def apply(self):
+        self.run_task(self.controller.add_students, self.students,
+                      on_success=lambda count: messagebox.showinfo("Успех", f"Добавлено студентов: {count}"),
+                      cancellable=False)
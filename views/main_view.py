@@ -1,10 +1,15 @@
 from tkinter import ttk, filedialog
 
 from controllers.controllers import Controller
+from controllers.executor import BackgroundExecutor, raise_if_cancelled
 from dialog_view import *
-from views.pagination import Pagination
+from views.pagination import LOADING_ROW, Pagination, RowWindow, VIRTUAL_ROWS_THRESHOLD
+from views.stats_view import StatisticsWindow
 from views.table_tree_view import TableView, TreeView
 
+# период проверки ошибок фоновой записи XML файла, мс
+FLUSH_ERROR_INTERVAL = 1000
+
 
 class StartWindow(tk.Tk):
     def __init__(self):
@@ -33,6 +38,8 @@ class MainWindow(tk.Tk):
         self.geometry("600x400")
         self.mode = mode
         self.controller = Controller(mode)
+        self.executor = BackgroundExecutor(self)
+        self.executor.on_error = lambda e: messagebox.showerror("Ошибка", str(e))
 
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(fill=tk.BOTH, expand=True)
@@ -49,8 +56,19 @@ class MainWindow(tk.Tk):
         self.table_view.pack(fill=tk.BOTH, expand=True, in_=self.table_tab)
         self.tree_view.pack(fill=tk.BOTH, expand=True, in_=self.tree_tab)
 
+        # дерево перестраивается только когда открыта вкладка "Дерево"
+        self.current_rows = []
+        self.tree_outdated = False
+        self.notebook.bind("<<NotebookTabChanged>>", lambda e: self.update_tree())
+
         ttk.Label(self, text=f"Режим работы: {mode.upper()}").pack(side=tk.TOP, pady=5)
 
+        self.busy_frame = tk.Frame(self)
+        self.progress = ttk.Progressbar(self.busy_frame, mode="indeterminate", length=150)
+        self.progress.pack(side=tk.LEFT, padx=5)
+        tk.Button(self.busy_frame, text="Отмена", command=self.executor.cancel_all).pack(side=tk.LEFT)
+        self.executor.on_busy_changed = self.show_busy
+
         self.data = []
         self.pagination = Pagination(len(self.data))
 
@@ -61,6 +79,44 @@ class MainWindow(tk.Tk):
         self.update_status_label(self.pagination, self.status_label)
 
         self.create_menu()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        self.flush_error_job = self.after(FLUSH_ERROR_INTERVAL, self._check_flush_error) if mode == "xml" else None
+
+    def show_busy(self, busy):
+        if busy:
+            self.busy_frame.pack(side=tk.TOP, pady=5)
+            self.progress.start(10)
+        else:
+            self.progress.stop()
+            self.busy_frame.pack_forget()
+
+    def _check_flush_error(self):
+        # XML файл записывается в потоке таймера, его ошибки показываются из потока Tk
+        error = self.controller.pop_flush_error()
+        if error is not None:
+            messagebox.showerror("Ошибка", f"Не удалось сохранить данные: {str(error)}")
+        self.flush_error_job = self.after(FLUSH_ERROR_INTERVAL, self._check_flush_error)
+
+    def on_close(self):
+        if self.flush_error_job is not None:
+            self.after_cancel(self.flush_error_job)
+            self.flush_error_job = None
+        # окно остается отзывчивым, пока дорабатывает уже запущенная операция
+        self.executor.shutdown(on_done=self._save_and_destroy)
+
+    def _save_and_destroy(self):
+        while True:
+            try:
+                self.controller.close()
+                break
+            except Exception as e:
+                # пока окно открыто, изменения в памяти: запись можно повторить, например освободив место
+                if not messagebox.askretrycancel(
+                        "Ошибка", f"Не удалось сохранить данные: {str(e)}\n"
+                                  "Повторить? При отмене несохраненные изменения будут потеряны."):
+                    break
+        self.destroy()
 
     def _format_data_xml(self, raw_data):
         formatted_data = []
@@ -77,36 +133,99 @@ class MainWindow(tk.Tk):
             formatted_data.append(row)
         return formatted_data
 
-    def load_data(self):
-        try:
-            self.data = self.controller.get_students()
+    def load_data(self, refresh=False):
+        if self.mode == "db":
+            task = lambda: self.controller.count_students(refresh)
+        else:
+            task = self.controller.get_students
+        self.executor.submit(task, on_success=self._on_data_loaded,
+                             on_error=lambda e: messagebox.showerror("Ошибка", "Не удалось обновить данные"))
+
+    def _on_data_loaded(self, result):
+        if self.mode == "db":
+            self.pagination.update_total(result)
+        else:
+            self.data = result
             self.pagination.update_total(len(self.data))
 
-            if self.pagination.current_page > self.pagination.total_pages:
-                self.pagination.current_page = self.pagination.total_pages
-            elif self.pagination.current_page < 1:
-                self.pagination.current_page = 1
+        if self.pagination.current_page > self.pagination.total_pages:
+            self.pagination.current_page = self.pagination.total_pages
+        elif self.pagination.current_page < 1:
+            self.pagination.current_page = 1
 
-            self.update_table()
-            self.update_status_label(self.pagination, self.status_label)
-        except Exception:
-            messagebox.showerror("Ошибка", "Не удалось обновить данные")
+        self.update_table()
+        self.update_status_label(self.pagination, self.status_label)
 
     def update_table(self):
-        try:
-            current_data = self.pagination.get_current_page_data(self.data)
-            self.table_view.clear_data()
-            if self.mode == "xml":
-                formatted_data = self._format_data_xml(current_data)
-                self.table_view.insert_data(formatted_data)
-                self.tree_view.clear_data()
-                self.tree_view.insert_data(formatted_data)
-            else:
-                self.table_view.insert_data(current_data)
-                self.tree_view.clear_data()
-                self.tree_view.insert_data(current_data)
-        except Exception:
-            messagebox.showerror("Ошибка", "Не удалось обновить таблицу")
+        # параметры страницы берутся в потоке Tk: pagination меняется при переходах, пока идет запрос
+        on_error = lambda e: messagebox.showerror("Ошибка", "Не удалось обновить таблицу")
+        if self.pagination.page_size > VIRTUAL_ROWS_THRESHOLD and self.pagination.total_items:
+            self._show_virtual_page()
+        elif self.mode == "xml":
+            data, (start, end) = self.data, self.pagination.current_range()
+            keys_version = self.pagination.keys_version
+            self.executor.submit(lambda: self._format_data_xml(data[start:end]),
+                                 on_success=lambda rows: self._on_page_fetched(None, keys_version, (rows, None)),
+                                 on_error=on_error)
+        elif not self.pagination.total_items:
+            self._show_rows([])
+        else:
+            page, keys_version, request = self.pagination.page_request()
+            self.executor.submit(self.controller.get_students_page, **request,
+                                 on_success=lambda result: self._on_page_fetched(page, keys_version, result),
+                                 on_error=on_error)
+
+    def _on_page_fetched(self, page, keys_version, result):
+        # ответ на запрос, отправленный до смены размера страницы или данных, устарел
+        if keys_version != self.pagination.keys_version:
+            return
+        rows, last_id = result
+        if page is not None:
+            self.pagination.remember_page(page, keys_version, rows, last_id)
+        self._show_rows(rows)
+
+    def _show_rows(self, current_data):
+        self.table_view.update_data(current_data)
+        self.current_rows = current_data
+        self.tree_outdated = True
+        self.update_tree()
+
+    def _show_virtual_page(self):
+        # большая страница целиком не загружается: таблица запрашивает только видимые строки
+        start, end = self.pagination.current_range()
+        end = min(end, self.pagination.total_items)
+        if self.mode == "xml":
+            data = self.data
+            window = RowWindow(lambda offset, limit: self._format_data_xml(data[offset:offset + limit]), start, end)
+        else:
+            # блоки строк читаются из базы в фоне, поток Tk при прокрутке не ждет запрос
+            window = RowWindow(self._fetch_db_rows, start, end, submit=self.executor.submit,
+                               on_loaded=lambda: self._on_rows_loaded(window),
+                               on_error=lambda e: messagebox.showerror("Ошибка", f"Не удалось загрузить строки: {str(e)}"))
+        self.table_view.set_source(window, end - start)
+        self.current_rows = None
+        self.update_tree()
+
+    def _fetch_db_rows(self, offset, limit):
+        return self.controller.get_students_page(offset=offset, limit=limit)[0]
+
+    def _on_rows_loaded(self, window):
+        # блок от страницы, которая уже не показывается, не нужен
+        if self.table_view.fetch_rows is not window:
+            return
+        self.table_view.refresh()
+        self.update_tree()
+
+    def update_tree(self):
+        if self.notebook.select() != str(self.tree_tab):
+            return
+        if self.current_rows is None:
+            # виртуальный режим: в дерево попадают уже загруженные строки, начиная с первой видимой в таблице
+            rows = self.table_view.fetch_rows(self.table_view.offset, VIRTUAL_ROWS_THRESHOLD)
+            self.tree_view.update_data([row for row in rows if row is not LOADING_ROW])
+        elif self.tree_outdated:
+            self.tree_view.update_data(self.current_rows)
+            self.tree_outdated = False
 
     def previous_page(self):
         try:
@@ -127,20 +246,50 @@ class MainWindow(tk.Tk):
     def count(self):
         try:
             deleted_count, found_count = self.controller.get_counts()
-            messagebox.showinfo("Статистика", f"Удалено записей: {deleted_count}\nНайдено записей: {found_count}")
+            cache_hits, cache_misses = self.controller.get_cache_stats()
+            messagebox.showinfo("Статистика", f"Удалено записей: {deleted_count}\nНайдено записей: {found_count}\n"
+                                              f"Поисков из кэша: {cache_hits}\nПоисков без кэша: {cache_misses}")
         except Exception:
             messagebox.showerror("Ошибка", "Не удалось получить статистику")
 
+    def open_statistics_window(self):
+        StatisticsWindow(self, self.controller)
+
     def load_students_from_file(self):
         file_path = filedialog.askopenfilename(filetypes=[("XML files", "*.xml")])
         if file_path:
-            try:
-                self.data = self.controller.get_students(file_path)
-                self.pagination.update_total(len(self.data))
-                self.update_table()
-                messagebox.showinfo("Успех", "Данные загружены!")
-            except Exception as e:
-                messagebox.showerror("Ошибка", f"Ошибка загрузки: {str(e)}")
+            self.executor.submit(self.controller.get_students, file_path, on_success=self._on_file_loaded,
+                                 on_error=lambda e: messagebox.showerror("Ошибка", f"Ошибка загрузки: {str(e)}"))
+
+    def import_students_from_file(self):
+        file_path = filedialog.askopenfilename(filetypes=[("XML files", "*.xml")])
+        if file_path:
+            self.executor.submit(self.controller.import_from_xml, file_path, progress=raise_if_cancelled,
+                                 on_success=self._on_file_imported, on_error=self._on_import_failed)
+
+    def _on_file_imported(self, count):
+        self.load_data(refresh=True)
+        messagebox.showinfo("Успех", f"Импортировано студентов: {count}")
+
+    def _on_import_failed(self, error):
+        # пачки, записанные до ошибки, остаются в базе
+        self.load_data(refresh=True)
+        messagebox.showerror("Ошибка", f"Ошибка импорта: {str(error)}")
+
+    def export_students_to_file(self):
+        file_path = filedialog.asksaveasfilename(defaultextension=".xml", filetypes=[("XML files", "*.xml")])
+        if file_path:
+            self.executor.submit(self.controller.export_to_xml, file_path, progress=raise_if_cancelled,
+                                 on_success=lambda count: messagebox.showinfo(
+                                     "Успех", f"Сохранено студентов: {count}"),
+                                 on_error=lambda e: messagebox.showerror("Ошибка", f"Ошибка сохранения: {str(e)}"))
+
+    def _on_file_loaded(self, data):
+        self.data = data
+        self.pagination.update_total(len(self.data))
+        self.update_table()
+        self.update_status_label(self.pagination, self.status_label)
+        messagebox.showinfo("Успех", "Данные загружены!")
 
     def create_menu(self):
         menubar = tk.Menu(self)
@@ -158,7 +307,9 @@ class MainWindow(tk.Tk):
             file_menu.add_command(label="Удалить по братьям/сестрам", command=self.open_delete_siblings_dialog)
             file_menu.add_command(label="Удалить по доходу", command=self.open_delete_income_dialog)
             file_menu.add_command(label="Добавить студента", command=self.open_add_student_dialog)
+            file_menu.add_command(label="Добавить список студентов", command=self.open_bulk_add_dialog)
             file_menu.add_command(label="Статистика", command=self.count)
+            file_menu.add_command(label="Производительность", command=self.open_statistics_window)
             menubar.add_cascade(label="Операции", menu=file_menu)
         else:
             file_menu.add_command(label="Поиск студента по имени", command=self.open_search_student_dialog)
@@ -170,55 +321,87 @@ class MainWindow(tk.Tk):
             file_menu.add_command(label="Удалить по братьям/сестрам", command=self.open_delete_siblings_dialog)
             file_menu.add_command(label="Удалить по доходу", command=self.open_delete_income_dialog)
             file_menu.add_command(label="Добавить студента", command=self.open_add_student_dialog)
-            file_menu.add_command(label="Обновить данные", command=self.load_data)
+            file_menu.add_command(label="Добавить список студентов", command=self.open_bulk_add_dialog)
+            file_menu.add_command(label="Обновить данные", command=lambda: self.load_data(refresh=True))
+            file_menu.add_command(label="Импорт из XML", command=self.import_students_from_file)
+            file_menu.add_command(label="Сохранить в XML", command=self.export_students_to_file)
             file_menu.add_command(label="Статистика", command=self.count)
+            file_menu.add_command(label="Производительность", command=self.open_statistics_window)
             menubar.add_cascade(label="Операции", menu=file_menu)
 
+    def apply_changes(self):
+        # задача ставится в очередь после операции диалога, поэтому изменения уже записаны
+        self.executor.submit(self.controller.pop_changes, on_success=self._on_changes, cancellable=False)
+
+    def _on_changes(self, changes):
+        if not changes:
+            return
+        if changes.reload:
+            self.load_data(refresh=True)
+            return
+
+        if self.mode == "xml":
+            self.data = self.controller.get_students()
+            total = len(self.data)
+        else:
+            total = self.pagination.total_items + changes.inserted - changes.deleted
+        last_shown = self.pagination.current_page * self.pagination.page_size
+        unchanged_page = not changes.deleted and last_shown <= self.pagination.total_items
+
+        self.pagination.update_total(total)
+        self.update_status_label(self.pagination, self.status_label)
+        # новые студенты добавляются в конец, заполненные страницы перед ними не меняются
+        if not unchanged_page:
+            self.update_table()
+
     def open_add_student_dialog(self):
         dialog = AddStudentDialog(self, self.controller)
         self.wait_window(dialog)
-        self.load_data()
+        self.apply_changes()
+
+    def open_bulk_add_dialog(self):
+        dialog = BulkAddStudentsDialog(self, self.controller)
+        self.wait_window(dialog)
+        self.apply_changes()
 
     def open_search_student_dialog(self):
         dialog = SearchStudentByNameDialog(self, self.controller)
         self.wait_window(dialog)
-        self.load_data()
 
     def open_search_parent_dialog(self):
         dialog = SearchParentByNameDialog(self, self.controller)
         self.wait_window(dialog)
-        self.load_data()
 
     def open_siblings_search_dialog(self):
         dialog = SearchBySiblingsDialog(self, self.controller)
         self.wait_window(dialog)
-        self.load_data()
 
     def open_income_search_dialog(self):
         dialog = IncomeSearchDialog(self, self.controller)
         self.wait_window(dialog)
-        self.load_data()
 
     def open_delete_student_dialog(self):
         dialog = DeleteStudentByNameDialog(self, self.controller)
         self.wait_window(dialog)
-        self.load_data()
-        deleted, found = self.controller.get_counts()
-        messagebox.showinfo("Статистика", f"Всего удалено: {deleted}\nВсего найдено: {found}")
+        self.apply_changes()
+        self.show_total_counts()
 
     def open_delete_siblings_dialog(self):
         dialog = DeleteBySiblingsDialog(self, self.controller)
         self.wait_window(dialog)
-        self.load_data()
-        deleted, found = self.controller.get_counts()
-        messagebox.showinfo("Статистика", f"Всего удалено: {deleted}\nВсего найдено: {found}")
+        self.apply_changes()
+        self.show_total_counts()
 
     def open_delete_income_dialog(self):
         dialog = DeleteByIncomeDialog(self, self.controller)
         self.wait_window(dialog)
-        self.load_data()
-        deleted, found = self.controller.get_counts()
-        messagebox.showinfo("Статистика", f"Всего удалено: {deleted}\nВсего найдено: {found}")
+        self.apply_changes()
+        self.show_total_counts()
+
+    def show_total_counts(self):
+        # задача ставится в очередь после удаления, поэтому счетчики уже обновлены
+        self.executor.submit(self.controller.get_counts, on_success=lambda counts: messagebox.showinfo(
+            "Статистика", f"Всего удалено: {counts[0]}\nВсего найдено: {counts[1]}"))
 
     @staticmethod
     def update_status_label(pagination, status_label):
@@ -1,8 +1,16 @@
 import tkinter as tk
+from collections.abc import Sequence
 from tkinter import messagebox
 
 from table_tree_view import TableView
 
+# начиная с этого количества строк таблица работает в виртуальном режиме
+VIRTUAL_ROWS_THRESHOLD = 500
+# строк, запрашиваемых за раз для виртуальной таблицы
+ROW_BLOCK_SIZE = 200
+# строка виртуальной таблицы, блок которой еще загружается
+LOADING_ROW = ("Загрузка...",)
+
 
 class SearchResultsWindow(tk.Toplevel):
     def __init__(self, parent, results, title="Результаты поиска"):
@@ -15,6 +23,13 @@ class SearchResultsWindow(tk.Toplevel):
         self.table_view.pack(fill=tk.BOTH, expand=True)
 
         self.pagination = Pagination(len(results))
+
+        if len(results) > VIRTUAL_ROWS_THRESHOLD:
+            # все результаты в одной прокручиваемой таблице, без постраничного вывода
+            self.table_view.set_source(lambda offset, limit: results[offset:offset + limit], len(results))
+            tk.Label(self, text=f"Найдено записей: {len(results)}").pack(pady=10)
+            return
+
         self.create_controls()
 
         self.update_table()
@@ -58,6 +73,76 @@ class SearchResultsWindow(tk.Toplevel):
         self.update_table()
 
 
+def _covers(block_offset, block_size, offset, limit):
+    return block_offset <= offset and offset + limit <= block_offset + block_size
+
+
+class RowWindow:
+    # источник для TableView.set_source: строки [start, end) запрашиваются блоками через
+    # fetch_rows(offset, limit), поэтому прокрутка на строку обычно обходится без запроса;
+    # с submit (BackgroundExecutor.submit) блок загружается в фоне: до ответа вместо строк
+    # отдаются LOADING_ROW, после ответа вызывается on_loaded(), ошибка сообщается в on_error один раз
+    def __init__(self, fetch_rows, start, end, block_size=ROW_BLOCK_SIZE, submit=None, on_loaded=None,
+                 on_error=None):
+        self.fetch_rows = fetch_rows
+        self.start = start
+        self.size = end - start
+        self.block_size = block_size
+        self.block_offset = 0
+        self.block = []
+        self.submit = submit
+        self.on_loaded = on_loaded
+        self.on_error = on_error
+        # (задача, смещение, размер) загружаемого блока
+        self.pending = None
+        self.failed = False
+
+    def __call__(self, offset, limit):
+        limit = max(0, min(limit, self.size - offset))
+        if not _covers(self.block_offset, len(self.block), offset, limit):
+            # блок захватывает строки и выше запрошенных, чтобы прокрутка вверх тоже в него попадала
+            block_offset = max(0, offset - self.block_size // 4)
+            size = min(max(self.block_size, offset - block_offset + limit), self.size - block_offset)
+            if self.submit is None:
+                self.block_offset = block_offset
+                self.block = self.fetch_rows(self.start + block_offset, size)
+            else:
+                self._request(block_offset, size, offset, limit)
+                return [LOADING_ROW] * limit
+        position = offset - self.block_offset
+        return self.block[position:position + limit]
+
+    def _request(self, block_offset, size, offset, limit):
+        if self.pending is not None:
+            task, pending_offset, pending_size = self.pending
+            # уже запрошенный блок содержит нужные строки
+            if not task.cancelled and _covers(pending_offset, pending_size, offset, limit):
+                return
+        # ответ на предыдущий запрос будет отброшен
+        task = self.submit(self.fetch_rows, self.start + block_offset, size,
+                           on_success=lambda rows: self._on_block(task, block_offset, rows),
+                           on_error=lambda e: self._on_block_error(task, e))
+        self.pending = None if task is None else (task, block_offset, size)
+
+    def _on_block(self, task, block_offset, rows):
+        if self.pending is None or self.pending[0] is not task:
+            return
+        self.pending = None
+        self.block_offset = block_offset
+        self.block = rows
+        if self.on_loaded is not None:
+            self.on_loaded()
+
+    def _on_block_error(self, task, error):
+        if self.pending is None or self.pending[0] is not task:
+            return
+        self.pending = None
+        # при прокрутке блоки запрашиваются снова, но об ошибке сообщается только первой
+        if not self.failed and self.on_error is not None:
+            self.failed = True
+            self.on_error(error)
+
+
 class Pagination:
     def __init__(self, total_items, page_size=10):
         if total_items < 0:
@@ -69,15 +154,44 @@ class Pagination:
         self.current_page = 1
         self.total_items = total_items
         self.total_pages = (total_items + page_size - 1) // page_size
+        self.page_keys = {1: None}
+        # меняется при сбросе ключей, чтобы не сохранить ключ из запроса, отправленного до сброса
+        self.keys_version = 0
+
+    def current_range(self):
+        start_index = (self.current_page - 1) * self.page_size
+        return start_index, start_index + self.page_size
 
     def get_current_page_data(self, data):
-        if not isinstance(data, list):
-            raise ValueError("Данные должны быть списком.")
+        if not isinstance(data, Sequence):
+            raise ValueError("Данные должны быть последовательностью.")
 
-        start_index = (self.current_page - 1) * self.page_size
-        end_index = start_index + self.page_size
+        start_index, end_index = self.current_range()
         return data[start_index:end_index]
 
+    def page_request(self):
+        # (страница, версия ключей, аргументы fetch_page) - снимок для запроса из другого потока
+        if self.current_page in self.page_keys:
+            request = {"after_id": self.page_keys[self.current_page], "limit": self.page_size}
+        else:
+            request = {"offset": (self.current_page - 1) * self.page_size, "limit": self.page_size}
+        return self.current_page, self.keys_version, request
+
+    def remember_page(self, page, keys_version, rows, last_id):
+        if rows and keys_version == self.keys_version:
+            self.page_keys[page + 1] = last_id
+
+    def fetch_current_page(self, fetch_page):
+        # fetch_page(after_id, offset, limit) -> (rows, last_id)
+        page, keys_version, request = self.page_request()
+        rows, last_id = fetch_page(**request)
+        self.remember_page(page, keys_version, rows, last_id)
+        return rows
+
+    def reset_page_keys(self):
+        self.page_keys = {1: None}
+        self.keys_version += 1
+
     def next_page(self):
         if self.current_page < self.total_pages:
             self.current_page += 1
@@ -99,6 +213,7 @@ class Pagination:
         self.page_size = size
         self.total_pages = (self.total_items + size - 1) // size
         self.current_page = 1
+        self.reset_page_keys()
 
     def update_total(self, total_items):
         if total_items < 0:
@@ -106,6 +221,7 @@ class Pagination:
 
         self.total_items = total_items
         self.total_pages = (total_items + self.page_size - 1) // self.page_size
+        self.reset_page_keys()
         if self.current_page > self.total_pages:
             self.current_page = self.total_pages
         elif self.current_page < 1:
@@ -0,0 +1,76 @@
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk
+
+from table_tree_view import TableView
+
+# период автообновления открытого окна, мс
+REFRESH_INTERVAL = 2000
+
+COLUMNS = ("Операция", "Вызовов", "Ошибок", "Всего, мс", "p50, мс", "p95, мс", "p99, мс", "Макс., мс", "Строк")
+
+
+class StatisticsWindow(tk.Toplevel):
+    def __init__(self, parent, controller):
+        super().__init__(parent)
+        self.title("Производительность")
+        self.geometry("1000x500")
+        self.controller = controller
+        self.metrics = controller.metrics
+
+        self.summary_label = ttk.Label(self, text="")
+        self.summary_label.pack(side=tk.TOP, anchor=tk.W, padx=10, pady=5)
+
+        self.table_view = TableView(self, columns=COLUMNS)
+        self.table_view.pack(fill=tk.BOTH, expand=True)
+
+        control_frame = ttk.Frame(self)
+        control_frame.pack(fill=tk.X, pady=10, padx=10)
+
+        self.enabled = tk.BooleanVar(value=self.metrics.enabled)
+        ttk.Checkbutton(control_frame, text="Сбор включен", variable=self.enabled,
+                        command=self.toggle).pack(side=tk.LEFT)
+        ttk.Button(control_frame, text="Экспорт в JSON", command=self.export).pack(side=tk.RIGHT)
+        ttk.Button(control_frame, text="Сбросить", command=self.reset).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(control_frame, text="Обновить", command=self.refresh).pack(side=tk.RIGHT)
+
+        self.refresh_job = None
+        self.refresh()
+
+    def refresh(self):
+        if self.refresh_job is not None:
+            self.after_cancel(self.refresh_job)
+        deleted_count, found_count = self.controller.get_counts()
+        cache_hits, cache_misses = self.controller.get_cache_stats()
+        self.summary_label.config(text=f"Удалено записей: {deleted_count}   Найдено записей: {found_count}   "
+                                       f"Поисков из кэша: {cache_hits}   Поисков без кэша: {cache_misses}")
+        self.table_view.update_data([
+            (name, stats["count"], stats["errors"], f"{stats['total_ms']:.1f}", f"{stats['p50_ms']:.2f}",
+             f"{stats['p95_ms']:.2f}", f"{stats['p99_ms']:.2f}", f"{stats['max_ms']:.2f}",
+             "" if stats["rows"] is None else stats["rows"])
+            for name, stats in self.metrics.snapshot().items()
+        ])
+        self.refresh_job = self.after(REFRESH_INTERVAL, self.refresh)
+
+    def toggle(self):
+        self.metrics.enabled = self.enabled.get()
+
+    def reset(self):
+        self.metrics.reset()
+        self.refresh()
+
+    def export(self):
+        file_path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON files", "*.json")],
+                                                 parent=self)
+        if not file_path:
+            return
+        try:
+            self.metrics.export(file_path)
+            messagebox.showinfo("Успех", "Статистика сохранена", parent=self)
+        except OSError as e:
+            messagebox.showerror("Ошибка", f"Ошибка сохранения: {str(e)}", parent=self)
+
+    def destroy(self):
+        if self.refresh_job is not None:
+            self.after_cancel(self.refresh_job)
+            self.refresh_job = None
+        super().destroy()
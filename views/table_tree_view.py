@@ -1,7 +1,26 @@
 import tkinter as tk
+from difflib import SequenceMatcher
 from tkinter import ttk
 
 
+def apply_row_diff(tree, items, old_rows, new_rows, insert, update):
+    # Treeview изменяется только там, где строки отличаются; неизменные узлы сохраняются
+    result = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, old_rows, new_rows, autojunk=False).get_opcodes():
+        if tag == "equal":
+            result.extend(items[i1:i2])
+            continue
+        common = min(i2 - i1, j2 - j1)
+        for item, row in zip(items[i1:i1 + common], new_rows[j1:j1 + common]):
+            update(item, row)
+            result.append(item)
+        if i2 - i1 > common:
+            tree.delete(*items[i1 + common:i2])
+        for row in new_rows[j1 + common:j2]:
+            result.append(insert(len(result), row))
+    return result
+
+
 class TableView(ttk.Frame):
     def __init__(self, parent, columns=None):
         super().__init__(parent)
@@ -16,20 +35,114 @@ class TableView(ttk.Frame):
         )
 
         self.tree = ttk.Treeview(self, columns=self.columns, show="headings")
+        # строки и узлы Treeview в обычном (не виртуальном) режиме
+        self.rows = []
+        self.items = []
 
         for col in self.columns:
             self.tree.heading(col, text=col)
             self.tree.column(col, stretch=tk.YES)
 
+        # виртуальный режим: постоянный набор строк, значения которых подменяются при прокрутке
+        self.fetch_rows = None
+        self.total_rows = 0
+        self.offset = 0
+        self.pool = []
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scroll)
+
         self.tree.pack(fill=tk.BOTH, expand=True)
 
+        self.tree.bind("<Configure>", lambda e: self._resize_pool())
+        self.tree.bind("<MouseWheel>", lambda e: self._scroll_by(-1 if e.delta > 0 else 1, "units"))
+        self.tree.bind("<Button-4>", lambda e: self._scroll_by(-1, "units"))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_by(1, "units"))
+
     def insert_data(self, data):
+        self._stop_virtual()
         for row in data:
-            self.tree.insert("", "end", values=row)
+            self.rows.append(tuple(row))
+            self.items.append(self.tree.insert("", "end", values=row))
+
+    def update_data(self, data):
+        self._stop_virtual()
+        rows = [tuple(row) for row in data]
+        self.items = apply_row_diff(
+            self.tree, self.items, self.rows, rows,
+            insert=lambda index, row: self.tree.insert("", index, values=row),
+            update=lambda item, row: self.tree.item(item, values=row)
+        )
+        self.rows = rows
 
     def clear_data(self):
-        for row in self.tree.get_children():
-            self.tree.delete(row)
+        self._stop_virtual()
+        self.tree.delete(*self.tree.get_children())
+        self.rows = []
+        self.items = []
+
+    def set_source(self, fetch_rows, total_rows):
+        # fetch_rows(offset, limit) -> строки; в Treeview создаются только видимые строки
+        self.tree.delete(*self.tree.get_children())
+        self.rows = []
+        self.items = []
+        self.pool = []
+        self.fetch_rows = fetch_rows
+        self.total_rows = total_rows
+        self.offset = 0
+        self.tree.pack_forget()
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self._resize_pool()
+
+    def refresh(self):
+        # виртуальный режим: перечитать видимые строки, например после загрузки блока
+        if self.fetch_rows is not None:
+            self._scroll_to(self.offset)
+
+    def _stop_virtual(self):
+        if self.fetch_rows is None:
+            return
+        self.fetch_rows = None
+        self.total_rows = 0
+        self.pool = []
+        self.tree.delete(*self.tree.get_children())
+        self.scrollbar.pack_forget()
+
+    def _visible_rows(self):
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        # одна строка уходит на заголовки колонок
+        return max(1, self.tree.winfo_height() // row_height - 1)
+
+    def _resize_pool(self):
+        if self.fetch_rows is None:
+            return
+        size = min(self._visible_rows(), self.total_rows)
+        while len(self.pool) < size:
+            self.pool.append(self.tree.insert("", "end", values=()))
+        if len(self.pool) > size:
+            self.tree.delete(*self.pool[size:])
+            del self.pool[size:]
+        self._scroll_to(self.offset)
+
+    def _on_scroll(self, action, value, units=None):
+        if action == "moveto":
+            self._scroll_to(int(float(value) * self.total_rows))
+        elif action == "scroll":
+            self._scroll_by(int(value), units)
+
+    def _scroll_by(self, count, units):
+        if self.fetch_rows is not None:
+            step = len(self.pool) if units == "pages" else 1
+            self._scroll_to(self.offset + count * step)
+
+    def _scroll_to(self, offset):
+        self.offset = max(0, min(offset, self.total_rows - len(self.pool)))
+        rows = self.fetch_rows(self.offset, len(self.pool)) if self.pool else []
+        for item, row in zip(self.pool, rows):
+            self.tree.item(item, values=row)
+        if self.total_rows:
+            self.scrollbar.set(self.offset / self.total_rows, (self.offset + len(self.pool)) / self.total_rows)
+        else:
+            self.scrollbar.set(0, 1)
 
 
 class TreeView(ttk.Frame):
@@ -38,24 +151,63 @@ class TreeView(ttk.Frame):
         self.tree = ttk.Treeview(self, columns=("Details"), show="tree")
         self.tree.heading("#0", text="Студенты")
         self.tree.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
+        # строки студентов, узлы которых еще не раскрывались
+        self.pending = {}
+        self.rows = []
+        self.items = []
+        self.tree.bind("<<TreeviewOpen>>", self._on_open)
 
     def insert_data(self, data):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.clear_data()
 
         for student in data:
-            student_id = self.tree.insert("", "end", text=student[0], values=("Студент"))
-            father_info = f"Отец: {student[1]}"
-            self.tree.insert(student_id, "end", text=father_info)
-            father_income =  f"Доход отца: {student[2]}"
-            self.tree.insert(student_id, "end", text=father_income)
-            mother_info = f"Мать: {student[3]}"
-            self.tree.insert(student_id, "end", text=mother_info)
-            mother_income = f"Доход матери: {student[4]}"
-            self.tree.insert(student_id, "end", text=mother_income)
-            siblings_info = f"Братья: {student[5]}, Сестры: {student[6]}"
-            self.tree.insert(student_id, "end", text=siblings_info)
+            self.rows.append(tuple(student))
+            self.items.append(self._insert_student("end", student))
+
+    def update_data(self, data):
+        rows = [tuple(student) for student in data]
+        self.items = apply_row_diff(self.tree, self.items, self.rows, rows,
+                                    insert=self._insert_student, update=self._update_student)
+        self.pending = {item: student for item, student in self.pending.items() if self.tree.exists(item)}
+        self.rows = rows
+
+    def _insert_student(self, index, student):
+        student_id = self.tree.insert("", index, text=student[0], values=("Студент"))
+        # заглушка, чтобы у узла была стрелка раскрытия
+        self.tree.insert(student_id, "end", text="...")
+        self.pending[student_id] = student
+        return student_id
+
+    def _update_student(self, student_id, student):
+        self.tree.item(student_id, text=student[0])
+        if student_id in self.pending:
+            self.pending[student_id] = student
+        else:
+            # узел уже раскрыт, сведения о родителях перестраиваются сразу
+            self._fill(student_id, student)
+
+    def _on_open(self, _):
+        student_id = self.tree.focus()
+        student = self.pending.pop(student_id, None)
+        if student is None:
+            return
+        self._fill(student_id, student)
+
+    def _fill(self, student_id, student):
+        self.tree.delete(*self.tree.get_children(student_id))
+        father_info = f"Отец: {student[1]}"
+        self.tree.insert(student_id, "end", text=father_info)
+        father_income = f"Доход отца: {student[2]}"
+        self.tree.insert(student_id, "end", text=father_income)
+        mother_info = f"Мать: {student[3]}"
+        self.tree.insert(student_id, "end", text=mother_info)
+        mother_income = f"Доход матери: {student[4]}"
+        self.tree.insert(student_id, "end", text=mother_income)
+        siblings_info = f"Братья: {student[5]}, Сестры: {student[6]}"
+        self.tree.insert(student_id, "end", text=siblings_info)
 
     def clear_data(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.tree.delete(*self.tree.get_children())
+        self.pending.clear()
+        self.rows = []
+        self.items = []